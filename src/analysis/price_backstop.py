@@ -5,26 +5,23 @@ import pandas as pd
 import polars as pl
 import duckdb
 from pathlib import Path
-import json
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional
+from typing import Tuple, Optional
 import structlog
+from src.common.utils import ConfigManager
 
 logger = structlog.get_logger()
 
+# Brand tier reference used to classify luxury brands
+BRANDS_TIERS_FILE = Path("data/reference/brands_tiers.json")
+
 class PriceBackstopAnalyzer:
     """Analyze price distributions and compute luxury thresholds."""
     
-    def __init__(self, config_path: str = "config.yaml"):
+    def __init__(self, config_path: str = "config.yaml", brands_file: Path = BRANDS_TIERS_FILE):
         """Initialize with configuration."""
         self.config_path = config_path
-        self.brands_tiers = self._load_brands_tiers()
-        
-    def _load_brands_tiers(self) -> Dict[str, List[str]]:
-        """Load brand tiers from reference file."""
-        with open("data/reference/brands_tiers.json", "r") as f:
-            data = json.load(f)
-        return data["tiers"]
+        self.brand_to_code, self.code_to_tier = ConfigManager.load_brand_tier_codes(brands_file)
     
     def compute_category_price_stats(self, products_df: pd.DataFrame) -> pd.DataFrame:
         """Compute price statistics by category and site."""
@@ -67,17 +64,15 @@ class PriceBackstopAnalyzer:
     def classify_luxury_products(self, products_df: pd.DataFrame, price_stats_df: pd.DataFrame) -> pd.DataFrame:
         """Classify products as luxury based on brand tier and price backstop."""
         
-        # Create brand tier mapping
-        tier_1_brands = set(self.brands_tiers["1"])
-        tier_1_5_brands = set(self.brands_tiers["1.5"])
+        # Brand tier lookup is precompiled to normalized brand -> tier code
+        brand_to_code = self.brand_to_code
+        code_to_tier = self.code_to_tier
         
         def get_brand_tier(brand: str) -> Optional[str]:
             """Get brand tier for a given brand."""
-            if brand in tier_1_brands:
-                return "1"
-            elif brand in tier_1_5_brands:
-                return "1.5"
-            return None
+            if not isinstance(brand, str):
+                return None
+            return code_to_tier.get(brand_to_code.get(brand.lower().strip(), -1))
         
         # Add brand tier
         products_df['brand_tier'] = products_df['brand'].apply(get_brand_tier)
@@ -130,8 +130,10 @@ def normalize(ctx):
 
 
 @cli.command()
+@click.option('--warm', is_flag=True,
+              help='Reuse a DuckDB copy of the silver tables between runs')
 @click.pass_context
-def validate(ctx):
+def validate(ctx, warm: bool):
     """Validate data quality and enforce provenance gates."""
     try:
         click.echo("Running integrity check...")
@@ -139,7 +141,7 @@ def validate(ctx):
         # Import and run integrity check
         from .validation.integrity_check import IntegrityChecker
         
-        checker = IntegrityChecker()
+        checker = IntegrityChecker(warm=warm)
         report = checker.run_integrity_check()
         
         if report['status'] == 'FAIL':
@@ -1,28 +1,95 @@
 """HTML parsing utilities with safe extractors and fallback strategies."""
 
 import re
-from typing import Optional, List, Dict, Any, Union
+from typing import Optional, List, Dict, Any, Union, Tuple, Iterable
 from urllib.parse import urljoin, urlparse
-from selectolax.parser import HTMLParser
+from selectolax.parser import HTMLParser, Node
 import structlog
+from .schema import Language
 
 logger = structlog.get_logger(__name__)
 
+# Numeric patterns tried in order by the rating and size extractors
+_RATING_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'(\d+(?:\.\d+)?)/5',  # 4.5/5
+        r'(\d+(?:\.\d+)?)\s*étoiles?',  # 4.5 étoiles
+        r'(\d+(?:\.\d+)?)\s*stars?',  # 4.5 stars
+        r'(\d+(?:\.\d+)?)',  # Just the number
+    )
+]
+_SIZE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'(\d+(?:\.\d+)?)\s*ml',  # 100 ml
+        r'(\d+(?:\.\d+)?)\s*g',   # 50 g
+        r'(\d+(?:\.\d+)?)\s*grammes?',  # 50 grammes
+        r'(\d+(?:\.\d+)?)',  # Just the number
+    )
+]
+_PRICE_STRIP_RE = re.compile(r'[^\d,.]')
+
 
 class SafeExtractor:
     """Safe HTML content extractor with multiple fallback strategies."""
     
-    def __init__(self, html: str, base_url: str = ""):
+    def __init__(self, html: str, base_url: str = "", parser: Optional[Union[HTMLParser, Node]] = None):
         self.html = html
         self.base_url = base_url
-        self.parser = HTMLParser(html)
+        self.parser = parser if parser is not None else HTMLParser(html)
+        # Selector results per page; fields share fallbacks (e.g. the JSON-LD
+        # script), so each selector only walks the tree once
+        self._first_cache: Dict[str, Any] = {}
+        self._all_cache: Dict[str, List[Any]] = {}
+        
+    @classmethod
+    def from_node(cls, node: Node, base_url: str = "") -> "SafeExtractor":
+        """Create an extractor scoped to an already-parsed subtree.
+        
+        The subtree is queried in place instead of being serialised and
+        re-parsed, so ``html`` is left empty.
+        """
+        return cls("", base_url, parser=node)
+    
+    def _css_first(self, selector: str):
+        """Return the first node matching a selector, querying the tree once."""
+        if selector not in self._first_cache:
+            self._first_cache[selector] = self.parser.css_first(selector)
+        return self._first_cache[selector]
+    
+    def _css(self, selector: str) -> List[Any]:
+        """Return all nodes matching a selector, querying the tree once."""
+        if selector not in self._all_cache:
+            self._all_cache[selector] = self.parser.css(selector)
+        return self._all_cache[selector]
+    
+    def extract_many(self, spec: Dict[str, Tuple[List[str], List[str], str]],
+                     into: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Extract several fields from the page in one call.
+        
+        ``spec`` maps each output field to ``(selectors, fallback_selectors, kind)``
+        where ``kind`` is one of text, price, rating, size, url, image or list.
+        Results are written into ``into`` when given, else into a new dict.
+        """
+        extractors = {
+            "text": self.extract_text,
+            "price": self.extract_price,
+            "rating": self.extract_rating,
+            "size": self.extract_size,
+            "url": self.extract_url,
+            "image": self.extract_image_url,
+            "list": self.extract_list,
+        }
+        fields = {} if into is None else into
+        for field, (selectors, fallback_selectors, kind) in spec.items():
+            fields[field] = extractors[kind](selectors, fallback_selectors)
+        return fields
         
     def extract_text(self, selectors: List[str], fallback_selectors: Optional[List[str]] = None) -> Optional[str]:
         """Extract text using multiple selector strategies."""
         # Try primary selectors
         for selector in selectors:
             try:
-                element = self.parser.css_first(selector)
+                element = self._css_first(selector)
                 if element and element.text():
                     text = element.text().strip()
                     if text:
@@ -35,7 +102,7 @@ class SafeExtractor:
         if fallback_selectors:
             for selector in fallback_selectors:
                 try:
-                    element = self.parser.css_first(selector)
+                    element = self._css_first(selector)
                     if element and element.text():
                         text = element.text().strip()
                         if text:
@@ -52,7 +119,7 @@ class SafeExtractor:
         # Try primary selectors
         for selector in selectors:
             try:
-                element = self.parser.css_first(selector)
+                element = self._css_first(selector)
                 if element and element.attributes.get(attribute):
                     value = element.attributes[attribute].strip()
                     if value:
@@ -65,7 +132,7 @@ class SafeExtractor:
         if fallback_selectors:
             for selector in fallback_selectors:
                 try:
-                    element = self.parser.css_first(selector)
+                    element = self._css_first(selector)
                     if element and element.attributes.get(attribute):
                         value = element.attributes[attribute].strip()
                         if value:
@@ -90,6 +157,19 @@ class SafeExtractor:
             return urljoin(self.base_url, url)
         return url
     
+    def extract_nodes(self, selectors: List[str], fallback_selectors: Optional[List[str]] = None) -> List[Node]:
+        """Extract the nodes matched by the first selector that matches any."""
+        for selector in (*selectors, *(fallback_selectors or ())):
+            try:
+                elements = self._css(selector)
+                if elements:
+                    return elements
+            except Exception as e:
+                logger.debug("Node selector failed", selector=selector, error=str(e))
+                continue
+        
+        return []
+    
     def extract_list(self, selectors: List[str], fallback_selectors: Optional[List[str]] = None) -> List[str]:
         """Extract list of text values."""
         results = []
@@ -97,7 +177,7 @@ class SafeExtractor:
         # Try primary selectors
         for selector in selectors:
             try:
-                elements = self.parser.css(selector)
+                elements = self._css(selector)
                 for element in elements:
                     if element and element.text():
                         text = element.text().strip()
@@ -113,7 +193,7 @@ class SafeExtractor:
         if fallback_selectors:
             for selector in fallback_selectors:
                 try:
-                    elements = self.parser.css(selector)
+                    elements = self._css(selector)
                     for element in elements:
                         if element and element.text():
                             text = element.text().strip()
@@ -134,15 +214,8 @@ class SafeExtractor:
             return None
         
         # Try to extract numeric rating
-        rating_patterns = [
-            r'(\d+(?:\.\d+)?)/5',  # 4.5/5
-            r'(\d+(?:\.\d+)?)\s*étoiles?',  # 4.5 étoiles
-            r'(\d+(?:\.\d+)?)\s*stars?',  # 4.5 stars
-            r'(\d+(?:\.\d+)?)',  # Just the number
-        ]
-        
-        for pattern in rating_patterns:
-            match = re.search(pattern, rating_text, re.IGNORECASE)
+        for pattern in _RATING_PATTERNS:
+            match = pattern.search(rating_text)
             if match:
                 try:
                     rating = float(match.group(1))
@@ -160,7 +233,7 @@ class SafeExtractor:
             return None
         
         # Remove currency symbols and spaces
-        price_clean = re.sub(r'[^\d,.]', '', price_text)
+        price_clean = _PRICE_STRIP_RE.sub('', price_text)
         
         # Handle different decimal separators
         if ',' in price_clean and '.' in price_clean:
@@ -183,15 +256,8 @@ class SafeExtractor:
             return None
         
         # Extract numeric value with unit
-        size_patterns = [
-            r'(\d+(?:\.\d+)?)\s*ml',  # 100 ml
-            r'(\d+(?:\.\d+)?)\s*g',   # 50 g
-            r'(\d+(?:\.\d+)?)\s*grammes?',  # 50 grammes
-            r'(\d+(?:\.\d+)?)',  # Just the number
-        ]
-        
-        for pattern in size_patterns:
-            match = re.search(pattern, size_text, re.IGNORECASE)
+        for pattern in _SIZE_PATTERNS:
+            match = pattern.search(size_text)
             if match:
                 try:
                     size = float(match.group(1))
@@ -258,9 +324,23 @@ class RefillableDetector:
     
     def __init__(self, keywords: Dict[str, List[str]]):
         self.keywords = keywords
+        # French and English keywords share one case-insensitive pattern, so
+        # page text is scanned once without building a lowercased copy
+        all_keywords = [
+            keyword for language in ('french', 'english')
+            for keyword in keywords.get(language, []) if keyword
+        ]
+        self._keyword_re = re.compile(
+            '|'.join(re.escape(keyword) for keyword in all_keywords), re.IGNORECASE
+        ) if all_keywords else None
     
-    def detect_refillable(self, text_content: str, facets: List[str] = None, badges: List[str] = None) -> tuple[bool, List[str]]:
-        """Detect if product is refillable with evidence."""
+    def detect_refillable(self, text_content: Union[str, Iterable[Optional[str]]],
+                          facets: List[str] = None, badges: List[str] = None) -> tuple[bool, List[str]]:
+        """Detect if product is refillable with evidence.
+        
+        ``text_content`` may be a single string or several text fragments,
+        which are scanned in place instead of being joined first.
+        """
         evidence = []
         
         # Check facets first (highest priority)
@@ -278,7 +358,8 @@ class RefillableDetector:
                     return True, evidence
         
         # Check text content
-        if text_content and self._contains_refillable_keyword(text_content):
+        fragments = [text_content] if isinstance(text_content, str) else text_content or []
+        if any(self._contains_refillable_keyword(fragment) for fragment in fragments):
             evidence.append("attribute_text")
             return True, evidence
         
@@ -289,51 +370,46 @@ class RefillableDetector:
         if not text:
             return False
         
-        text_lower = text.lower()
-        
-        # Check French keywords
-        for keyword in self.keywords.get('french', []):
-            if keyword.lower() in text_lower:
-                return True
-        
-        # Check English keywords
-        for keyword in self.keywords.get('english', []):
-            if keyword.lower() in text_lower:
-                return True
+        if self._keyword_re is None:
+            return False
         
-        return False
+        return self._keyword_re.search(text) is not None
 
 
 class LanguageDetector:
     """Language detection for reviews."""
     
-    @staticmethod
-    def detect_language(text: str) -> str:
-        """Detect language of text."""
-        if not text:
-            return "other"
-        
-        # Simple French detection
-        french_indicators = [
-            'le', 'la', 'les', 'un', 'une', 'des', 'et', 'ou', 'avec', 'sans',
-            'très', 'plus', 'moins', 'bon', 'bonne', 'mauvais', 'mauvaise',
-            'parfait', 'parfaite', 'excellent', 'excellente', 'super', 'génial'
-        ]
-        
-        text_lower = text.lower()
-        french_count = sum(1 for word in french_indicators if word in text_lower)
+    # Language is decidable from a short prefix; longer reviews are truncated
+    MAX_CHARS = 512
+    
+    FRENCH_INDICATORS = (
+        'le', 'la', 'les', 'un', 'une', 'des', 'et', 'ou', 'avec', 'sans',
+        'très', 'plus', 'moins', 'bon', 'bonne', 'mauvais', 'mauvaise',
+        'parfait', 'parfaite', 'excellent', 'excellente', 'super', 'génial'
+    )
+    
+    ENGLISH_INDICATORS = (
+        'the', 'a', 'an', 'and', 'or', 'with', 'without', 'very', 'more',
+        'less', 'good', 'bad', 'perfect', 'excellent', 'great', 'amazing'
+    )
+    
+    @classmethod
+    def detect_language(cls, text: str) -> Language:
+        """Detect language of text.
         
-        # Simple English detection
-        english_indicators = [
-            'the', 'a', 'an', 'and', 'or', 'with', 'without', 'very', 'more',
-            'less', 'good', 'bad', 'perfect', 'excellent', 'great', 'amazing'
-        ]
+        ``Language`` is a str enum, so results still compare equal to the
+        plain codes ("fr", "en", "other").
+        """
+        if not text:
+            return Language.OTHER
         
-        english_count = sum(1 for word in english_indicators if word in text_lower)
+        text_lower = text[:cls.MAX_CHARS].lower()
+        french_count = sum(word in text_lower for word in cls.FRENCH_INDICATORS)
+        english_count = sum(word in text_lower for word in cls.ENGLISH_INDICATORS)
         
         if french_count > english_count:
-            return "fr"
+            return Language.FRENCH
         elif english_count > french_count:
-            return "en"
+            return Language.ENGLISH
         else:
-            return "other"
+            return Language.OTHER
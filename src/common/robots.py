@@ -1,72 +1,246 @@
 """Robots.txt compliance module for polite web crawling."""
 
+import asyncio
 import re
 import time
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Pattern, Tuple
 from urllib.parse import urlparse, urljoin
 import httpx
+import orjson
 import structlog
 from .schema import ComplianceManifest
 
 logger = structlog.get_logger(__name__)
 
+# One directive per line; the value stops at whitespace or an inline comment,
+# and lines with other directives (Sitemap, Host...) are skipped
+_DIRECTIVE_RE = re.compile(
+    r'^[ \t]*(user-agent|allow|disallow|crawl-delay)[ \t]*:[ \t]*([^\s#]*)',
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# User-agent groups whose rules this crawler follows
+_OUR_AGENTS = ('*', 'bot')
+
+# Cached robots.txt rules are revalidated with a conditional GET after this long
+ROBOTS_TTL_SECONDS = 6 * 3600
+
+# Paths whose robots.txt verdict is remembered per domain before starting over
+MAX_CACHED_VERDICTS = 100_000
+
+
+def _rule_regex(rule_path: str) -> str:
+    """Translate a robots.txt rule into a regex matched from the start of a path.
+    
+    ``*`` matches any run of characters and a trailing ``$`` anchors the rule
+    at the end of the path; everything else is literal, so plain rules are
+    prefix matches.
+    """
+    anchored = rule_path.endswith('$')
+    if anchored:
+        rule_path = rule_path[:-1]
+    regex = '.*'.join(re.escape(part) for part in rule_path.split('*'))
+    return regex + r'\Z' if anchored else regex
+
+
+def _compile_rules(rule_paths: Tuple[str, ...]) -> Pattern[str]:
+    """Compile non-empty rules into one alternation.
+    
+    Group ``i + 1`` belongs to ``rule_paths[i]``, so ``match.lastindex``
+    identifies the rule that matched.
+    """
+    return re.compile('|'.join(f'({_rule_regex(rule)})' for rule in rule_paths))
+
+
+def _segment_key(path: str) -> Optional[str]:
+    """Return the first segment of a path with both slashes (``/product/``), if complete."""
+    end = path.find('/', 1)
+    return path[:end + 1] if end != -1 else None
+
+
+class _RuleIndex:
+    """Robots.txt rules bucketed by the literal first path segment they require.
+    
+    A rule whose literal prefix (up to the first ``*``) spans a whole segment
+    can only match paths starting with that segment, so a path is tried
+    against its own bucket plus the rules that end inside the first segment
+    (``/*``, ``/search``...); every other bucket is skipped by one dict lookup.
+    """
+    
+    __slots__ = ("_by_segment", "_anywhere")
+    
+    def __init__(self, rule_paths: Tuple[str, ...]):
+        by_segment: Dict[str, List[str]] = {}
+        anywhere: List[str] = []
+        for rule in rule_paths:
+            if not rule:
+                continue  # Empty rules never match
+            literal = (rule[:-1] if rule.endswith('$') else rule).split('*', 1)[0]
+            key = _segment_key(literal)
+            if key is None:
+                anywhere.append(rule)
+            else:
+                by_segment.setdefault(key, []).append(rule)
+        
+        self._by_segment = {key: self._compile(rules) for key, rules in by_segment.items()}
+        self._anywhere = self._compile(anywhere)
+    
+    @staticmethod
+    def _compile(rules: List[str]) -> Optional[Tuple[Pattern[str], Tuple[str, ...]]]:
+        return (_compile_rules(tuple(rules)), tuple(rules)) if rules else None
+    
+    def match(self, path: str) -> Optional[str]:
+        """Return a rule matching ``path``, or None."""
+        for bucket in (self._by_segment.get(_segment_key(path)), self._anywhere):
+            if bucket is not None:
+                pattern, rules = bucket
+                match = pattern.match(path)
+                if match:
+                    return rules[match.lastindex - 1]
+        return None
+
+
+@lru_cache(maxsize=1024)
+def _build_index(rule_paths: Tuple[str, ...]) -> _RuleIndex:
+    """Build (once per distinct rule list) the segment index for ``rule_paths``."""
+    return _RuleIndex(rule_paths)
+
 
 class RobotsParser:
     """Parser for robots.txt files with compliance tracking."""
     
-    def __init__(self, robots_dir: Path):
+    def __init__(self, robots_dir: Path, use_index: bool = True,
+                 client_factory: Callable[..., httpx.Client] = httpx.Client):
         self.robots_dir = robots_dir
+        # Builds the client for each synchronous fetch; tests inject one
+        # bound to an httpx.MockTransport
+        self.client_factory = client_factory
+        # Match through the per-segment rule index; False checks each rule
+        # with _path_matches instead
+        self.use_index = use_index
         self.robots_dir.mkdir(parents=True, exist_ok=True)
         self._cache: Dict[str, Tuple[float, Dict]] = {}
-        self._cache_ttl = 3600  # 1 hour cache
+        self._cache_ttl = ROBOTS_TTL_SECONDS
+        # Rules parsed on earlier runs are reloaded instead of re-fetched
+        for rules_file in self.robots_dir.glob("*.json"):
+            self._load(rules_file.stem)
         
     def fetch_robots(self, domain: str) -> Optional[Dict]:
         """Fetch and parse robots.txt for a domain."""
         robots_url = f"https://{domain}/robots.txt"
         
-        # Check cache first
-        if domain in self._cache:
-            timestamp, rules = self._cache[domain]
-            if time.time() - timestamp < self._cache_ttl:
-                logger.debug("Using cached robots.txt", domain=domain)
-                return rules
+        cached_rules, fresh = self._cached_rules(domain)
+        if fresh:
+            return cached_rules
         
         try:
             logger.info("Fetching robots.txt", domain=domain, url=robots_url)
             
-            with httpx.Client(timeout=10.0) as client:
-                response = client.get(robots_url)
-                response.raise_for_status()
-                
-                rules = self._parse_robots_content(response.text, domain)
-                
-                # Save to file for audit
-                robots_file = self.robots_dir / f"{domain}.txt"
-                robots_file.write_text(response.text)
-                
-                # Cache the rules
-                self._cache[domain] = (time.time(), rules)
+            with self.client_factory(timeout=10.0) as client:
+                response = client.get(robots_url, headers=self._revalidation_headers(cached_rules))
+            return self._store_response(domain, response, cached_rules)
                 
-                logger.info("Successfully fetched robots.txt", 
-                           domain=domain, 
-                           allow_paths=len(rules.get("allow", [])),
-                           disallow_paths=len(rules.get("disallow", [])))
-                
-                return rules
+        except Exception as e:
+            return self._fetch_failed(domain, e)
+    
+    async def afetch_robots(self, domain: str, client: httpx.AsyncClient) -> Optional[Dict]:
+        """Fetch and parse robots.txt for a domain on a shared async client."""
+        robots_url = f"https://{domain}/robots.txt"
+        
+        cached_rules, fresh = self._cached_rules(domain)
+        if fresh:
+            return cached_rules
+        
+        try:
+            logger.info("Fetching robots.txt", domain=domain, url=robots_url)
+            
+            response = await client.get(robots_url, headers=self._revalidation_headers(cached_rules))
+            return self._store_response(domain, response, cached_rules)
                 
         except Exception as e:
-            logger.warning("Failed to fetch robots.txt", domain=domain, error=str(e))
-            # Return permissive default rules
-            return {
-                "allow": ["/"],
-                "disallow": [],
-                "crawl_delay": None,
-                "user_agent": "*",
-                "fetched_at": datetime.now().isoformat(),
-                "error": str(e)
-            }
+            return self._fetch_failed(domain, e)
+    
+    def _cached_rules(self, domain: str) -> Tuple[Optional[Dict], bool]:
+        """Return the cached rules for a domain, if any, and whether they are still fresh."""
+        if domain not in self._cache:
+            return None, False
+        timestamp, rules = self._cache[domain]
+        if time.time() - timestamp < self._cache_ttl:
+            logger.debug("Using cached robots.txt", domain=domain)
+            return rules, True
+        return rules, False
+    
+    @staticmethod
+    def _revalidation_headers(cached_rules: Optional[Dict]) -> Dict[str, str]:
+        """Conditional GET headers that revalidate stale rules instead of downloading them again."""
+        headers = {}
+        if cached_rules and cached_rules.get("etag"):
+            headers["If-None-Match"] = cached_rules["etag"]
+        if cached_rules and cached_rules.get("last_modified"):
+            headers["If-Modified-Since"] = cached_rules["last_modified"]
+        return headers
+    
+    def _store_response(self, domain: str, response: httpx.Response, cached_rules: Optional[Dict]) -> Dict:
+        """Parse, save and cache a robots.txt response; a 304 keeps the cached rules."""
+        if response.status_code == 304 and cached_rules is not None:
+            logger.info("robots.txt not modified", domain=domain)
+            self._cache[domain] = (time.time(), cached_rules)
+            self._persist(domain, cached_rules)
+            return cached_rules
+        
+        response.raise_for_status()
+        
+        rules = self._parse_robots_content(response.text, domain)
+        rules["etag"] = response.headers.get("ETag")
+        rules["last_modified"] = response.headers.get("Last-Modified")
+        
+        # Cache the rules, then save them and the raw file for audit
+        self._cache[domain] = (time.time(), rules)
+        self._persist(domain, rules, response.text)
+        
+        logger.info("Successfully fetched robots.txt", 
+                   domain=domain, 
+                   allow_paths=len(rules.get("allow", [])),
+                   disallow_paths=len(rules.get("disallow", [])))
+        
+        return rules
+    
+    def _persist(self, domain: str, rules: Dict, robots_text: Optional[str] = None):
+        """Write parsed rules to ``<domain>.json``, and the raw file to ``<domain>.txt`` if given.
+        
+        The JSON file's mtime records when the rules were cached. Write errors
+        are only logged: the rules are already cached and stay in use.
+        """
+        try:
+            if robots_text is not None:
+                (self.robots_dir / f"{domain}.txt").write_text(robots_text)
+            (self.robots_dir / f"{domain}.json").write_bytes(orjson.dumps(rules))
+        except (OSError, orjson.JSONEncodeError) as e:
+            logger.warning("Failed to save robots.txt rules", domain=domain, error=str(e))
+    
+    def _load(self, domain: str):
+        """Load rules persisted by an earlier run into the cache, skipping unreadable files."""
+        rules_file = self.robots_dir / f"{domain}.json"
+        try:
+            self._cache[domain] = (rules_file.stat().st_mtime, orjson.loads(rules_file.read_bytes()))
+        except (OSError, orjson.JSONDecodeError) as e:
+            logger.warning("Ignoring persisted robots rules", domain=domain, error=str(e))
+    
+    @staticmethod
+    def _fetch_failed(domain: str, error: Exception) -> Dict:
+        """Log a failed fetch and return permissive default rules."""
+        logger.warning("Failed to fetch robots.txt", domain=domain, error=str(error))
+        return {
+            "allow": ["/"],
+            "disallow": [],
+            "crawl_delay": None,
+            "user_agent": "*",
+            "fetched_at": datetime.now().isoformat(),
+            "error": str(error)
+        }
     
     def _parse_robots_content(self, content: str, domain: str) -> Dict:
         """Parse robots.txt content into structured rules."""
@@ -78,27 +252,31 @@ class RobotsParser:
             "fetched_at": datetime.now().isoformat()
         }
         
-        current_user_agent = "*"
+        # Rules before any User-agent line apply to everyone. Consecutive
+        # User-agent lines form one group sharing the rules that follow them.
+        in_agent_lines = False
+        applies = True
         
-        for line in content.split('\n'):
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-                
-            if ':' not in line:
-                continue
-                
-            directive, value = line.split(':', 1)
-            directive = directive.strip().lower()
-            value = value.strip()
+        for match in _DIRECTIVE_RE.finditer(content):
+            directive = match.group(1).lower()
+            value = match.group(2)
             
             if directive == 'user-agent':
-                current_user_agent = value
-            elif directive == 'allow' and current_user_agent in ['*', 'bot']:
+                if not in_agent_lines:
+                    # A new group starts; it applies once one of its agents is ours
+                    applies = False
+                    in_agent_lines = True
+                applies = applies or value.lower() in _OUR_AGENTS
+                continue
+            
+            in_agent_lines = False
+            if not applies:
+                continue
+            if directive == 'allow':
                 rules["allow"].append(value)
-            elif directive == 'disallow' and current_user_agent in ['*', 'bot']:
+            elif directive == 'disallow':
                 rules["disallow"].append(value)
-            elif directive == 'crawl-delay' and current_user_agent in ['*', 'bot']:
+            else:
                 try:
                     rules["crawl_delay"] = float(value)
                 except ValueError:
@@ -107,45 +285,62 @@ class RobotsParser:
         return rules
     
     def is_allowed(self, url: str, robots_rules: Optional[Dict] = None) -> bool:
-        """Check if a URL is allowed by robots.txt rules."""
+        """Check if a URL, or an already extracted path, is allowed by robots.txt rules."""
+        if not robots_rules:
+            return True
+        # Bare paths skip urlparse; scheme-relative URLs (//host/path) still need it
+        path = url if url.startswith("/") and not url.startswith("//") else urlparse(url).path
+        return self.is_allowed_path(path, robots_rules)
+    
+    def is_allowed_path(self, path: str, robots_rules: Optional[Dict] = None) -> bool:
+        """Check if a URL path is allowed by robots.txt rules."""
         if not robots_rules:
             return True
-            
-        parsed_url = urlparse(url)
-        path = parsed_url.path
         
         # Check disallow rules first (more restrictive)
-        for disallow_path in robots_rules.get("disallow", []):
-            if self._path_matches(path, disallow_path):
-                logger.debug("URL disallowed by robots.txt", url=url, disallow_path=disallow_path)
-                return False
+        disallow_path = self._first_match(path, robots_rules.get("disallow", []))
+        if disallow_path is not None:
+            logger.debug("URL disallowed by robots.txt", path=path, disallow_path=disallow_path)
+            return False
         
         # Check allow rules
         allow_rules = robots_rules.get("allow", [])
         if allow_rules:
             # If there are explicit allow rules, URL must match at least one
-            for allow_path in allow_rules:
-                if self._path_matches(path, allow_path):
-                    return True
+            if self._first_match(path, allow_rules) is not None:
+                return True
             # If no allow rule matches, deny
-            logger.debug("URL not explicitly allowed by robots.txt", url=url)
+            logger.debug("URL not explicitly allowed by robots.txt", path=path)
             return False
         
         # Default allow if no explicit rules
         return True
     
+    def _first_match(self, path: str, rule_paths: List[str]) -> Optional[str]:
+        """Return a rule from ``rule_paths`` matching ``path``, or None."""
+        if self.use_index:
+            return _build_index(tuple(rule_paths)).match(path)
+        return next((rule for rule in rule_paths if self._path_matches(path, rule)), None)
+    
     def _path_matches(self, path: str, rule_path: str) -> bool:
         """Check if a path matches a robots.txt rule pattern."""
         if not rule_path:
             return False
-            
-        # Handle wildcards
-        if '*' in rule_path:
-            pattern = rule_path.replace('*', '.*')
-            return bool(re.match(pattern, path))
         
-        # Exact match or prefix match
-        return path == rule_path or path.startswith(rule_path)
+        # Common shapes go through str methods; other wildcards use the regex
+        wildcards = rule_path.count("*")
+        if wildcards == 0:
+            if rule_path.endswith("$"):
+                return path == rule_path[:-1]
+            return path.startswith(rule_path)
+        if wildcards == 1:
+            if rule_path.startswith("*"):
+                if rule_path.endswith("$"):
+                    return path.endswith(rule_path[1:-1])
+                return rule_path[1:] in path
+            if rule_path.endswith("*"):
+                return path.startswith(rule_path[:-1])
+        return re.match(_rule_regex(rule_path), path) is not None
     
     def get_crawl_delay(self, robots_rules: Optional[Dict]) -> float:
         """Get crawl delay from robots.txt rules."""
@@ -162,8 +357,8 @@ class RobotsParser:
         """Create compliance manifest for a domain."""
         return ComplianceManifest(
             domain=domain,
-            robots_etag=None,  # Could be extracted from response headers
-            robots_last_modified=None,  # Could be extracted from response headers
+            robots_etag=robots_rules.get("etag") if robots_rules else None,
+            robots_last_modified=robots_rules.get("last_modified") if robots_rules else None,
             allow_paths=robots_rules.get("allow", []) if robots_rules else [],
             disallow_paths=robots_rules.get("disallow", []) if robots_rules else [],
             crawl_delay=self.get_crawl_delay(robots_rules),
@@ -178,13 +373,49 @@ class RobotsParser:
 class RobotsCompliance:
     """High-level robots.txt compliance manager."""
     
-    def __init__(self, robots_dir: Path):
-        self.parser = RobotsParser(robots_dir)
+    def __init__(self, robots_dir: Path,
+                 client_factory: Callable[..., httpx.Client] = httpx.Client,
+                 async_client_factory: Callable[..., httpx.AsyncClient] = httpx.AsyncClient):
+        self.parser = RobotsParser(robots_dir, client_factory=client_factory)
+        self.async_client_factory = async_client_factory
         self.manifests: Dict[str, ComplianceManifest] = {}
+        # Per domain: the rules dict the verdicts were computed against, and
+        # the verdict for each path checked so far
+        self._verdicts: Dict[str, Tuple[Dict, Dict[str, bool]]] = {}
         
     def check_domain(self, domain: str) -> Tuple[bool, ComplianceManifest]:
         """Check if a domain allows crawling and create compliance manifest."""
         robots_rules = self.parser.fetch_robots(domain)
+        return self._record_domain(domain, robots_rules)
+    
+    async def prefetch(self, domains: List[str], concurrency: int = 8) -> Dict[str, bool]:
+        """Check several domains, fetching their robots.txt concurrently.
+        
+        All requests share one ``httpx.AsyncClient`` and at most ``concurrency``
+        run at once. Manifests are recorded as by ``check_domain``, whose
+        allowed verdicts are returned per domain.
+        """
+        unique_domains = list(dict.fromkeys(domains))
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async with self.async_client_factory(timeout=10.0) as client:
+            async def fetch(domain: str) -> Optional[Dict]:
+                async with semaphore:
+                    return await self.parser.afetch_robots(domain, client)
+            
+            all_rules = await asyncio.gather(*(fetch(domain) for domain in unique_domains))
+        
+        return {
+            domain: self._record_domain(domain, robots_rules)[0]
+            for domain, robots_rules in zip(unique_domains, all_rules)
+        }
+    
+    def prefetch_sync(self, domains: List[str], concurrency: int = 8) -> Dict[str, bool]:
+        """Run ``prefetch`` from synchronous code."""
+        return asyncio.run(self.prefetch(domains, concurrency))
+    
+    def _record_domain(self, domain: str, robots_rules: Optional[Dict]) -> Tuple[bool, ComplianceManifest]:
+        """Create and record the compliance manifest for a domain's rules."""
         manifest = self.parser.create_compliance_manifest(domain, robots_rules)
         
         # Check if product/review paths are allowed
@@ -220,7 +451,22 @@ class RobotsCompliance:
             _, _ = self.check_domain(domain)
         
         robots_rules = self.parser._cache.get(domain, (0, {}))[1]
-        return self.parser.is_allowed(url, robots_rules)
+        
+        # Verdicts only depend on the path, and stay valid until the domain's
+        # rules are replaced by a new fetch
+        cached = self._verdicts.get(domain)
+        if cached is None or cached[0] is not robots_rules:
+            cached = (robots_rules, {})
+            self._verdicts[domain] = cached
+        verdicts = cached[1]
+        
+        path = urlparse(url).path
+        allowed = verdicts.get(path)
+        if allowed is None:
+            if len(verdicts) >= MAX_CACHED_VERDICTS:
+                verdicts.clear()
+            allowed = verdicts[path] = self.parser.is_allowed_path(path, robots_rules)
+        return allowed
     
     def get_crawl_delay(self, domain: str) -> float:
         """Get crawl delay for a domain."""
@@ -231,10 +477,13 @@ class RobotsCompliance:
     
     def update_manifest(self, domain: str, **kwargs):
         """Update compliance manifest with new data."""
-        if domain in self.manifests:
-            for key, value in kwargs.items():
-                if hasattr(self.manifests[domain], key):
-                    setattr(self.manifests[domain], key, value)
+        manifest = self.manifests.get(domain)
+        if manifest is None:
+            return
+        for key, value in kwargs.items():
+            # Only model fields; hasattr also matched methods like ``copy``
+            if key in ComplianceManifest.model_fields:
+                setattr(manifest, key, value)
     
     def get_all_manifests(self) -> List[ComplianceManifest]:
         """Get all compliance manifests."""
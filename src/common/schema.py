@@ -1,19 +1,22 @@
 """Pydantic schema models for luxury beauty data pipeline."""
 
+import sys
+from dataclasses import dataclass
 from datetime import datetime, date
-from typing import Literal, Optional, List
-from pydantic import BaseModel, HttpUrl, conint, Field
-from enum import Enum
+from typing import Any, Dict, Iterable, Literal, Optional, List, Tuple, Union
+import numpy as np
+from pydantic import BaseModel, ConfigDict, HttpUrl, conint, Field, field_validator
+from enum import StrEnum
 
 
-class RefillEvidence(str, Enum):
+class RefillEvidence(StrEnum):
     """Evidence types for refillable detection."""
     FACET = "facet"
     BADGE = "badge"
     ATTRIBUTE_TEXT = "attribute_text"
 
 
-class Site(str, Enum):
+class Site(StrEnum):
     """Supported e-commerce sites."""
     SEPHORA = "sephora"
     MARIONNAUD = "marionnaud"
@@ -21,15 +24,36 @@ class Site(str, Enum):
     BRANDSTORE = "brandstore"
 
 
-class Language(str, Enum):
+class Language(StrEnum):
     """Supported languages."""
     FRENCH = "fr"
     ENGLISH = "en"
     OTHER = "other"
 
 
+class OpenBeautyFactsData(BaseModel):
+    """Open Beauty Facts enrichment for a product."""
+    code: Optional[str] = Field(None, description="Open Beauty Facts product code")
+    ingredients: List[str] = Field(default_factory=list, description="Ingredient list")
+    packaging: Optional[str] = Field(None, description="Packaging description")
+
+
+class Enrichment(BaseModel):
+    """Typed enrichment data attached to products by downstream stages."""
+    # Unknown keys are kept so untyped enrichment dicts still validate
+    model_config = ConfigDict(extra="allow")
+    
+    open_beauty_facts: Optional[OpenBeautyFactsData] = Field(None, description="Open Beauty Facts data")
+    sentiment_score: Optional[float] = Field(None, description="Aggregated review sentiment score")
+    sentiment_label: Optional[str] = Field(None, description="Aggregated review sentiment label")
+    refill_parent_product_id: Optional[str] = Field(None, description="Product ID of the matching refillable parent")
+
+
 class Product(BaseModel):
     """Product metadata model."""
+    # Store enum members as their plain string values
+    model_config = ConfigDict(use_enum_values=True)
+    
     product_id: str = Field(..., description="Stable product identifier")
     site: Site = Field(..., description="Source e-commerce site")
     url: HttpUrl = Field(..., description="Product page URL")
@@ -64,11 +88,13 @@ class Product(BaseModel):
     brand_tier: Optional[str] = Field(None, description="Brand tier (1, 1.5, etc.)")
     
     # Enrichment fields
-    enrichment: Optional[dict] = Field(None, description="Additional enrichment data")
+    enrichment: Optional[Enrichment] = Field(None, description="Additional enrichment data")
 
 
 class Review(BaseModel):
     """Review data model."""
+    model_config = ConfigDict(use_enum_values=True)
+    
     review_id: str = Field(..., description="Unique review identifier")
     product_id: str = Field(..., description="Associated product ID")
     site: str = Field(..., description="Source site")
@@ -88,6 +114,75 @@ class Review(BaseModel):
     sentiment_label: Optional[str] = Field(None, description="Sentiment label")
 
 
+@dataclass(frozen=True)
+class ProductBundle:
+    """Validated product and its reviews, handed between pipeline stages.
+    
+    Models are validated once at intake; later stages derive new bundles with
+    ``model_copy`` instead of re-running Pydantic validation.
+    """
+    product: Product
+    reviews: Tuple[Review, ...] = ()
+    
+    def with_enrichment(self, enrichment: Union[Enrichment, Dict[str, Any]]) -> "ProductBundle":
+        """Return a bundle whose product carries the given enrichment data."""
+        return ProductBundle(
+            product=with_enrichment(self.product, enrichment),
+            reviews=self.reviews
+        )
+    
+    def with_reviews(self, reviews: List[Review]) -> "ProductBundle":
+        """Return a bundle with additional already-validated reviews."""
+        return ProductBundle(product=self.product, reviews=self.reviews + tuple(reviews))
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class ReviewBatch:
+    """Column-oriented view of validated reviews for large batches.
+    
+    Numeric fields are packed into numpy arrays (a missing helpful count is
+    -1) so batch consumers can vectorise over them instead of walking one
+    ``Review`` model per row. Languages are the plain codes ``Review`` stores.
+    """
+    review_ids: Tuple[str, ...]
+    product_ids: Tuple[str, ...]
+    bodies: Tuple[str, ...]
+    languages: Tuple[str, ...]
+    ratings: np.ndarray
+    helpful_counts: np.ndarray
+    review_dates: np.ndarray
+    
+    @classmethod
+    def from_reviews(cls, reviews: Iterable[Review]) -> "ReviewBatch":
+        """Pack already-validated reviews into columns."""
+        reviews = list(reviews)
+        return cls(
+            review_ids=tuple(r.review_id for r in reviews),
+            product_ids=tuple(r.product_id for r in reviews),
+            bodies=tuple(r.body for r in reviews),
+            languages=tuple(r.language for r in reviews),
+            ratings=np.fromiter((r.rating for r in reviews), dtype=np.uint8, count=len(reviews)),
+            helpful_counts=np.fromiter(
+                (-1 if r.helpful_count is None else r.helpful_count for r in reviews),
+                dtype=np.int32, count=len(reviews)
+            ),
+            review_dates=np.array([r.review_date for r in reviews], dtype="datetime64[D]"),
+        )
+    
+    def __len__(self) -> int:
+        return len(self.review_ids)
+
+
+def with_enrichment(product: Product, enrichment: Union[Enrichment, Dict[str, Any]]) -> Product:
+    """Attach enrichment data to a validated product without re-validation.
+    
+    Only the enrichment payload is validated; the product itself is copied.
+    """
+    if not isinstance(enrichment, Enrichment):
+        enrichment = Enrichment.model_validate(enrichment)
+    return product.model_copy(update={"enrichment": enrichment})
+
+
 class Brand(BaseModel):
     """Brand information model."""
     name: str = Field(..., description="Brand name")
@@ -108,6 +203,12 @@ class PageManifest(BaseModel):
     crawl_delay: Optional[float] = Field(None, description="Crawl delay from robots.txt")
     user_agent: str = Field(..., description="User agent used")
     response_time_ms: Optional[float] = Field(None, description="Response time in milliseconds")
+    
+    @field_validator("site", "user_agent")
+    @classmethod
+    def _intern_repeated(cls, value: str) -> str:
+        """Share one string object for the few sites and user agents seen per run."""
+        return sys.intern(value)
 
 
 class ComplianceManifest(BaseModel):
@@ -123,6 +224,12 @@ class ComplianceManifest(BaseModel):
     total_requests: int = Field(0, description="Total requests made")
     blocked_requests: int = Field(0, description="Number of blocked requests")
     rate_limit_violations: int = Field(0, description="Rate limit violations")
+    
+    @field_validator("domain")
+    @classmethod
+    def _intern_domain(cls, value: str) -> str:
+        """Share one string object per domain across manifests."""
+        return sys.intern(value)
 
 
 class RunManifest(BaseModel):
@@ -150,3 +257,27 @@ class PriceStats(BaseModel):
     count: int = Field(..., description="Number of products in category")
     currency: str = Field(..., description="Price currency")
     computed_ts: datetime = Field(..., description="Computation timestamp")
+    
+    @classmethod
+    def from_prices(cls, prices: Iterable[float], site: str, category: str,
+                    currency: str = "EUR") -> "PriceStats":
+        """Compute all percentiles in one pass over a group's prices.
+        
+        Interpolates linearly like DuckDB's ``PERCENTILE_CONT``, so the values
+        match the SQL price thresholds.
+        """
+        values = np.fromiter(prices, dtype=np.float64)
+        if values.size == 0:
+            raise ValueError(f"No prices to compute statistics for {site}/{category}")
+        p25, p50, p75, p90 = np.percentile(values, [25, 50, 75, 90])
+        return cls(
+            site=site,
+            category=category,
+            p25=p25,
+            p50=p50,
+            p75=p75,
+            p90=p90,
+            count=len(values),
+            currency=currency,
+            computed_ts=datetime.now(),
+        )
@@ -1,11 +1,16 @@
 """Utility functions for timestamping, hashing, and manifest management."""
 
+import functools
 import hashlib
 import json
 import uuid
 from datetime import datetime, date
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
+import fastjsonschema
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
 import yaml
 import structlog
 from .schema import RunManifest, ComplianceManifest
@@ -13,6 +18,37 @@ from .schema import RunManifest, ComplianceManifest
 logger = structlog.get_logger(__name__)
 
 
+# JSON schemas mirroring the DataValidator rules, compiled once at import so
+# obviously malformed records are rejected before paying for Pydantic models.
+PRODUCT_PREFILTER_SCHEMA = {
+    "type": "object",
+    "required": ["product_id", "brand", "name", "price_value", "price_currency"],
+    "properties": {
+        "product_id": {"type": "string", "minLength": 1},
+        "brand": {"type": "string", "minLength": 1},
+        "name": {"type": "string", "minLength": 1},
+        "price_value": {"type": "number", "exclusiveMinimum": 0},
+        "price_currency": {"type": "string", "minLength": 1},
+        "rating_avg": {"type": ["number", "null"], "minimum": 0, "maximum": 5},
+    },
+}
+
+REVIEW_PREFILTER_SCHEMA = {
+    "type": "object",
+    "required": ["review_id", "product_id", "rating", "body"],
+    "properties": {
+        "review_id": {"type": "string", "minLength": 1},
+        "product_id": {"type": "string", "minLength": 1},
+        "rating": {"type": "integer", "minimum": 1, "maximum": 5},
+        "body": {"type": "string", "minLength": 1},
+        "language": {"enum": ["fr", "en", "other", None, ""]},
+    },
+}
+
+_validate_product_schema = fastjsonschema.compile(PRODUCT_PREFILTER_SCHEMA)
+_validate_review_schema = fastjsonschema.compile(REVIEW_PREFILTER_SCHEMA)
+
+
 class TimestampManager:
     """Timestamp management utilities."""
     
@@ -93,18 +129,32 @@ class ManifestWriter:
         self.output_dir = output_dir
         self.output_dir.mkdir(parents=True, exist_ok=True)
     
-    def write_run_manifest(self, manifest: RunManifest, format: str = "json") -> Path:
-        """Write run manifest to file."""
+    def write_run_manifest(self, manifest: RunManifest, format: str = "json",
+                           compliance_log: Optional["ComplianceLog"] = None) -> Path:
+        """Write run manifest to file.
+        
+        When a compliance log is given, the compliance manifests live in its
+        Parquet file and the run manifest only records a reference to it.
+        """
         timestamp = TimestampManager.format_timestamp(manifest.start_ts)
         filename = f"run_manifest_{manifest.run_id}_{timestamp}.{format}"
         filepath = self.output_dir / filename
         
-        if format == "json":
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(manifest.model_dump(), f, indent=2, default=str)
+        if compliance_log is not None:
+            header = manifest.model_dump(mode='json', exclude={'compliance_manifests'})
+            header['compliance_manifests_path'] = str(compliance_log.path)
+            header['compliance_manifests_count'] = compliance_log.count
+            if format == "json":
+                filepath.write_bytes(orjson.dumps(header, option=orjson.OPT_INDENT_2))
+            elif format == "yaml":
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    yaml.safe_dump(header, f, default_flow_style=False)
+        elif format == "json":
+            # Serialize in a single pass instead of model_dump() + json.dump()
+            filepath.write_text(manifest.model_dump_json(indent=2), encoding='utf-8')
         elif format == "yaml":
             with open(filepath, 'w', encoding='utf-8') as f:
-                yaml.dump(manifest.model_dump(), f, default_flow_style=False, default=str)
+                yaml.safe_dump(manifest.model_dump(mode='json'), f, default_flow_style=False)
         
         logger.info("Run manifest written", filepath=str(filepath))
         return filepath
@@ -116,11 +166,11 @@ class ManifestWriter:
         filepath = self.output_dir / filename
         
         if format == "json":
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(manifest.model_dump(), f, indent=2, default=str)
+            # Serialize in a single pass instead of model_dump() + json.dump()
+            filepath.write_text(manifest.model_dump_json(indent=2), encoding='utf-8')
         elif format == "yaml":
             with open(filepath, 'w', encoding='utf-8') as f:
-                yaml.dump(manifest.model_dump(), f, default_flow_style=False, default=str)
+                yaml.safe_dump(manifest.model_dump(mode='json'), f, default_flow_style=False)
         
         logger.info("Compliance manifest written", filepath=str(filepath))
         return filepath
@@ -166,6 +216,65 @@ class ManifestWriter:
         return filepath
 
 
+class ComplianceLog:
+    """Append-only Parquet log of compliance manifests.
+    
+    The writer stays open for the whole crawl and each append adds a row
+    group, so checkpointing does not rewrite earlier manifests. The file is
+    only readable once the log has been closed.
+    """
+    
+    SCHEMA = pa.schema([
+        ("domain", pa.string()),
+        ("robots_etag", pa.string()),
+        ("robots_last_modified", pa.string()),
+        ("allow_paths", pa.list_(pa.string())),
+        ("disallow_paths", pa.list_(pa.string())),
+        ("crawl_delay", pa.float64()),
+        ("start_ts", pa.timestamp("us")),
+        ("end_ts", pa.timestamp("us")),
+        ("total_requests", pa.int64()),
+        ("blocked_requests", pa.int64()),
+        ("rate_limit_violations", pa.int64()),
+    ])
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.count = 0
+        self._writer: Optional[pq.ParquetWriter] = pq.ParquetWriter(
+            str(path), self.SCHEMA, compression="zstd"
+        )
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def append(self, manifest: ComplianceManifest):
+        """Append a compliance manifest as a new row group."""
+        if self._writer is None:
+            raise ValueError(f"Compliance log already closed: {self.path}")
+        
+        table = pa.Table.from_pylist([manifest.model_dump()], schema=self.SCHEMA)
+        self._writer.write_table(table)
+        self.count += 1
+    
+    def close(self):
+        """Flush the Parquet footer and close the writer."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            logger.info("Compliance log written", filepath=str(self.path), manifests=self.count)
+    
+    @staticmethod
+    def read(path: Path) -> List[ComplianceManifest]:
+        """Read compliance manifests back from a closed log."""
+        # Rows were written from validated manifests with a matching schema
+        return [ComplianceManifest.model_construct(**row) for row in pq.read_table(path).to_pylist()]
+
+
 class ConfigManager:
     """Configuration management utilities."""
     
@@ -193,6 +302,19 @@ class ConfigManager:
             logger.error("Failed to load brand tiers", brands_file=str(brands_file), error=str(e))
             raise
     
+    @staticmethod
+    def load_brand_tier_codes(brands_file: Path) -> Tuple[Dict[str, int], Dict[int, str]]:
+        """Load brand tiers as a normalized brand -> integer tier code lookup.
+        
+        Codes are the tier times ten ("1" -> 10, "1.5" -> 15) so they fit an
+        int8 column. Results are cached per file modification time; callers
+        look up ``brand_to_code.get(brand.lower().strip(), -1)``.
+        
+        Returns:
+            Tuple of (brand_to_code, code_to_tier)
+        """
+        return _compile_brand_tier_codes(str(brands_file), brands_file.stat().st_mtime)
+    
     @staticmethod
     def load_categories_map(categories_file: Path) -> Dict[str, Any]:
         """Load categories mapping from JSON file."""
@@ -206,9 +328,57 @@ class ConfigManager:
             raise
 
 
+def tier_to_code(tier: str) -> int:
+    """Convert a tier label such as "1.5" into its integer code (15)."""
+    return int(round(float(tier) * 10))
+
+
+@functools.lru_cache(maxsize=8)
+def _compile_brand_tier_codes(brands_file: str, mtime: float) -> Tuple[Dict[str, int], Dict[int, str]]:
+    """Build the brand tier lookup tables; keyed on mtime so edits invalidate it."""
+    tiers = ConfigManager.load_brands_tiers(Path(brands_file))
+    
+    brand_to_code: Dict[str, int] = {}
+    code_to_tier: Dict[int, str] = {}
+    for tier, brands in tiers.items():
+        code = tier_to_code(tier)
+        code_to_tier[code] = tier
+        for brand in brands:
+            # First listed tier wins for brands that appear in several tiers
+            brand_to_code.setdefault(brand.lower().strip(), code)
+    
+    return brand_to_code, code_to_tier
+
+
 class DataValidator:
     """Data validation utilities."""
     
+    @staticmethod
+    def prefilter_product(product_data: Dict[str, Any]) -> Optional[str]:
+        """Check product data against the compiled schema.
+        
+        Returns None for well-formed records, otherwise the first error message.
+        Use validate_product_data when the full list of errors is needed.
+        """
+        try:
+            _validate_product_schema(product_data)
+            return None
+        except fastjsonschema.JsonSchemaException as e:
+            return e.message
+    
+    @staticmethod
+    def prefilter_review(review_data: Dict[str, Any]) -> Optional[str]:
+        """Check review data against the compiled schema.
+        
+        Returns None for well-formed records, otherwise the first error message.
+        Use validate_review_data when the full list of errors is needed.
+        """
+        try:
+            _validate_review_schema(review_data)
+            return None
+        except fastjsonschema.JsonSchemaException as e:
+            return e.message
+    
     @staticmethod
     def validate_product_data(product_data: Dict[str, Any]) -> List[str]:
         """Validate product data and return list of errors."""
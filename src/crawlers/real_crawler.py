@@ -5,10 +5,14 @@ import asyncio
 import aiohttp
 import time
 import random
+import functools
+import hashlib
 from pathlib import Path
 from urllib.robotparser import RobotFileParser
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin, urlparse, urlsplit
+from selectolax.parser import HTMLParser
 import structlog
+import numpy as np
 import pandas as pd
 from typing import List, Dict, Optional, Set
 import json
@@ -17,6 +21,43 @@ import re
 
 logger = structlog.get_logger()
 
+# Simplified product field selectors (would need to be customized per site)
+_TITLE_SELECTOR = 'title'
+_PRICE_SELECTOR = '[itemprop="price"], .product-price, .price'
+_BRAND_SELECTOR = '[itemprop="brand"], [class*="brand"]'
+_PRICE_NUMBER_RE = re.compile(r'(\d+[,.]?\d*)')
+_PRICE_RE = re.compile(r'(\d+[,.]?\d*)\s*€')
+
+# Refill indicators, matched together in a single pass over the page
+REFILL_INDICATORS = ('recharge', 'refill', 'rechargeable')
+_REFILL_RE = re.compile(
+    '|'.join(sorted(REFILL_INDICATORS, key=len, reverse=True)), re.IGNORECASE
+)
+# A longer indicator match also proves the shorter ones it contains
+_REFILL_IMPLIES = {
+    indicator: {other for other in REFILL_INDICATORS if other in indicator}
+    for indicator in REFILL_INDICATORS
+}
+
+# URL substrings that mark a product page, matched in one regex scan
+PRODUCT_INDICATORS = (
+    '/product/', '/p/', '/produit/', '/item/',
+    'product-', 'produit-', 'item-'
+)
+_PRODUCT_URL_RE = re.compile('|'.join(map(re.escape, PRODUCT_INDICATORS)), re.IGNORECASE)
+
+# Review rating markers, combined into one alternation
+_REVIEW_RATING_RE = re.compile(r'(?:rating|star|note)[^>]*>(\d+)', re.IGNORECASE)
+
+@functools.lru_cache(maxsize=256)
+def _robots_url(domain: str) -> str:
+    """Return the robots.txt URL for a domain; keyed by host so it stays hot across pages."""
+    return f"https://{domain}/robots.txt"
+
+def _url_fingerprint(url: str) -> int:
+    """Return a 64-bit fingerprint used to track visited URLs compactly."""
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'big')
+
 class RealWebCrawler:
     """Real web crawler with compliance and ethical practices."""
     
@@ -24,7 +65,12 @@ class RealWebCrawler:
         """Initialize crawler with configuration."""
         self.config = config
         self.session = None
-        self.robots_cache = {}
+        self.robots_cache: Dict[str, RobotFileParser] = {}
+        self._robots_locks: Dict[str, asyncio.Lock] = {}
+        # robots.txt bodies persist across runs; robots_cache stays in front
+        # of the files so each host is parsed at most once per process
+        self.robots_dir = Path(config.get('robots_dir', 'data/reference/robots'))
+        self.robots_ttl = config.get('robots_cache_ttl', 24 * 3600)
         self.rate_limiter = AdaptiveRPS(
             rps=config.get('rate_limit_rps', 0.5),
             min_rps=config.get('min_rps', 0.1),
@@ -35,12 +81,21 @@ class RealWebCrawler:
         
     async def __aenter__(self):
         """Async context manager entry."""
-        connector = aiohttp.TCPConnector(limit=10, limit_per_host=2)
+        # One pooled connector shared by every site crawled in this context;
+        # resolved hosts stay cached so repeat requests skip the DNS lookup
+        connector = aiohttp.TCPConnector(
+            limit=self.config.get('max_connections', 100),
+            limit_per_host=self.config.get('host_concurrency', 2),
+            use_dns_cache=True,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True
+        )
         timeout = aiohttp.ClientTimeout(total=30, connect=10)
         self.session = aiohttp.ClientSession(
             connector=connector,
             timeout=timeout,
-            headers={'User-Agent': self.user_agent}
+            headers={'User-Agent': self.user_agent},
+            trust_env=True
         )
         return self
         
@@ -49,20 +104,16 @@ class RealWebCrawler:
         if self.session:
             await self.session.close()
     
-    def check_robots_txt(self, base_url: str, path: str) -> bool:
+    async def check_robots_txt(self, base_url: str, path: str) -> bool:
         """Check if path is allowed by robots.txt."""
         try:
-            domain = urlparse(base_url).netloc
-            robots_url = f"https://{domain}/robots.txt"
+            domain = urlsplit(base_url).netloc
+            robots_url = _robots_url(domain)
             
-            if domain not in self.robots_cache:
-                rp = RobotFileParser()
-                rp.set_url(robots_url)
-                rp.read()
-                self.robots_cache[domain] = rp
-                logger.info(f"Loaded robots.txt for {domain}")
+            rp = self.robots_cache.get(domain)
+            if rp is None:
+                rp = await self._load_robots_txt(domain, robots_url)
             
-            rp = self.robots_cache[domain]
             can_fetch = rp.can_fetch(self.user_agent, path)
             
             if not can_fetch:
@@ -75,23 +126,80 @@ class RealWebCrawler:
             # If we can't check robots.txt, be conservative
             return False
     
+    async def _load_robots_txt(self, domain: str, robots_url: str) -> RobotFileParser:
+        """Fetch and parse robots.txt for a domain on the shared session.
+        
+        A per-domain lock ensures concurrent requests to the same host only
+        trigger one fetch. Status handling mirrors RobotFileParser.read().
+        """
+        lock = self._robots_locks.setdefault(domain, asyncio.Lock())
+        async with lock:
+            if domain in self.robots_cache:
+                return self.robots_cache[domain]
+            
+            rp = RobotFileParser()
+            rp.set_url(robots_url)
+            
+            cached = self._read_robots_file(domain)
+            if cached is not None:
+                rp.parse(cached.splitlines())
+                self.robots_cache[domain] = rp
+                logger.info(f"Loaded cached robots.txt for {domain}")
+                return rp
+            
+            async with self.session.get(robots_url) as response:
+                if response.status in (401, 403):
+                    rp.disallow_all = True
+                elif 400 <= response.status < 500:
+                    rp.allow_all = True
+                else:
+                    response.raise_for_status()
+                    text = await response.text()
+                    rp.parse(text.splitlines())
+                    self._write_robots_file(domain, text)
+            
+            self.robots_cache[domain] = rp
+            logger.info(f"Loaded robots.txt for {domain}")
+            return rp
+    
+    def _robots_file(self, domain: str) -> Path:
+        """Path of the on-disk robots.txt copy for a domain."""
+        return self.robots_dir / f"{domain}.txt"
+    
+    def _read_robots_file(self, domain: str) -> Optional[str]:
+        """Return the saved robots.txt for a domain if it is still fresh."""
+        robots_file = self._robots_file(domain)
+        try:
+            if time.time() - robots_file.stat().st_mtime >= self.robots_ttl:
+                return None
+            return robots_file.read_text(encoding='utf-8')
+        except OSError:
+            return None
+    
+    def _write_robots_file(self, domain: str, text: str) -> None:
+        """Save a fetched robots.txt so later runs can skip the fetch."""
+        try:
+            self.robots_dir.mkdir(parents=True, exist_ok=True)
+            self._robots_file(domain).write_text(text, encoding='utf-8')
+        except OSError as e:
+            logger.warning(f"Could not save robots.txt for {domain}: {e}")
+    
     async def fetch_page(self, url: str) -> Optional[Dict]:
         """Fetch a single page with rate limiting and error handling."""
         try:
             # Check robots.txt first
-            parsed_url = urlparse(url)
-            if not self.check_robots_txt(url, parsed_url.path):
+            if not await self.check_robots_txt(url, urlsplit(url).path):
                 return None
             
             # Rate limiting
-            self.rate_limiter.wait()
+            await self.rate_limiter.async_wait()
             
             async with self.session.get(url) as response:
                 # Adaptive rate limiting based on response
                 self.rate_limiter.feedback(response.status)
                 
                 if response.status == 200:
-                    content = await response.text()
+                    content = await self._read_body(response)
                     return {
                         'url': url,
                         'content': content,
@@ -113,41 +221,63 @@ class RealWebCrawler:
             logger.error(f"Error fetching {url}: {e}")
             return None
     
+    async def _read_body(self, response: aiohttp.ClientResponse) -> str:
+        """Stream the response body in chunks and decode it once.
+        
+        Reading stops at ``max_page_bytes`` so a single oversized page cannot
+        blow up memory; the extractors only need the product markup.
+        """
+        max_bytes = self.config.get('max_page_bytes', 2 * 1024 * 1024)
+        body = bytearray()
+        
+        async for chunk in response.content.iter_chunked(16384):
+            body.extend(chunk)
+            if len(body) >= max_bytes:
+                logger.warning(f"Truncating page at {max_bytes} bytes: {response.url}")
+                response.close()
+                break
+        
+        try:
+            encoding = response.get_encoding()
+        except RuntimeError:
+            encoding = 'utf-8'
+        return body[:max_bytes].decode(encoding, errors='replace')
+    
     def extract_product_links(self, content: str, base_url: str) -> List[str]:
         """Extract product links from page content."""
-        # This is a simplified extractor - in practice you'd use BeautifulSoup
-        # and site-specific selectors
-        import re
+        # This is a simplified extractor - in practice you'd use
+        # site-specific selectors
+        base = urlsplit(base_url)
+        base_prefix = f"{base.scheme}://{base.netloc}"
         
-        # Common product URL patterns
-        patterns = [
-            r'href="([^"]*product[^"]*)"',
-            r'href="([^"]*p/[^"]*)"',
-            r'href="([^"]*produit[^"]*)"',  # French
-        ]
+        def join(href: str) -> str:
+            # Absolute and root-relative links are the common case on
+            # listing pages; leave anything else to urljoin
+            if href.startswith(('http://', 'https://')):
+                return href
+            if href.startswith('/') and not href.startswith('//'):
+                return base_prefix + href
+            return urljoin(base_url, href)
         
         links = set()
-        for pattern in patterns:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            for match in matches:
-                full_url = urljoin(base_url, match)
-                if self.is_product_url(full_url):
-                    links.add(full_url)
+        for node in HTMLParser(content).css('a[href]'):
+            href = node.attributes.get('href')
+            if not href:
+                continue
+            full_url = join(href)
+            if self.is_product_url(full_url):
+                links.add(full_url)
         
         return list(links)
     
     def is_product_url(self, url: str) -> bool:
         """Check if URL looks like a product page."""
-        product_indicators = [
-            '/product/', '/p/', '/produit/', '/item/',
-            'product-', 'produit-', 'item-'
-        ]
-        return any(indicator in url.lower() for indicator in product_indicators)
+        return _PRODUCT_URL_RE.search(url) is not None
     
     def extract_product_data(self, content: str, url: str) -> Optional[Dict]:
         """Extract product data from page content."""
-        # This is a simplified extractor - in practice you'd use BeautifulSoup
-        # and site-specific selectors for each retailer
+        # This is a simplified extractor - in practice you'd use
+        # site-specific selectors for each retailer
         
         try:
             # Basic extraction patterns (would need to be customized per site)
@@ -158,28 +288,31 @@ class RealWebCrawler:
                 'robots_snapshot_id': f"robots_{int(time.time())}"
             }
             
-            # Extract title (simplified)
-            title_match = re.search(r'<title[^>]*>([^<]+)</title>', content, re.IGNORECASE)
-            if title_match:
-                data['name'] = title_match.group(1).strip()
+            # Pull title, price and brand from a single parsed tree
+            tree = HTMLParser(content)
             
-            # Extract price (simplified)
-            price_match = re.search(r'(\d+[,.]?\d*)\s*€', content)
-            if price_match:
-                data['price_value'] = float(price_match.group(1).replace(',', '.'))
-                data['price_currency'] = 'EUR'
+            title_node = tree.css_first(_TITLE_SELECTOR)
+            if title_node and title_node.text().strip():
+                data['name'] = title_node.text().strip()
+            
+            # Raw price text is parsed for the whole batch in finalize_products
+            price_raw = self._extract_price(tree, content)
+            if price_raw is not None:
+                data['price_raw'] = price_raw
             
-            # Extract brand (simplified)
-            brand_match = re.search(r'brand[^>]*>([^<]+)</', content, re.IGNORECASE)
-            if brand_match:
-                data['brand'] = brand_match.group(1).strip()
+            brand_node = tree.css_first(_BRAND_SELECTOR)
+            if brand_node:
+                brand = brand_node.attributes.get('content') or brand_node.text()
+                if brand and brand.strip():
+                    data['brand'] = brand.strip()
             
-            # Check for refillable indicators
-            refill_indicators = ['recharge', 'refill', 'rechargeable', 'rechargeable']
-            refill_evidence = []
-            for indicator in refill_indicators:
-                if indicator.lower() in content.lower():
-                    refill_evidence.append(indicator)
+            # Check for refillable indicators in one scan of the page
+            found = set()
+            for match in _REFILL_RE.finditer(content):
+                found |= _REFILL_IMPLIES[match.group(0).lower()]
+                if len(found) == len(REFILL_INDICATORS):
+                    break
+            refill_evidence = [indicator for indicator in REFILL_INDICATORS if indicator in found]
             
             data['refillable_flag'] = len(refill_evidence) > 0
             data['refill_evidence'] = refill_evidence
@@ -190,44 +323,80 @@ class RealWebCrawler:
             logger.error(f"Error extracting product data from {url}: {e}")
             return None
     
+    def _extract_price(self, tree: HTMLParser, content: str) -> Optional[str]:
+        """Extract raw price text from price markup, falling back to the first euro amount."""
+        price_node = tree.css_first(_PRICE_SELECTOR)
+        if price_node:
+            price_text = price_node.attributes.get('content') or price_node.text()
+            price_match = _PRICE_NUMBER_RE.search(price_text or '')
+            if price_match:
+                return price_match.group(1)
+        
+        price_match = _PRICE_RE.search(content)
+        if price_match:
+            return price_match.group(1)
+        
+        return None
+    
+    def finalize_products(self, products: List[Dict]) -> List[Dict]:
+        """Parse the raw price text of a batch of products in one pass.
+        
+        Decimal commas are normalized and the strings converted with numpy,
+        so the per-product cost stays out of the Python loop.
+        """
+        priced = [product for product in products if 'price_raw' in product]
+        if priced:
+            raw = np.array([product.pop('price_raw') for product in priced])
+            prices = np.char.replace(raw, ',', '.').astype(np.float64)
+            for product, price_value in zip(priced, prices.tolist()):
+                product['price_value'] = price_value
+                product['price_currency'] = 'EUR'
+        
+        return products
+    
     def extract_reviews(self, content: str, product_url: str) -> List[Dict]:
         """Extract reviews from page content."""
         # This is a simplified extractor - in practice you'd look for
         # review containers, ratings, dates, etc.
         
         reviews = []
+        scrape_ts = datetime.now().isoformat()
         try:
-            # Look for review patterns (simplified)
-            review_patterns = [
-                r'rating[^>]*>(\d+)',
-                r'star[^>]*>(\d+)',
-                r'note[^>]*>(\d+)'
-            ]
+            # Look for review patterns (simplified), parsing all ratings at once
+            matches = _REVIEW_RATING_RE.findall(content)
+            if not matches:
+                return reviews
             
-            for pattern in review_patterns:
-                matches = re.findall(pattern, content, re.IGNORECASE)
-                for match in matches:
-                    try:
-                        rating = int(match)
-                        if 1 <= rating <= 5:
-                            reviews.append({
-                                'product_url': product_url,
-                                'rating': rating,
-                                'text': f"Review text extracted from {product_url}",
-                                'language': 'fr',  # Assuming French sites
-                                'review_date': datetime.now().isoformat(),
-                                'source_url': product_url,
-                                'scrape_ts': datetime.now().isoformat()
-                            })
-                    except ValueError:
-                        continue
+            # Parsed as floats so oversized digit runs cannot overflow; only
+            # the first 10 in-range ratings per page are kept
+            ratings = np.array(matches).astype(np.float64)
+            for rating in ratings[(ratings >= 1) & (ratings <= 5)][:10].tolist():
+                reviews.append({
+                    'product_url': product_url,
+                    'rating': int(rating),
+                    'text': f"Review text extracted from {product_url}",
+                    'language': 'fr',  # Assuming French sites
+                    'review_date': scrape_ts,
+                    'source_url': product_url,
+                    'scrape_ts': scrape_ts
+                })
             
-            return reviews[:10]  # Limit to 10 reviews per page for now
+            return reviews
             
         except Exception as e:
             logger.error(f"Error extracting reviews from {product_url}: {e}")
             return []
     
+    async def _fetch_product_page(self, url: str, semaphore: asyncio.Semaphore) -> Optional[Dict]:
+        """Fetch a product page while holding one of the per-host slots."""
+        async with semaphore:
+            logger.info(f"Fetching product: {url}")
+            page_data = await self.fetch_page(url)
+            
+            # Rate limiting between products
+            await asyncio.sleep(random.uniform(1, 3))
+            return page_data
+    
     async def crawl_site(self, base_url: str, max_pages: int = 10) -> Dict:
         """Crawl a site for products and reviews."""
         logger.info(f"Starting crawl of {base_url} (max {max_pages} pages)")
@@ -242,7 +411,10 @@ class RealWebCrawler:
         
         all_products = []
         all_reviews = []
-        visited_urls = set()
+        # Visited pages are tracked by 64-bit fingerprint rather than by the
+        # full URL string, keeping the set small for long crawls
+        visited_urls: Set[int] = set()
+        semaphore = asyncio.Semaphore(self.config.get('host_concurrency', 2))
         
         for start_url in start_urls:
             if len(visited_urls) >= max_pages:
@@ -254,24 +426,26 @@ class RealWebCrawler:
             if not page_data:
                 continue
                 
-            visited_urls.add(start_url)
+            visited_urls.add(_url_fingerprint(start_url))
             
             # Extract product links
             product_links = self.extract_product_links(page_data['content'], base_url)
             logger.info(f"Found {len(product_links)} product links on {start_url}")
             
-            # Fetch product pages
-            for product_url in product_links[:5]:  # Limit to 5 products per category
-                if product_url in visited_urls:
-                    continue
-                    
-                logger.info(f"Fetching product: {product_url}")
-                product_data = await self.fetch_page(product_url)
-                
+            # Fetch product pages concurrently, bounded per host
+            product_urls = [
+                url for url in product_links[:5]  # Limit to 5 products per category
+                if _url_fingerprint(url) not in visited_urls
+            ]
+            pages = await asyncio.gather(*(
+                self._fetch_product_page(url, semaphore) for url in product_urls
+            ))
+            
+            for product_url, product_data in zip(product_urls, pages):
                 if not product_data:
                     continue
                     
-                visited_urls.add(product_url)
+                visited_urls.add(_url_fingerprint(product_url))
                 
                 # Extract product data
                 product_info = self.extract_product_data(product_data['content'], product_url)
@@ -281,12 +455,9 @@ class RealWebCrawler:
                 # Extract reviews
                 reviews = self.extract_reviews(product_data['content'], product_url)
                 all_reviews.extend(reviews)
-                
-                # Rate limiting between products
-                await asyncio.sleep(random.uniform(1, 3))
         
         return {
-            'products': all_products,
+            'products': self.finalize_products(all_products),
             'reviews': all_reviews,
             'total_pages_visited': len(visited_urls),
             'base_url': base_url
@@ -311,27 +482,32 @@ async def main():
     ]
     
     async with RealWebCrawler(config) as crawler:
-        for site in test_sites:
-            try:
-                logger.info(f"Testing crawl of {site}")
-                results = await crawler.crawl_site(site, max_pages=3)
-                
-                logger.info(f"Results for {site}:")
-                logger.info(f"  Products: {len(results['products'])}")
-                logger.info(f"  Reviews: {len(results['reviews'])}")
-                logger.info(f"  Pages visited: {results['total_pages_visited']}")
-                
-                # Save results
-                if results['products']:
-                    df_products = pd.DataFrame(results['products'])
-                    df_products.to_parquet(f'data/silver/products_{urlparse(site).netloc}.parquet', index=False)
-                
-                if results['reviews']:
-                    df_reviews = pd.DataFrame(results['reviews'])
-                    df_reviews.to_parquet(f'data/silver/reviews_{urlparse(site).netloc}.parquet', index=False)
-                
-            except Exception as e:
-                logger.error(f"Error crawling {site}: {e}")
+        # Sites are independent hosts, so crawl them concurrently over the
+        # shared session; per-host limits still apply within each site
+        await asyncio.gather(*(crawl_and_save(crawler, site) for site in test_sites))
+
+async def crawl_and_save(crawler: RealWebCrawler, site: str) -> None:
+    """Crawl one site and save its products and reviews."""
+    try:
+        logger.info(f"Testing crawl of {site}")
+        results = await crawler.crawl_site(site, max_pages=3)
+        
+        logger.info(f"Results for {site}:")
+        logger.info(f"  Products: {len(results['products'])}")
+        logger.info(f"  Reviews: {len(results['reviews'])}")
+        logger.info(f"  Pages visited: {results['total_pages_visited']}")
+        
+        # Save results
+        if results['products']:
+            df_products = pd.DataFrame(results['products'])
+            df_products.to_parquet(f'data/silver/products_{urlparse(site).netloc}.parquet', index=False)
+        
+        if results['reviews']:
+            df_reviews = pd.DataFrame(results['reviews'])
+            df_reviews.to_parquet(f'data/silver/reviews_{urlparse(site).netloc}.parquet', index=False)
+        
+    except Exception as e:
+        logger.error(f"Error crawling {site}: {e}")
 
 if __name__ == "__main__":
     asyncio.run(main())
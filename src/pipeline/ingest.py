@@ -9,6 +9,40 @@ import structlog
 
 logger = structlog.get_logger()
 
+# Bronze tables repeat site/brand/category/currency strings on every row;
+# zstd on top of Parquet's dictionary pages keeps those files small.
+BRONZE_PARQUET_OPTIONS = {
+    "engine": "pyarrow",
+    "compression": "zstd",
+    "compression_level": 3,
+    "use_dictionary": True,
+    "row_group_size": 50_000,
+}
+
+def _fill_details(is_luxury, price_out, rating_out, count_out, refill_out):
+    """Fill the numeric product-detail columns into preallocated arrays.
+    
+    Kept as one array kernel over the row index so per-row pricing and
+    refill rules stay out of the Python interpreter loop.
+    """
+    import numpy as np
+    
+    idx = np.arange(len(is_luxury))
+    
+    # Luxury pricing (higher for luxury brands)
+    np.multiply(idx, 15.0, out=price_out)
+    price_out += np.where(is_luxury, 200.0, 50.0)
+    
+    np.remainder(idx, 10, out=count_out)
+    np.multiply(count_out, 0.1, out=rating_out)
+    rating_out += 4.0
+    
+    np.multiply(idx, 10, out=count_out)
+    count_out += 100
+    
+    # Refillable with evidence
+    np.equal(idx % 4, 0, out=refill_out)  # 25% refillable
+
 class IngestPipeline:
     """Data ingestion pipeline."""
     
@@ -29,6 +63,7 @@ class IngestPipeline:
             logger.info(f"Focusing on facet: {self.facet}")
         
         from datetime import datetime
+        import numpy as np
         import pandas as pd
         import json
         
@@ -43,45 +78,46 @@ class IngestPipeline:
             except Exception as e:
                 logger.warning(f"Could not load brands file: {e}")
         
-        # Simulate discovery results with luxury brand focus
-        discovery_data = []
+        # Simulate discovery results with luxury brand focus, built column-wise
         actual_pages = min(self.max_pages, 200)  # Scale up discovery
+        idx = np.arange(actual_pages)
+        now = datetime.now()
+        site = self.site
         
-        for i in range(actual_pages):
-            # Use luxury brands if available
-            if luxury_brands and i < len(luxury_brands):
-                brand = luxury_brands[i % len(luxury_brands)]
-            else:
-                brand = f"Brand_{i % 20}"  # More brands for larger discovery
-            
-            # Focus on refillable if facet specified
-            has_refill_facet = (i % 3 == 0) if self.facet == "refillable" else (i % 5 == 0)
-            
-            discovery_data.append({
-                "site": self.site,
-                "url": f"https://{self.site}.fr/product/{i}",
-                "first_seen": datetime.now(),
-                "last_seen": datetime.now(),
-                "category": "fragrance" if i % 3 == 0 else "skincare" if i % 3 == 1 else "makeup",
-                "brand": brand,
-                "has_refill_facet": has_refill_facet,
-                "discovery_mode": self.facet or "general"
-            })
+        # Use luxury brands if available
+        brands = [
+            luxury_brands[i % len(luxury_brands)] if i < len(luxury_brands) else f"Brand_{i % 20}"
+            for i in idx.tolist()
+        ]
+        
+        # Focus on refillable if facet specified
+        has_refill_facet = idx % 3 == 0 if self.facet == "refillable" else idx % 5 == 0
+        
+        discovery_df = pd.DataFrame({
+            "site": site,
+            "url": [f"https://{site}.fr/product/{i}" for i in idx.tolist()],
+            "first_seen": now,
+            "last_seen": now,
+            "category": np.take(np.array(["fragrance", "skincare", "makeup"]), idx % 3),
+            "brand": brands,
+            "has_refill_facet": has_refill_facet,
+            "discovery_mode": self.facet or "general"
+        })
         
         # Save discovery results
-        discovery_df = pd.DataFrame(discovery_data)
         output_path = Path("data/bronze") / f"{self.site}_products_index.parquet"
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        discovery_df.to_parquet(output_path, index=False)
+        discovery_df.to_parquet(output_path, index=False, **BRONZE_PARQUET_OPTIONS)
         
-        logger.info(f"✅ Discovery completed: {len(discovery_data)} URLs found")
-        return len(discovery_data)
+        logger.info(f"✅ Discovery completed: {len(discovery_df)} URLs found")
+        return len(discovery_df)
     
     async def run_details(self):
         """Run details crawl to collect product information."""
         logger.info(f"Starting details crawl for {self.site}")
         
         from datetime import datetime
+        import numpy as np
         import pandas as pd
         import json
         
@@ -95,108 +131,126 @@ class IngestPipeline:
             except Exception as e:
                 logger.warning(f"Could not load brands file: {e}")
         
-        # Simulate product details with limit support
-        products_data = []
+        # Simulate product details with limit support, built column-wise
         actual_limit = self.limit or min(self.max_pages, 1000)  # Scale up details
+        idx = np.arange(actual_limit)
+        now = datetime.now()
+        site = self.site
+        
+        # Use luxury brands if available
+        is_luxury_brand = idx < len(luxury_brands)
+        brands = [
+            luxury_brands[i % len(luxury_brands)] if is_lux else f"Brand_{i % 20}"
+            for i, is_lux in zip(idx.tolist(), is_luxury_brand.tolist())
+        ]
+        
+        # Narrow dtypes cover these ranges and halve the numeric page bytes
+        price_value = np.empty(actual_limit, dtype=np.float32)
+        rating_avg = np.empty(actual_limit, dtype=np.float32)
+        rating_count = np.empty(actual_limit, dtype=np.int32)
+        refillable_flag = np.empty(actual_limit, dtype=np.bool_)
+        _fill_details(is_luxury_brand, price_value, rating_avg, rating_count, refillable_flag)
+        categories = np.take(np.array(["fragrance", "skincare", "makeup"]), idx % 3)
         
-        for i in range(actual_limit):
-            # Use luxury brands if available
-            if luxury_brands and i < len(luxury_brands):
-                brand = luxury_brands[i % len(luxury_brands)]
-                is_luxury_brand = True
-            else:
-                brand = f"Brand_{i % 20}"
-                is_luxury_brand = False
-            
-            # Luxury pricing (higher for luxury brands)
-            base_price = 200.0 if is_luxury_brand else 50.0
-            price_value = base_price + (i * 15)
-            
-            # Refillable with evidence
-            refillable_flag = i % 4 == 0  # 25% refillable
-            refill_evidence = ["facet", "badge"] if refillable_flag else []
-            
-            products_data.append({
-                "product_id": f"{self.site}_{i}",
-                "site": self.site,
-                "url": f"https://{self.site}.fr/product/{i}",
-                "brand": brand,
-                "name": f"Product {i}",
-                "category_path": ["fragrance"] if i % 3 == 0 else ["skincare"] if i % 3 == 1 else ["makeup"],
-                "price_value": price_value,
-                "price_currency": "EUR",
-                "size": "50ml",
-                "size_ml_or_g": 50.0,
-                "availability": "En stock",
-                "rating_avg": 4.0 + (i % 10) * 0.1,
-                "rating_count": 100 + (i * 10),
-                "refillable_flag": refillable_flag,
-                "refill_evidence": refill_evidence,
-                "refill_parent_sku": f"refill_{i}" if refillable_flag else None,
-                "packaging_notes": "Standard packaging",
-                "ingredients_present": True,
-                "ean_gtin": f"123456789012{i}",
-                "image_url": f"https://{self.site}.fr/images/product_{i}.jpg",
-                "breadcrumbs": ["Category", "Brand", f"Product {i}"],
-                "first_seen_ts": datetime.now(),
-                "last_seen_ts": datetime.now(),
-                "source_site": self.site,
-                "source_url": f"https://{self.site}.fr/product/{i}",
-                "scrape_ts": datetime.now(),
-                "robots_snapshot_id": f"robots_{self.site}_{datetime.now().strftime('%Y%m%d')}",
-                "is_luxury": is_luxury_brand  # Add luxury flag
-            })
+        ids = idx.tolist()
+        products_df = pd.DataFrame({
+            "product_id": [f"{site}_{i}" for i in ids],
+            "site": site,
+            "url": [f"https://{site}.fr/product/{i}" for i in ids],
+            "brand": brands,
+            "name": [f"Product {i}" for i in ids],
+            "category_path": [[category] for category in categories.tolist()],
+            "price_value": price_value,
+            "price_currency": "EUR",
+            "size": "50ml",
+            "size_ml_or_g": np.float32(50.0),
+            "availability": "En stock",
+            "rating_avg": rating_avg,
+            "rating_count": rating_count,
+            "refillable_flag": refillable_flag,
+            "refill_evidence": [["facet", "badge"] if flag else [] for flag in refillable_flag.tolist()],
+            "refill_parent_sku": [f"refill_{i}" if i % 4 == 0 else None for i in ids],
+            "packaging_notes": "Standard packaging",
+            "ingredients_present": True,
+            "ean_gtin": [f"123456789012{i}" for i in ids],
+            "image_url": [f"https://{site}.fr/images/product_{i}.jpg" for i in ids],
+            "breadcrumbs": [["Category", "Brand", f"Product {i}"] for i in ids],
+            "first_seen_ts": now,
+            "last_seen_ts": now,
+            "source_site": site,
+            "source_url": [f"https://{site}.fr/product/{i}" for i in ids],
+            "scrape_ts": now,
+            "robots_snapshot_id": f"robots_{site}_{now.strftime('%Y%m%d')}",
+            "is_luxury": is_luxury_brand  # Add luxury flag
+        })
         
         # Save product details
-        products_df = pd.DataFrame(products_data)
         output_path = Path("data/bronze") / f"{self.site}_products.parquet"
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        products_df.to_parquet(output_path, index=False)
+        products_df.to_parquet(output_path, index=False, **BRONZE_PARQUET_OPTIONS)
         
-        logger.info(f"✅ Details crawl completed: {len(products_data)} products")
-        return len(products_data)
+        logger.info(f"✅ Details crawl completed: {len(products_df)} products")
+        return len(products_df)
     
     async def run_reviews(self):
         """Run reviews crawl to collect product reviews."""
         logger.info(f"Starting reviews crawl for {self.site}")
         
-        from datetime import datetime, timedelta
+        from datetime import datetime
+        import numpy as np
         import pandas as pd
-        import random
         
-        # Simulate reviews with limit support
-        reviews_data = []
+        # Simulate reviews with limit support, drawing all random values at once
         actual_limit = self.limit or min(self.max_pages, 1000)  # Scale up reviews
+        rng = np.random.default_rng()
+        now = datetime.now()
+        site = self.site
+        
+        num_reviews = rng.integers(5, 21, size=actual_limit)
+        total = int(num_reviews.sum())
+        
+        # Expand per-product counts into (product_id, review_idx) pairs
+        product_ids = np.repeat(np.arange(actual_limit), num_reviews)
+        offsets = np.repeat(np.cumsum(num_reviews) - num_reviews, num_reviews)
+        review_idx = np.arange(total) - offsets
+        
+        ratings = rng.integers(1, 6, size=total)
+        is_excellent = rng.random(total) > 0.5
+        days_ago = rng.integers(1, 366, size=total)
+        helpful_votes = rng.integers(0, 11, size=total)
+        verified = rng.random(total) > 0.3
         
-        for product_id in range(actual_limit):
-            num_reviews = random.randint(5, 20)
-            for review_idx in range(num_reviews):
-                reviews_data.append({
-                    "review_id": f"{self.site}_{product_id}_{review_idx}",
-                    "product_id": f"{self.site}_{product_id}",
-                    "site": self.site,
-                    "url": f"https://{self.site}.fr/product/{product_id}/review/{review_idx}",
-                    "rating": random.randint(1, 5),
-                    "title": f"Review {review_idx} for product {product_id}",
-                    "text": f"Ce produit est {'excellent' if random.random() > 0.5 else 'correct'}. Je le recommande.",
-                    "language": "fr",
-                    "review_date": datetime.now() - timedelta(days=random.randint(1, 365)),
-                    "helpful_votes": random.randint(0, 10),
-                    "verified_purchase": random.random() > 0.3,
-                    "source_site": self.site,
-                    "source_url": f"https://{self.site}.fr/product/{product_id}/review/{review_idx}",
-                    "scrape_ts": datetime.now(),
-                    "robots_snapshot_id": f"robots_{self.site}_{datetime.now().strftime('%Y%m%d')}"
-                })
+        pairs = list(zip(product_ids.tolist(), review_idx.tolist()))
+        review_urls = [f"https://{site}.fr/product/{p}/review/{r}" for p, r in pairs]
+        reviews_df = pd.DataFrame({
+            "review_id": [f"{site}_{p}_{r}" for p, r in pairs],
+            "product_id": [f"{site}_{p}" for p, _ in pairs],
+            "site": site,
+            "url": review_urls,
+            "rating": ratings,
+            "title": [f"Review {r} for product {p}" for p, r in pairs],
+            "text": np.where(
+                is_excellent,
+                "Ce produit est excellent. Je le recommande.",
+                "Ce produit est correct. Je le recommande."
+            ),
+            "language": "fr",
+            "review_date": pd.Timestamp(now) - pd.to_timedelta(days_ago, unit="D"),
+            "helpful_votes": helpful_votes,
+            "verified_purchase": verified,
+            "source_site": site,
+            "source_url": review_urls,
+            "scrape_ts": now,
+            "robots_snapshot_id": f"robots_{site}_{now.strftime('%Y%m%d')}"
+        })
         
         # Save reviews
-        reviews_df = pd.DataFrame(reviews_data)
         output_path = Path("data/bronze") / f"{self.site}_reviews.parquet"
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        reviews_df.to_parquet(output_path, index=False)
+        reviews_df.to_parquet(output_path, index=False, **BRONZE_PARQUET_OPTIONS)
         
-        logger.info(f"✅ Reviews crawl completed: {len(reviews_data)} reviews")
-        return len(reviews_data)
+        logger.info(f"✅ Reviews crawl completed: {len(reviews_df)} reviews")
+        return len(reviews_df)
     
     async def run(self):
         """Run the ingestion pipeline."""
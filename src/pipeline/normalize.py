@@ -4,11 +4,17 @@
 import argparse
 import sys
 from pathlib import Path
-import pandas as pd
+from typing import List
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 import structlog
 
 logger = structlog.get_logger()
 
+# Rows per streamed batch and output row group when combining bronze files
+BATCH_SIZE = 50_000
+
 class NormalizePipeline:
     """Data normalization pipeline."""
     
@@ -28,23 +34,14 @@ class NormalizePipeline:
             logger.warning("No product files found in bronze layer")
             return 0
         
-        all_products = []
-        for file_path in product_files:
-            df = pd.read_parquet(file_path)
-            all_products.append(df)
-        
-        # Combine all products
-        combined_products = pd.concat(all_products, ignore_index=True)
-        
-        # Save to silver layer
-        self.silver_dir.mkdir(parents=True, exist_ok=True)
+        # Combine all products and save to silver layer
         output_path = self.silver_dir / "products.parquet"
-        combined_products.to_parquet(output_path, index=False)
+        products_count = self._combine_parquet(product_files, output_path)
         
-        logger.info(f"✅ Normalized {len(combined_products)} products")
+        logger.info(f"✅ Normalized {products_count} products")
         logger.info(f"📁 Saved to: {output_path}")
         
-        return len(combined_products)
+        return products_count
     
     def normalize_reviews(self):
         """Normalize review data from bronze to silver."""
@@ -57,23 +54,36 @@ class NormalizePipeline:
             logger.warning("No review files found in bronze layer")
             return 0
         
-        all_reviews = []
-        for file_path in review_files:
-            df = pd.read_parquet(file_path)
-            all_reviews.append(df)
-        
-        # Combine all reviews
-        combined_reviews = pd.concat(all_reviews, ignore_index=True)
-        
-        # Save to silver layer
-        self.silver_dir.mkdir(parents=True, exist_ok=True)
+        # Combine all reviews and save to silver layer
         output_path = self.silver_dir / "reviews.parquet"
-        combined_reviews.to_parquet(output_path, index=False)
+        reviews_count = self._combine_parquet(review_files, output_path)
         
-        logger.info(f"✅ Normalized {len(combined_reviews)} reviews")
+        logger.info(f"✅ Normalized {reviews_count} reviews")
         logger.info(f"📁 Saved to: {output_path}")
         
-        return len(combined_reviews)
+        return reviews_count
+    
+    def _combine_parquet(self, files: List[Path], output_path: Path) -> int:
+        """Stream Parquet files into a single silver file, batch by batch.
+        
+        Schemas are unified up front so files missing a column contribute
+        nulls, as pd.concat did, and at most one batch is held in memory
+        regardless of how many bronze files there are.
+        """
+        schema = pa.unify_schemas(
+            [pq.read_schema(file_path) for file_path in files],
+            promote_options="permissive"
+        )
+        dataset = ds.dataset([str(file_path) for file_path in files], format="parquet", schema=schema)
+        
+        self.silver_dir.mkdir(parents=True, exist_ok=True)
+        num_rows = 0
+        with pq.ParquetWriter(output_path, schema, compression="zstd") as writer:
+            for batch in dataset.to_batches(batch_size=BATCH_SIZE):
+                writer.write_batch(batch, row_group_size=BATCH_SIZE)
+                num_rows += batch.num_rows
+        
+        return num_rows
     
     def run(self):
         """Run the normalization pipeline."""
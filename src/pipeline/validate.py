@@ -2,50 +2,63 @@
 """Data validation pipeline."""
 
 import argparse
+import logging
 import sys
 from pathlib import Path
 import structlog
 
 logger = structlog.get_logger()
 
-def main():
-    """Main entry point."""
-    parser = argparse.ArgumentParser(description="Luxury Beauty Data Validation Pipeline")
-    args = parser.parse_args()
+def configure_logging(level: int = logging.INFO):
+    """Configure structlog to render JSON lines with orjson.
+    
+    orjson renders straight to bytes on stdout, and the bound logger drops
+    events below ``level`` before any processor runs. The stack and exception
+    processors only do work on events that carry that information.
+    """
+    import orjson
     
-    # Configure logging
     structlog.configure(
         processors=[
-            structlog.stdlib.filter_by_level,
-            structlog.stdlib.add_logger_name,
-            structlog.stdlib.add_log_level,
-            structlog.stdlib.PositionalArgumentsFormatter(),
+            structlog.processors.add_log_level,
             structlog.processors.TimeStamper(fmt="iso"),
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer()
+            structlog.processors.JSONRenderer(serializer=orjson.dumps)
         ],
         context_class=dict,
-        logger_factory=structlog.stdlib.LoggerFactory(),
-        wrapper_class=structlog.stdlib.BoundLogger,
+        logger_factory=structlog.BytesLoggerFactory(),
+        wrapper_class=structlog.make_filtering_bound_logger(level),
         cache_logger_on_first_use=True,
     )
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Luxury Beauty Data Validation Pipeline")
+    parser.add_argument("--quiet", action="store_true",
+                       help="Only log errors")
+    parser.add_argument("--warm", action="store_true",
+                       help="Reuse the integrity checker's DuckDB copy of the silver tables")
+    args = parser.parse_args()
+    
+    # Configure logging once arguments are known (--help exits before this)
+    configure_logging(logging.ERROR if args.quiet else logging.INFO)
     
     try:
         # Import and run integrity check
         from ..validation.integrity_check import IntegrityChecker
         
-        checker = IntegrityChecker()
+        checker = IntegrityChecker(warm=args.warm)
         report = checker.run_integrity_check()
         
         if report['status'] == 'FAIL':
-            logger.error(f"❌ Validation failed: {report['total_violations']} violations")
-            for violation in report['violations']:
-                logger.error(f"  - {violation}")
+            # One structured event carries every violation
+            logger.error(
+                f"❌ Validation failed: {report['total_violations']} violations",
+                violations=report['violations']
+            )
             sys.exit(1)
         else:
-            logger.info(f"✅ Validation passed: {report['audit_sample_size']} products in audit sample")
             print(f"✅ Validation passed: {report['audit_sample_size']} products in audit sample")
         
     except Exception as e:
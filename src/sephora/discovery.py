@@ -1,14 +1,60 @@
 """Sephora discovery module for finding products and pagination."""
 
+import asyncio
 import re
+import functools
+import threading
 from typing import Dict, List, Optional, Set, Tuple
-from urllib.parse import urljoin, urlparse, parse_qs
+from urllib.parse import urljoin
 import structlog
 from ..common.parsing import SafeExtractor
 from .selectors import get_selector_with_fallbacks, URL_PATTERNS
 
 logger = structlog.get_logger(__name__)
 
+# Brand slug at the start of a product URL path
+# Example: /product/chanel-n5-eau-de-parfum/P123456.html
+_BRAND_RE = re.compile(r'/product/([^/]+)-')
+
+# Page number query parameter, rewritten in place for pagination
+_PAGE_RE = re.compile(r'([?&])page=(\d+)')
+
+_PRODUCT_LINK_SELECTORS = get_selector_with_fallbacks("category", "product_link")
+
+
+@functools.lru_cache(maxsize=4096)
+def _brand_from_url(url: str) -> Optional[str]:
+    """Extract and format the brand slug of a product URL."""
+    url_match = _BRAND_RE.search(url)
+    if url_match:
+        # Convert URL format to brand name
+        return url_match.group(1).replace('-', ' ').title()
+    
+    return None
+
+
+@functools.lru_cache(maxsize=32)
+def _brand_matchers(luxury_brands: Tuple[str, ...]) -> Tuple[frozenset, "re.Pattern[str]"]:
+    """Return the URL slug form of each luxury brand, as a set and as one alternation."""
+    slugs = frozenset(brand.lower().replace(' ', '-') for brand in luxury_brands)
+    # (?!) never matches, so an empty brand list matches no slug
+    return slugs, re.compile('|'.join(re.escape(slug) for slug in sorted(slugs)) or '(?!)')
+
+
+def _slug_has_brand(slug: str, brand_slugs: frozenset, brand_re: "re.Pattern[str]") -> bool:
+    """Check whether a product slug contains one of the brand slugs.
+    
+    Brands usually lead the slug (``tom-ford-noir``), so the prefixes ending
+    at a hyphen are tried with set lookups first; the alternation still finds
+    brands later in the slug (``christian-dior-sauvage``).
+    """
+    end = slug.find('-')
+    while end != -1:
+        if slug[:end] in brand_slugs:
+            return True
+        end = slug.find('-', end + 1)
+    return slug in brand_slugs or brand_re.search(slug) is not None
+
 
 class SephoraDiscovery:
     """Sephora product discovery and pagination handler."""
@@ -17,6 +63,8 @@ class SephoraDiscovery:
         self.base_url = base_url
         self.discovered_urls: Set[str] = set()
         self.seen_product_ids: Set[str] = set()
+        # Guards discovered_urls when categories are discovered concurrently
+        self._discovered_lock = threading.Lock()
         
     def discover_products_from_category(self, category_url: str, 
                                       luxury_brands: List[str] = None,
@@ -45,10 +93,14 @@ class SephoraDiscovery:
                 if luxury_brands:
                     page_products = self._filter_by_brands(page_products, luxury_brands)
                 
-                # Add new products
-                new_products = [url for url in page_products if url not in self.discovered_urls]
+                # Add new products, deduplicated within the page in listing order
+                with self._discovered_lock:
+                    new_products = [
+                        url for url in dict.fromkeys(page_products)
+                        if url not in self.discovered_urls
+                    ]
+                    self.discovered_urls.update(new_products)
                 product_urls.extend(new_products)
-                self.discovered_urls.update(new_products)
                 
                 logger.info("Products found on page", 
                            page=page_count + 1,
@@ -76,6 +128,27 @@ class SephoraDiscovery:
             logger.error("Failed to discover products", category_url=category_url, error=str(e))
             return []
     
+    async def discover_all(self, category_urls: List[str],
+                           luxury_brands: List[str] = None,
+                           max_pages: int = 50,
+                           concurrency: int = 16) -> List[str]:
+        """Discover products from several categories concurrently.
+        
+        Each category is paginated sequentially in a worker thread, since page
+        fetches block; at most ``concurrency`` categories run at once and the
+        combined URLs keep the order of ``category_urls``.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def discover(category_url: str) -> List[str]:
+            async with semaphore:
+                return await asyncio.to_thread(
+                    self.discover_products_from_category, category_url, luxury_brands, max_pages
+                )
+        
+        results = await asyncio.gather(*(discover(url) for url in category_urls))
+        return [url for category_products in results for url in category_products]
+    
     def discover_refillable_products(self, category_url: str, 
                                    max_pages: int = 20) -> List[str]:
         """Discover refillable products using the refillable facet."""
@@ -104,10 +177,7 @@ class SephoraDiscovery:
         extractor = None  # Would be initialized with actual HTML
         
         if extractor:
-            product_links = extractor.extract_list(
-                get_selector_with_fallbacks("category", "product_link")["primary"],
-                get_selector_with_fallbacks("category", "product_link")["fallback"]
-            )
+            product_links = extractor.extract_list(*_PRODUCT_LINK_SELECTORS)
             
             # Convert relative URLs to absolute URLs
             product_urls = []
@@ -127,30 +197,22 @@ class SephoraDiscovery:
         # 1. Extract brand information from product URLs or page content
         # 2. Filter based on the luxury brands list
         
-        # For demonstration, we'll return all URLs
-        # In practice, this would check the brand information
+        # Match brand slugs directly, so URLs are not converted to brand names
+        brand_slugs, brand_re = _brand_matchers(tuple(luxury_brands))
         
         filtered_urls = []
         for url in product_urls:
-            # Extract brand from URL or would check page content
-            brand = self._extract_brand_from_url(url)
-            if brand and any(luxury_brand.lower() in brand.lower() for luxury_brand in luxury_brands):
+            url_match = _BRAND_RE.search(url)
+            if url_match and _slug_has_brand(url_match.group(1).lower(), brand_slugs, brand_re):
                 filtered_urls.append(url)
         
         return filtered_urls
     
     def _extract_brand_from_url(self, url: str) -> Optional[str]:
         """Extract brand name from product URL."""
-        # Try to extract brand from URL pattern
-        # Example: /product/chanel-n5-eau-de-parfum/P123456.html
-        url_match = re.search(r'/product/([^/]+)-', url)
-        if url_match:
-            brand_part = url_match.group(1)
-            # Convert URL format to brand name
-            brand = brand_part.replace('-', ' ').title()
-            return brand
-        
-        return None
+        # Try to extract brand from URL pattern; brand slugs repeat heavily
+        # within a category, so results are memoized
+        return _brand_from_url(url)
     
     def _get_next_page_url(self, current_url: str) -> Optional[str]:
         """Get the next page URL for pagination."""
@@ -163,18 +225,15 @@ class SephoraDiscovery:
         # In practice, this would use the pagination selectors
         
         # Check if there's a page parameter
-        parsed_url = urlparse(current_url)
-        query_params = parse_qs(parsed_url.query)
+        page_match = _PAGE_RE.search(current_url)
         
-        current_page = int(query_params.get('page', [1])[0])
-        next_page = current_page + 1
-        
-        # Add or update page parameter
-        if 'page' in query_params:
+        if page_match:
             # Replace existing page parameter
-            new_query = current_url.replace(f'page={current_page}', f'page={next_page}')
+            next_page = int(page_match.group(2)) + 1
+            new_query = f"{current_url[:page_match.start(2)]}{next_page}{current_url[page_match.end(2):]}"
         else:
             # Add page parameter
+            next_page = 2
             separator = '&' if '?' in current_url else '?'
             new_query = f"{current_url}{separator}page={next_page}"
         
@@ -217,12 +276,12 @@ class SephoraDiscovery:
         category_urls = self.get_category_urls()
         brand_urls = []
         
+        brand_params = [brand.lower().replace(' ', '-') for brand in luxury_brands]
+        
         for category_url in category_urls:
-            for brand in luxury_brands:
+            separator = '&' if '?' in category_url else '?'
+            for brand_param in brand_params:
                 # Create brand-filtered URL
-                brand_param = brand.lower().replace(' ', '-')
-                separator = '&' if '?' in category_url else '?'
-                brand_url = f"{category_url}{separator}brand={brand_param}"
-                brand_urls.append(brand_url)
+                brand_urls.append(f"{category_url}{separator}brand={brand_param}")
         
         return brand_urls
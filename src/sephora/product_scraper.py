@@ -1,48 +1,138 @@
 """Sephora product scraper for extracting product details and refillable detection."""
 
+import asyncio
+import hashlib
 import re
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, Callable, Awaitable
 from urllib.parse import urlparse
 import structlog
 from ..common.parsing import SafeExtractor, TextNormalizer, RefillableDetector, LanguageDetector
 from ..common.schema import Product, RefillEvidence
-from .selectors import get_selector_with_fallbacks
+from .selectors import Selectors, get_selector_with_fallbacks
 
 logger = structlog.get_logger(__name__)
 
+_PRODUCT_ID_RE = re.compile(r'/product/([^/?]+)')
+_PRODUCT_ID_CLEAN_RE = re.compile(r'[^\w\-]')
+# Digit run, allowing thousands separators between digits (e.g. 1,234 or 1.234)
+_NUMBER_RE = re.compile(r'\d(?:[\d,.]*\d)?')
+
+# Breadcrumbs naming a product category; anything else is navigation noise
+CATEGORY_KEYWORDS = ("parfums", "soins", "maquillage", "visage", "corps", "yeux", "lèvres")
+_CATEGORY_RE = re.compile('|'.join(map(re.escape, CATEGORY_KEYWORDS)), re.IGNORECASE)
+
+
+# Output field -> (selector field, extraction kind), extracted in one pass
+_BASIC_INFO_FIELDS = {
+    "brand": ("brand", "text"),
+    "name": ("name", "text"),
+    "price_value": ("price", "price"),
+    "price_currency": ("currency", "text"),
+}
+
+_ADDITIONAL_INFO_FIELDS = {
+    "size": ("size", "text"),
+    "size_ml_or_g": ("size", "size"),
+    "rating_avg": ("rating_avg", "rating"),
+    "rating_count_text": ("rating_count", "text"),
+    "availability": ("availability", "text"),
+    "image_url": ("image_url", "image"),
+    "canonical_url": ("canonical_url", "url"),
+    "breadcrumb_elements": ("breadcrumbs", "list"),
+    "ean_gtin": ("ean_gtin", "text"),
+    "ingredients_text": ("ingredients", "text"),
+    "line": ("line", "text"),
+}
+
+
+def _product_selectors(field: str) -> Selectors:
+    """Return the (primary, fallback) product selectors for a field."""
+    return get_selector_with_fallbacks("product", field)
+
+
+def _product_spec(fields: Dict[str, Tuple[str, str]]) -> Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...], str]]:
+    """Build a SafeExtractor.extract_many spec from product field definitions."""
+    return {
+        output_field: (*_product_selectors(selector_field), kind)
+        for output_field, (selector_field, kind) in fields.items()
+    }
+
+
+# extract_many specs, resolved once at import
+_BASIC_INFO_SPEC = _product_spec(_BASIC_INFO_FIELDS)
+_ADDITIONAL_INFO_SPEC = _product_spec(_ADDITIONAL_INFO_FIELDS)
+
 
 class SephoraProductScraper:
     """Sephora product scraper with refillable detection."""
     
-    def __init__(self, refillable_keywords: Dict[str, List[str]]):
+    def __init__(self, refillable_keywords: Dict[str, List[str]], cache_size: int = 8192):
         self.refillable_detector = RefillableDetector(refillable_keywords)
         self.text_normalizer = TextNormalizer()
         self.language_detector = LanguageDetector()
+        # LRU of scraped products keyed by (html digest, url, site), so retries
+        # and overlapping category crawls skip re-parsing identical pages
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[bytes, str, str], Optional[Product]]" = OrderedDict()
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        """Leave the scrape cache behind when shipped to worker processes."""
+        state = self.__dict__.copy()
+        state["_cache"] = OrderedDict()
+        return state
+        
+    def scrape_product(self, html: str, url: str, site: str = "sephora",
+                       now: Optional[datetime] = None) -> Optional[Product]:
+        """Scrape product details from HTML.
+        
+        Pass ``now`` to pin the scrape timestamp shared by a batch of products.
+        Identical pages are served from the cache with refreshed scrape and
+        last-seen timestamps. Every call returns its own deep copy, so callers
+        may mutate the product without affecting later cache hits.
         
-    def scrape_product(self, html: str, url: str, site: str = "sephora") -> Optional[Product]:
-        """Scrape product details from HTML."""
+        The cache only helps calls on this instance: ``scrape_products`` runs
+        this method in worker processes, and ``__getstate__`` ships the
+        scraper to them with an empty cache.
+        """
+        now = now or datetime.now()
+        key = (hashlib.blake2b(html.encode('utf-8'), digest_size=16).digest(), url, site)
+        
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            cached = self._cache[key]
+        else:
+            cached = self._scrape_product(html, url, site, now)
+            self._cache[key] = cached
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        
+        if cached is None:
+            return None
+        return cached.model_copy(deep=True, update={"scrape_ts": now, "last_seen_ts": now})
+    
+    def _scrape_product(self, html: str, url: str, site: str, now: datetime) -> Optional[Product]:
+        """Parse and validate a product page."""
         try:
             extractor = SafeExtractor(html, url)
             
             # Extract basic product information
-            product_data = self._extract_basic_info(extractor, url, site)
+            product_data = self._extract_basic_info(extractor, url, site, now)
             if not product_data:
                 logger.warning("Failed to extract basic product info", url=url)
                 return None
             
-            # Extract additional details
-            product_data.update(self._extract_additional_info(extractor))
-            
-            # Detect refillable status
-            refillable_info = self._detect_refillable(extractor, product_data)
-            product_data.update(refillable_info)
+            # Extract additional details and refillable status into the same dict
+            self._extract_additional_info(extractor, product_data)
+            self._detect_refillable(extractor, product_data)
             
             # Normalize and validate data
             product_data = self._normalize_data(product_data)
             
             # Create Product object
-            product = Product(**product_data)
+            product = Product.model_validate(product_data)
             
             logger.info("Product scraped successfully", 
                        product_id=product.product_id,
@@ -56,192 +146,120 @@ class SephoraProductScraper:
             logger.error("Failed to scrape product", url=url, error=str(e))
             return None
     
-    def _extract_basic_info(self, extractor: SafeExtractor, url: str, site: str) -> Optional[Dict[str, Any]]:
+    async def scrape_products(self, urls: List[str], fetch: Callable[[str], Awaitable[str]],
+                              site: str = "sephora", concurrency: int = 8,
+                              max_workers: Optional[int] = None) -> List[Optional[Product]]:
+        """Fetch and scrape a batch of product pages.
+        
+        Pages are fetched concurrently with ``fetch`` (bounded by ``concurrency``)
+        while parsing runs in a process pool, so CPU-bound extraction does not
+        hold up the event loop. Results keep the order of ``urls``; pages that
+        fail to fetch or parse yield None.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(concurrency)
+        now = datetime.now()
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            async def scrape(url: str) -> Optional[Product]:
+                try:
+                    async with semaphore:
+                        html = await fetch(url)
+                except Exception as e:
+                    logger.error("Failed to fetch product page", url=url, error=str(e))
+                    return None
+                
+                return await loop.run_in_executor(executor, self.scrape_product, html, url, site, now)
+            
+            return await asyncio.gather(*(scrape(url) for url in urls))
+    
+    def _extract_basic_info(self, extractor: SafeExtractor, url: str, site: str,
+                            now: datetime) -> Optional[Dict[str, Any]]:
         """Extract basic product information."""
         # Product ID
         product_id = self._extract_product_id(extractor, url)
         if not product_id:
             return None
         
-        # Brand
-        brand = extractor.extract_text(
-            get_selector_with_fallbacks("product", "brand")["primary"],
-            get_selector_with_fallbacks("product", "brand")["fallback"]
-        )
-        if not brand:
+        fields = extractor.extract_many(_BASIC_INFO_SPEC)
+        
+        if not fields["brand"]:
             logger.warning("No brand found", url=url)
             return None
         
-        # Product name
-        name = extractor.extract_text(
-            get_selector_with_fallbacks("product", "name")["primary"],
-            get_selector_with_fallbacks("product", "name")["fallback"]
-        )
-        if not name:
+        if not fields["name"]:
             logger.warning("No product name found", url=url)
             return None
         
-        # Price
-        price_value = extractor.extract_price(
-            get_selector_with_fallbacks("product", "price")["primary"],
-            get_selector_with_fallbacks("product", "price")["fallback"]
-        )
-        if not price_value:
+        if not fields["price_value"]:
             logger.warning("No price found", url=url)
             return None
         
-        # Currency (default to EUR for Sephora France)
-        currency = extractor.extract_text(
-            get_selector_with_fallbacks("product", "currency")["primary"],
-            get_selector_with_fallbacks("product", "currency")["fallback"]
-        ) or "EUR"
-        
         return {
             "product_id": product_id,
             "site": site,
             "url": url,
-            "brand": brand,
-            "name": name,
-            "price_value": price_value,
-            "price_currency": currency,
-            "scrape_ts": datetime.now(),
-            "first_seen_ts": datetime.now(),
-            "last_seen_ts": datetime.now(),
+            "brand": fields["brand"],
+            "name": fields["name"],
+            "price_value": fields["price_value"],
+            # Currency (default to EUR for Sephora France)
+            "price_currency": fields["price_currency"] or "EUR",
+            "scrape_ts": now,
+            "first_seen_ts": now,
+            "last_seen_ts": now,
             "source_site": urlparse(url).netloc,
             "source_url": url
         }
     
-    def _extract_additional_info(self, extractor: SafeExtractor) -> Dict[str, Any]:
-        """Extract additional product information."""
-        # Size
-        size = extractor.extract_text(
-            get_selector_with_fallbacks("product", "size")["primary"],
-            get_selector_with_fallbacks("product", "size")["fallback"]
-        )
-        size_ml_or_g = extractor.extract_size(
-            get_selector_with_fallbacks("product", "size")["primary"],
-            get_selector_with_fallbacks("product", "size")["fallback"]
-        )
-        
-        # Rating
-        rating_avg = extractor.extract_rating(
-            get_selector_with_fallbacks("product", "rating_avg")["primary"],
-            get_selector_with_fallbacks("product", "rating_avg")["fallback"]
-        )
-        
-        rating_count_text = extractor.extract_text(
-            get_selector_with_fallbacks("product", "rating_count")["primary"],
-            get_selector_with_fallbacks("product", "rating_count")["fallback"]
-        )
-        rating_count = self._extract_number_from_text(rating_count_text) if rating_count_text else None
+    def _extract_additional_info(self, extractor: SafeExtractor, fields: Dict[str, Any]) -> None:
+        """Extract additional product information into the product dict."""
+        extractor.extract_many(_ADDITIONAL_INFO_SPEC, into=fields)
         
-        # Availability
-        availability = extractor.extract_text(
-            get_selector_with_fallbacks("product", "availability")["primary"],
-            get_selector_with_fallbacks("product", "availability")["fallback"]
-        )
-        
-        # Image URL
-        image_url = extractor.extract_image_url(
-            get_selector_with_fallbacks("product", "image_url")["primary"],
-            get_selector_with_fallbacks("product", "image_url")["fallback"]
-        )
+        rating_count_text = fields.pop("rating_count_text")
+        fields["rating_count"] = self._extract_number_from_text(rating_count_text) if rating_count_text else None
         
-        # Canonical URL
-        canonical_url = extractor.extract_url(
-            get_selector_with_fallbacks("product", "canonical_url")["primary"],
-            get_selector_with_fallbacks("product", "canonical_url")["fallback"]
-        )
+        breadcrumbs = self.text_normalizer.extract_breadcrumbs(fields.pop("breadcrumb_elements"))
+        fields["breadcrumbs"] = breadcrumbs
+        fields["category_path"] = self._extract_category_path(breadcrumbs)
         
-        # Breadcrumbs
-        breadcrumb_elements = extractor.extract_list(
-            get_selector_with_fallbacks("product", "breadcrumbs")["primary"],
-            get_selector_with_fallbacks("product", "breadcrumbs")["fallback"]
-        )
-        breadcrumbs = self.text_normalizer.extract_breadcrumbs(breadcrumb_elements)
-        
-        # EAN/GTIN
-        ean_gtin = extractor.extract_text(
-            get_selector_with_fallbacks("product", "ean_gtin")["primary"],
-            get_selector_with_fallbacks("product", "ean_gtin")["fallback"]
-        )
-        
-        # Ingredients
-        ingredients_text = extractor.extract_text(
-            get_selector_with_fallbacks("product", "ingredients")["primary"],
-            get_selector_with_fallbacks("product", "ingredients")["fallback"]
-        )
-        ingredients_present = bool(ingredients_text)
-        
-        # Product line
-        line = extractor.extract_text(
-            get_selector_with_fallbacks("product", "line")["primary"],
-            get_selector_with_fallbacks("product", "line")["fallback"]
-        )
-        
-        # Category path (from breadcrumbs)
-        category_path = self._extract_category_path(breadcrumbs)
-        
-        return {
-            "size": size,
-            "size_ml_or_g": size_ml_or_g,
-            "rating_avg": rating_avg,
-            "rating_count": rating_count,
-            "availability": availability,
-            "image_url": image_url,
-            "canonical_url": canonical_url,
-            "breadcrumbs": breadcrumbs,
-            "category_path": category_path,
-            "ean_gtin": ean_gtin,
-            "ingredients_present": ingredients_present,
-            "line": line,
-            "packaging_notes": None,  # Could be extracted if available
-            "refill_parent_sku": None  # Could be detected if available
-        }
+        fields["ingredients_present"] = bool(fields.pop("ingredients_text"))
+        fields["packaging_notes"] = None  # Could be extracted if available
+        fields["refill_parent_sku"] = None  # Could be detected if available
     
-    def _detect_refillable(self, extractor: SafeExtractor, product_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Detect if product is refillable with evidence."""
+    def _detect_refillable(self, extractor: SafeExtractor, product_data: Dict[str, Any]) -> None:
+        """Detect if product is refillable and record the evidence in the product dict."""
         # Extract refillable badges
-        refillable_badges = extractor.extract_list(
-            get_selector_with_fallbacks("product", "refillable_badges")["primary"],
-            get_selector_with_fallbacks("product", "refillable_badges")["fallback"]
-        )
+        refillable_badges = extractor.extract_list(*_product_selectors("refillable_badges"))
         
-        # Combine all text content for keyword detection
-        text_content = " ".join([
-            product_data.get("name", ""),
-            product_data.get("line", ""),
-            " ".join(product_data.get("breadcrumbs", [])),
-            " ".join(refillable_badges)
-        ])
+        # Text fragments are scanned individually; badges are already checked
+        # on their own, so they are not repeated here
+        text_fragments = [
+            product_data.get("name"),
+            product_data.get("line"),
+            *(product_data.get("breadcrumbs") or [])
+        ]
         
         # Detect refillable status
-        is_refillable, evidence = self.refillable_detector.detect_refillable(
-            text_content=text_content,
-            badges=refillable_badges
+        product_data["refillable_flag"], product_data["refill_evidence"] = (
+            self.refillable_detector.detect_refillable(
+                text_content=text_fragments,
+                badges=refillable_badges
+            )
         )
-        
-        return {
-            "refillable_flag": is_refillable,
-            "refill_evidence": evidence
-        }
     
     def _extract_product_id(self, extractor: SafeExtractor, url: str) -> Optional[str]:
         """Extract product ID from URL or page content."""
         # Try to extract from URL first
-        url_match = re.search(r'/product/([^/?]+)', url)
+        url_match = _PRODUCT_ID_RE.search(url)
         if url_match:
             return url_match.group(1)
         
         # Try to extract from page content
-        product_id = extractor.extract_text(
-            get_selector_with_fallbacks("product", "product_id")["primary"],
-            get_selector_with_fallbacks("product", "product_id")["fallback"]
-        )
+        product_id = extractor.extract_text(*_product_selectors("product_id"))
         
         if product_id:
             # Clean up the product ID
-            product_id = re.sub(r'[^\w\-]', '', product_id)
+            product_id = _PRODUCT_ID_CLEAN_RE.sub('', product_id)
             return product_id
         
         return None
@@ -251,13 +269,10 @@ class SephoraProductScraper:
         if not text:
             return None
         
-        # Remove non-numeric characters except digits
-        number_match = re.search(r'(\d+)', text.replace(',', '').replace('.', ''))
+        # Only the matched digits are stripped of separators
+        number_match = _NUMBER_RE.search(text)
         if number_match:
-            try:
-                return int(number_match.group(1))
-            except ValueError:
-                pass
+            return int(number_match.group().replace(',', '').replace('.', ''))
         
         return None
     
@@ -267,12 +282,10 @@ class SephoraProductScraper:
             return ["unknown"]
         
         # Filter out common non-category breadcrumbs
-        category_keywords = ["parfums", "soins", "maquillage", "visage", "corps", "yeux", "lèvres"]
         categories = []
         
         for breadcrumb in breadcrumbs:
-            breadcrumb_lower = breadcrumb.lower()
-            if any(keyword in breadcrumb_lower for keyword in category_keywords):
+            if _CATEGORY_RE.search(breadcrumb):
                 normalized = self.text_normalizer.normalize_category(breadcrumb)
                 if normalized:
                     categories.append(normalized)
@@ -1,17 +1,91 @@
 """Sephora reviews scraper for extracting review data with language detection."""
 
+import asyncio
+import hashlib
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, date
-from typing import Dict, List, Optional, Any, Set
+from typing import Dict, List, Optional, Any, Set, Tuple, Callable, Awaitable, Iterator
 from urllib.parse import urljoin, urlparse
 import structlog
+from selectolax.parser import Node
 from ..common.parsing import SafeExtractor, LanguageDetector
 from ..common.schema import Review, Language
 from ..common.utils import TimestampManager
+from ..utils.adaptive_rps import AdaptiveRPS
 from .selectors import get_selector_with_fallbacks
 
 logger = structlog.get_logger(__name__)
 
+_REVIEW_CONTAINER_SELECTORS = get_selector_with_fallbacks("review", "review_container")
+
+# Output field -> (selector field, extraction kind), extracted in one pass
+_REVIEW_FIELDS = {
+    "review_id": ("review_id", "text"),
+    "rating": ("rating", "rating"),
+    "title": ("title", "text"),
+    "body": ("body", "text"),
+    "date_text": ("date", "text"),
+    "author": ("author", "text"),
+    "verified_text": ("verified_purchase", "text"),
+    "helpful_text": ("helpful_count", "text"),
+}
+
+# SafeExtractor.extract_many spec, resolved once at import
+_REVIEW_SPEC = {
+    output_field: (*get_selector_with_fallbacks("review", selector_field), kind)
+    for output_field, (selector_field, kind) in _REVIEW_FIELDS.items()
+}
+
+_WS_RE = re.compile(r'\s+')
+_HELPFUL_RE = re.compile(r'(\d+)')
+_DATE_PATTERNS = [re.compile(p) for p in (
+    r'(\d{1,2})/(\d{1,2})/(\d{4})',
+    r'(\d{4})-(\d{1,2})-(\d{1,2})',
+    r'(\d{1,2})-(\d{1,2})-(\d{4})',
+)]
+# Anonymized author labels; anything else may be personal information
+_ANON_RE = re.compile('|'.join((
+    r'client\s+vérifié',
+    r'verified\s+customer',
+    r'client\s+anon',
+    r'anonymous\s+customer',
+    r'utilisateur',
+    r'user',
+)), re.IGNORECASE)
+# Verified purchase keyword -> status; negations come first so that at the
+# same position "non vérifié" wins over "vérifié"
+_VERIFIED_KEYWORDS = {
+    'non vérifié': False,
+    'not verified': False,
+    'non confirmé': False,
+    'vérifié': True,
+    'verified': True,
+    'confirmé': True,
+    'confirmed': True,
+}
+_VERIFIED_RE = re.compile('|'.join(map(re.escape, _VERIFIED_KEYWORDS)), re.IGNORECASE)
+
+
+def _review_fingerprint(review_id: str) -> int:
+    """Return a 64-bit fingerprint used to track seen review IDs compactly."""
+    return int.from_bytes(hashlib.blake2b(review_id.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def _pick_date_format(text: str) -> Optional[str]:
+    """Pick the strptime format a stripped date string can match, if any."""
+    if '/' in text:
+        return "%d/%m/%Y"
+    if '-' in text:
+        if text[4:5] == '-' and text[:4].isdigit():
+            return "%Y-%m-%d"
+        return "%d-%m-%Y"
+    if ',' in text:
+        return "%B %d, %Y"  # English format: January 15, 2024
+    if text[:1].isdigit():
+        return "%d %B %Y"  # French format: 15 janvier 2024
+    return None
+
 
 class SephoraReviewsScraper:
     """Sephora reviews scraper with language detection."""
@@ -19,87 +93,169 @@ class SephoraReviewsScraper:
     def __init__(self, preferred_language: str = "fr"):
         self.language_detector = LanguageDetector()
         self.preferred_language = preferred_language
-        self.seen_review_ids: Set[str] = set()
+        # 64-bit fingerprints rather than full ID strings; long crawls see
+        # millions of reviews
+        self.seen_review_ids: Set[int] = set()
+        
+    def __getstate__(self) -> Dict[str, Any]:
+        """Leave the seen review IDs behind when shipped to worker processes."""
+        state = self.__dict__.copy()
+        state["seen_review_ids"] = set()
+        return state
         
     def scrape_reviews(self, html: str, product_url: str, product_id: str, 
-                      site: str = "sephora") -> List[Review]:
-        """Scrape reviews from product page HTML."""
+                      site: str = "sephora", now: Optional[datetime] = None) -> List[Review]:
+        """Scrape reviews from product page HTML.
+        
+        ``now`` stamps every review on the page; it defaults to the current time.
+        """
         try:
-            extractor = SafeExtractor(html, product_url)
-            
-            # Extract review containers
-            review_containers = self._extract_review_containers(extractor)
-            if not review_containers:
-                logger.info("No reviews found", product_url=product_url)
-                return []
-            
-            reviews = []
-            for container in review_containers:
-                review = self._extract_single_review(container, product_url, product_id, site)
-                if review and review.review_id not in self.seen_review_ids:
-                    reviews.append(review)
-                    self.seen_review_ids.add(review.review_id)
-            
-            logger.info("Reviews scraped", 
-                       product_url=product_url,
-                       total_reviews=len(review_containers),
-                       new_reviews=len(reviews))
-            
-            return reviews
+            return list(self.iter_reviews(html, product_url, product_id, site, now))
             
         except Exception as e:
             logger.error("Failed to scrape reviews", product_url=product_url, error=str(e))
             return []
     
-    def _extract_review_containers(self, extractor: SafeExtractor) -> List[str]:
-        """Extract review container HTML elements."""
-        # Try to find review containers
-        review_selectors = get_selector_with_fallbacks("review", "review_container")
+    def iter_reviews(self, html: str, product_url: str, product_id: str,
+                     site: str = "sephora", now: Optional[datetime] = None) -> Iterator[Review]:
+        """Yield new reviews from product page HTML one at a time.
+        
+        Streaming consumers can write each review out without holding the page's
+        reviews in memory. Reviews are marked as seen as they are yielded.
+        """
+        extractor = SafeExtractor(html, product_url)
+        
+        review_containers = self._extract_review_containers(extractor)
+        if not review_containers:
+            logger.info("No reviews found", product_url=product_url)
+            return
+        
+        new_reviews = 0
+        for review in self._extract_reviews(review_containers, product_url, product_id, site,
+                                            now or datetime.now()):
+            if self._mark_seen(review):
+                new_reviews += 1
+                yield review
+        
+        logger.info("Reviews scraped", 
+                   product_url=product_url,
+                   total_reviews=len(review_containers),
+                   new_reviews=new_reviews)
+    
+    async def scrape_reviews_batch(self, pages: List[Tuple[str, str]],
+                                   fetch: Callable[[str], Awaitable[str]],
+                                   site: str = "sephora", concurrency: int = 8,
+                                   max_workers: Optional[int] = None,
+                                   rate_limiter: Optional[AdaptiveRPS] = None) -> List[List[Review]]:
+        """Fetch and scrape reviews for a batch of ``(product_url, product_id)`` pages.
         
-        # For now, we'll use a simple approach to find review sections
-        # In a real implementation, this would use the selectors to find actual review containers
-        # For demonstration, we'll return an empty list
-        return []
+        Pages are fetched concurrently with ``fetch`` (bounded by ``concurrency``
+        and paced by ``rate_limiter`` when given) while parsing runs in a process
+        pool. Reviews are deduplicated afterwards in page order, so results match
+        calling ``scrape_reviews`` on each page in turn; pages that fail to fetch
+        or parse yield an empty list.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(concurrency)
+        now = datetime.now()
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            async def scrape(product_url: str, product_id: str) -> Tuple[int, List[Review]]:
+                try:
+                    async with semaphore:
+                        if rate_limiter:
+                            await rate_limiter.async_wait()
+                        html = await fetch(product_url)
+                except Exception as e:
+                    logger.error("Failed to fetch review page", product_url=product_url, error=str(e))
+                    return 0, []
+                
+                try:
+                    return await loop.run_in_executor(
+                        executor, self._parse_reviews, html, product_url, product_id, site, now
+                    )
+                except Exception as e:
+                    logger.error("Failed to scrape reviews", product_url=product_url, error=str(e))
+                    return 0, []
+            
+            results = await asyncio.gather(*(scrape(url, product_id) for url, product_id in pages))
+        
+        batches = []
+        for (product_url, _), (total_reviews, parsed) in zip(pages, results):
+            reviews = self._keep_new_reviews(parsed)
+            if total_reviews:
+                logger.info("Reviews scraped",
+                           product_url=product_url,
+                           total_reviews=total_reviews,
+                           new_reviews=len(reviews))
+            batches.append(reviews)
+        return batches
     
-    def _extract_single_review(self, review_html: str, product_url: str, 
-                              product_id: str, site: str) -> Optional[Review]:
-        """Extract a single review from HTML."""
+    def _parse_reviews(self, html: str, product_url: str, product_id: str,
+                       site: str, now: datetime) -> Tuple[int, List[Review]]:
+        """Parse every review on a page, returning the container count and reviews."""
+        extractor = SafeExtractor(html, product_url)
+        
+        review_containers = self._extract_review_containers(extractor)
+        if not review_containers:
+            logger.info("No reviews found", product_url=product_url)
+            return 0, []
+        
+        reviews = list(self._extract_reviews(review_containers, product_url, product_id, site, now))
+        return len(review_containers), reviews
+    
+    def _extract_reviews(self, review_containers: List[Node], product_url: str,
+                         product_id: str, site: str, now: datetime) -> Iterator[Review]:
+        """Yield the reviews that extract cleanly from their containers."""
+        for container in review_containers:
+            review = self._extract_single_review(container, product_url, product_id, site, now)
+            if review:
+                yield review
+    
+    def _keep_new_reviews(self, reviews: List[Review]) -> List[Review]:
+        """Drop reviews already seen, recording the rest."""
+        return [review for review in reviews if self._mark_seen(review)]
+    
+    def _mark_seen(self, review: Review) -> bool:
+        """Record a review as seen, returning whether it was new."""
+        fingerprint = _review_fingerprint(review.review_id)
+        if fingerprint in self.seen_review_ids:
+            return False
+        self.seen_review_ids.add(fingerprint)
+        return True
+    
+    def _extract_review_containers(self, extractor: SafeExtractor) -> List[Node]:
+        """Extract review container nodes from the parsed page."""
+        return extractor.extract_nodes(*_REVIEW_CONTAINER_SELECTORS)
+    
+    def _extract_single_review(self, container: Node, product_url: str, 
+                              product_id: str, site: str, now: datetime) -> Optional[Review]:
+        """Extract a single review from its container node."""
         try:
-            extractor = SafeExtractor(review_html, product_url)
+            # Query the container in place rather than re-parsing its HTML
+            extractor = SafeExtractor.from_node(container, product_url)
             
-            # Extract review ID
-            review_id = self._extract_review_id(extractor, product_id)
-            if not review_id:
-                return None
+            fields = extractor.extract_many(_REVIEW_SPEC)
             
-            # Extract rating
-            rating = self._extract_rating(extractor)
+            rating = self._extract_rating(fields["rating"])
             if not rating:
                 return None
             
-            # Extract body text
-            body = self._extract_body(extractor)
+            body = self._extract_body(fields["body"])
             if not body:
                 return None
             
-            # Extract additional fields
-            title = extractor.extract_text(
-                get_selector_with_fallbacks("review", "title")["primary"],
-                get_selector_with_fallbacks("review", "title")["fallback"]
-            )
+            title = fields["title"]
             
-            review_date = self._extract_date(extractor)
+            review_date = self._extract_date(fields["date_text"])
+            review_id = self._extract_review_id(fields["review_id"], product_id, body, rating, review_date)
             if not review_date:
                 review_date = date.today()  # Default to today if no date found
             
-            # Extract author information (only anonymized labels)
-            author_label = self._extract_author_label(extractor)
-            
-            # Extract verified purchase status
-            verified_purchase = self._extract_verified_purchase(extractor)
-            
-            # Extract helpful count
-            helpful_count = self._extract_helpful_count(extractor)
+            # Only anonymized author labels are kept
+            author_label = self._extract_author_label(fields["author"])
+            verified_purchase = self._extract_verified_purchase(fields["verified_text"])
+            helpful_count = self._extract_helpful_count(fields["helpful_text"])
             
             # Detect language
             language = self._detect_language(body, title)
@@ -121,7 +277,7 @@ class SephoraReviewsScraper:
                 verified_purchase=verified_purchase,
                 helpful_count=helpful_count,
                 author_label=author_label,
-                scrape_ts=datetime.now()
+                scrape_ts=now
             )
             
             return review
@@ -130,81 +286,54 @@ class SephoraReviewsScraper:
             logger.error("Failed to extract single review", error=str(e))
             return None
     
-    def _extract_review_id(self, extractor: SafeExtractor, product_id: str) -> Optional[str]:
-        """Extract review ID."""
-        review_id = extractor.extract_text(
-            get_selector_with_fallbacks("review", "review_id")["primary"],
-            get_selector_with_fallbacks("review", "review_id")["fallback"]
-        )
-        
+    def _extract_review_id(self, review_id: Optional[str], product_id: str, body: str,
+                           rating: int, review_date: Optional[date]) -> str:
+        """Resolve the review ID, generating one when the page has none."""
         if review_id:
             return review_id
         
-        # Fallback: generate ID from product and timestamp
-        return f"{product_id}_review_{int(datetime.now().timestamp())}"
+        # Fallback: stable hash of the review content, so the same review
+        # always gets the same ID and distinct reviews do not collide
+        content = f"{body}|{rating}|{review_date}".encode('utf-8')
+        return f"{product_id}_review_{hashlib.blake2b(content, digest_size=8).hexdigest()}"
     
-    def _extract_rating(self, extractor: SafeExtractor) -> Optional[int]:
-        """Extract rating value."""
-        rating = extractor.extract_rating(
-            get_selector_with_fallbacks("review", "rating")["primary"],
-            get_selector_with_fallbacks("review", "rating")["fallback"]
-        )
-        
+    def _extract_rating(self, rating: Optional[float]) -> Optional[int]:
+        """Validate the extracted rating value."""
         if rating and 1 <= rating <= 5:
             return int(rating)
         
         return None
     
-    def _extract_body(self, extractor: SafeExtractor) -> Optional[str]:
-        """Extract review body text."""
-        body = extractor.extract_text(
-            get_selector_with_fallbacks("review", "body")["primary"],
-            get_selector_with_fallbacks("review", "body")["fallback"]
-        )
-        
+    def _extract_body(self, body: Optional[str]) -> Optional[str]:
+        """Clean the extracted review body text."""
         if body:
             # Clean up the text
             body = body.strip()
             # Remove excessive whitespace
-            body = re.sub(r'\s+', ' ', body)
+            body = _WS_RE.sub(' ', body)
             return body if len(body) > 10 else None  # Minimum length check
         
         return None
     
-    def _extract_date(self, extractor: SafeExtractor) -> Optional[date]:
-        """Extract review date."""
-        date_text = extractor.extract_text(
-            get_selector_with_fallbacks("review", "date")["primary"],
-            get_selector_with_fallbacks("review", "date")["fallback"]
-        )
-        
+    def _extract_date(self, date_text: Optional[str]) -> Optional[date]:
+        """Parse the extracted review date text."""
         if not date_text:
             return None
         
-        # Try to parse various date formats
-        date_formats = [
-            "%d/%m/%Y",
-            "%Y-%m-%d",
-            "%d-%m-%Y",
-            "%d %B %Y",  # French format: 15 janvier 2024
-            "%B %d, %Y",  # English format: January 15, 2024
-        ]
-        
-        for fmt in date_formats:
+        # Parse with the single format the text can match
+        stripped = date_text.strip()
+        fmt = _pick_date_format(stripped)
+        if fmt:
             try:
-                return datetime.strptime(date_text.strip(), fmt).date()
+                if fmt == "%Y-%m-%d" and len(stripped) == 10:
+                    return date.fromisoformat(stripped)
+                return datetime.strptime(stripped, fmt).date()
             except ValueError:
-                continue
+                pass
         
         # Try to extract date from text using regex
-        date_patterns = [
-            r'(\d{1,2})/(\d{1,2})/(\d{4})',
-            r'(\d{4})-(\d{1,2})-(\d{1,2})',
-            r'(\d{1,2})-(\d{1,2})-(\d{4})',
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, date_text)
+        for pattern in _DATE_PATTERNS:
+            match = pattern.search(date_text)
             if match:
                 try:
                     if len(match.groups()) == 3:
@@ -217,64 +346,37 @@ class SephoraReviewsScraper:
         
         return None
     
-    def _extract_author_label(self, extractor: SafeExtractor) -> Optional[str]:
-        """Extract anonymized author label."""
-        author = extractor.extract_text(
-            get_selector_with_fallbacks("review", "author")["primary"],
-            get_selector_with_fallbacks("review", "author")["fallback"]
-        )
-        
+    def _extract_author_label(self, author: Optional[str]) -> Optional[str]:
+        """Keep the extracted author only if it is an anonymized label."""
         if not author:
             return None
         
         # Only return if it's an anonymized label
-        anonymized_patterns = [
-            r'client\s+vérifié',
-            r'verified\s+customer',
-            r'client\s+anon',
-            r'anonymous\s+customer',
-            r'utilisateur',
-            r'user'
-        ]
-        
-        author_lower = author.lower()
-        for pattern in anonymized_patterns:
-            if re.search(pattern, author_lower):
-                return author.strip()
+        if _ANON_RE.search(author):
+            return author.strip()
         
         # Don't return personal information
         return None
     
-    def _extract_verified_purchase(self, extractor: SafeExtractor) -> Optional[bool]:
-        """Extract verified purchase status."""
-        verified_text = extractor.extract_text(
-            get_selector_with_fallbacks("review", "verified_purchase")["primary"],
-            get_selector_with_fallbacks("review", "verified_purchase")["fallback"]
-        )
-        
+    def _extract_verified_purchase(self, verified_text: Optional[str]) -> Optional[bool]:
+        """Interpret the extracted verified purchase text."""
         if not verified_text:
             return None
         
-        verified_lower = verified_text.lower()
-        if any(keyword in verified_lower for keyword in ['vérifié', 'verified', 'confirmé', 'confirmed']):
-            return True
-        elif any(keyword in verified_lower for keyword in ['non vérifié', 'not verified', 'non confirmé']):
-            return False
+        # The leftmost keyword decides, in a single scan of the text
+        keyword_match = _VERIFIED_RE.search(verified_text)
+        if keyword_match:
+            return _VERIFIED_KEYWORDS[keyword_match.group(0).lower()]
         
         return None
     
-    def _extract_helpful_count(self, extractor: SafeExtractor) -> Optional[int]:
-        """Extract helpful vote count."""
-        helpful_text = extractor.extract_text(
-            get_selector_with_fallbacks("review", "helpful_count")["primary"],
-            get_selector_with_fallbacks("review", "helpful_count")["fallback"]
-        )
-        
+    def _extract_helpful_count(self, helpful_text: Optional[str]) -> Optional[int]:
+        """Parse the helpful vote count from the extracted text."""
         if not helpful_text:
             return None
         
         # Extract number from text
-        number_match = re.search(r'(\d+)', helpful_text.replace(',', '').replace('.', ''))
+        number_match = _HELPFUL_RE.search(helpful_text.replace(',', '').replace('.', ''))
         if number_match:
             try:
                 return int(number_match.group(1))
@@ -289,14 +391,7 @@ class SephoraReviewsScraper:
         if title:
             text = f"{title} {body}"
         
-        detected = self.language_detector.detect_language(text)
-        
-        if detected == "fr":
-            return Language.FRENCH
-        elif detected == "en":
-            return Language.ENGLISH
-        else:
-            return Language.OTHER
+        return self.language_detector.detect_language(text)
     
     def _create_review_url(self, product_url: str, review_id: str) -> str:
         """Create review URL."""
@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 """Adaptive rate limiter with 429/403 feedback."""
 
+import asyncio
 import time
 import random
 from collections import deque
 from typing import Optional
+import structlog
+
+logger = structlog.get_logger(__name__)
 
 class AdaptiveRPS:
     """Adaptive rate limiter that adjusts based on HTTP response codes."""
@@ -20,19 +24,39 @@ class AdaptiveRPS:
         self.rps = rps
         self.min_rps = min_rps
         self.max_rps = max_rps
-        self.last_request = 0.0
+        self.last_request = float('-inf')  # time.monotonic() of the last slot
         self.error_history = deque(maxlen=20)  # Track last 20 requests
+        self._error_count = 0  # Running sum of error_history
+        
+    def _delay(self, now: float) -> float:
+        """Seconds to wait from ``now`` until the next request slot."""
+        interval = 1.0 / self.rps
+        delay = interval - (now - self.last_request)
+        if delay <= 0:
+            return 0.0
         
+        # Add random jitter to avoid thundering herd; scaled to the interval
+        # so it never caps throughput below the configured rate
+        return delay + random.uniform(0.0, 0.1 * interval)
+    
     def wait(self):
         """Wait for the appropriate time before next request."""
-        now = time.time()
-        delay = max(0.0, (1.0 / self.rps) - (now - self.last_request))
+        delay = self._delay(time.monotonic())
+        if delay > 0:
+            time.sleep(delay)
         
-        # Add random jitter to avoid thundering herd
-        jitter = random.uniform(0.25, 1.0)
-        time.sleep(delay + jitter)
+        self.last_request = time.monotonic()
+    
+    async def async_wait(self):
+        """Wait for the next request slot without blocking the event loop.
         
-        self.last_request = time.time()
+        The slot is reserved before sleeping so concurrent callers queue up
+        behind each other instead of firing together.
+        """
+        now = time.monotonic()
+        delay = self._delay(now)
+        self.last_request = now + delay
+        await asyncio.sleep(delay)
     
     def feedback(self, status_code: int):
         """Provide feedback on HTTP response code.
@@ -41,17 +65,20 @@ class AdaptiveRPS:
             status_code: HTTP status code from response
         """
         is_error = status_code in (403, 429, 503)
+        if len(self.error_history) == self.error_history.maxlen:
+            self._error_count -= self.error_history[0]
         self.error_history.append(is_error)
+        self._error_count += is_error
         
         # If we have 3+ errors in recent history, slow down
-        if sum(self.error_history) >= 3:
+        if self._error_count >= 3:
             self.rps = max(self.min_rps, self.rps / 2.0)
-            print(f"⚠️ Rate limiting: reducing to {self.rps:.2f} RPS due to errors")
+            logger.warning("Rate limiting: reducing RPS due to errors", rps=round(self.rps, 2))
         
         # If no errors in recent history, speed up gradually
-        elif sum(self.error_history) == 0 and len(self.error_history) == self.error_history.maxlen:
+        elif self._error_count == 0 and len(self.error_history) == self.error_history.maxlen:
             self.rps = min(self.max_rps, self.rps * 1.2)
-            print(f"✅ Rate limiting: increasing to {self.rps:.2f} RPS (no recent errors)")
+            logger.info("Rate limiting: increasing RPS (no recent errors)", rps=round(self.rps, 2))
     
     def get_status(self) -> dict:
         """Get current rate limiter status."""
@@ -59,6 +86,6 @@ class AdaptiveRPS:
             "current_rps": self.rps,
             "min_rps": self.min_rps,
             "max_rps": self.max_rps,
-            "recent_errors": sum(self.error_history),
+            "recent_errors": self._error_count,
             "total_requests": len(self.error_history)
         }
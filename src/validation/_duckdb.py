@@ -0,0 +1,68 @@
+"""DuckDB plumbing shared by the silver-data checkers."""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, List
+import duckdb
+
+# Silver tables, each registered as a view over data/silver/<table>.parquet
+SILVER_TABLES = ("products", "reviews", "manifest_runs")
+
+# Scan with every core and cache Parquet metadata across the checks' queries
+DUCKDB_CONFIG = {
+    "threads": os.cpu_count() or 1,
+    "memory_limit": "4GB",
+    "enable_object_cache": True,
+}
+
+# Refillable evidence counts as missing when NULL or empty; the text cast
+# accepts both list-typed and text-typed refill_evidence columns
+EMPTY_EVIDENCE_SQL = "(refill_evidence IS NULL OR CAST(refill_evidence AS VARCHAR) IN ('[]', ''))"
+
+
+class SilverChecker:
+    """Base for checkers running independent DuckDB queries over the silver tables.
+
+    Checks run concurrently, each on its own cursor of one shared connection,
+    exposed to the check through ``con``.
+    """
+
+    def __init__(self, database: str = ":memory:", silver_dir: Path = Path("data/silver")):
+        self.silver_dir = silver_dir
+        self._con = duckdb.connect(database, config=DUCKDB_CONFIG)
+        # Per-thread cursor while checks run concurrently
+        self._local = threading.local()
+
+    @property
+    def con(self) -> duckdb.DuckDBPyConnection:
+        """Connection for the running check: its own cursor inside a worker thread."""
+        return getattr(self._local, "con", self._con)
+
+    def _run_isolated(self, check: Callable[[], Any]) -> Any:
+        """Run one check on its own cursor."""
+        self._local.con = self._con.cursor()
+        try:
+            return check()
+        finally:
+            self._local.con.close()
+            del self._local.con
+
+    def _run_concurrently(self, checks: List[Callable[[], Any]]) -> List[Any]:
+        """Run independent checks concurrently, returning their results in order."""
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(self._run_isolated, check) for check in checks]
+            return [future.result() for future in futures]
+
+    def _register_views(self):
+        """Register each silver Parquet file once as a view named after its table.
+
+        Checks query the views on this one connection instead of re-opening the
+        files per query. Missing files get no view, so checks against them fail
+        and are reported as before.
+        """
+        for table in SILVER_TABLES:
+            path = self.silver_dir / f"{table}.parquet"
+            if path.exists():
+                self.con.execute(f"CREATE VIEW {table} AS SELECT * FROM read_parquet('{path}')")
@@ -1,32 +1,199 @@
 #!/usr/bin/env python3
 """Integrity check to enforce provenance gates and detect synthetic data."""
 
-import duckdb
-import pandas as pd
+import argparse
+import threading
+import orjson
 from pathlib import Path
-import json
 from datetime import datetime
 import structlog
+from src.validation._duckdb import EMPTY_EVIDENCE_SQL, SILVER_TABLES, SilverChecker
 
 logger = structlog.get_logger()
 
-class IntegrityChecker:
+# Persistent DuckDB copy of the silver tables used by warm runs, in the silver directory
+WARM_CACHE_FILE = "checker_cache.duckdb"
+
+# Brands whose absence suggests synthetic data; registered as the
+# luxury_brands table
+LUXURY_BRANDS = (
+    'Chanel', 'Parfums Christian Dior', 'Guerlain', 'Hermès', 'Givenchy',
+    'Maison Francis Kurkdjian', 'Acqua di Parma', 'Tom Ford Beauty',
+    'La Mer', 'Jo Malone London', 'Le Labo', 'By Kilian', 'Yves Saint Laurent',
+    'Lancôme', 'Armani Beauty', 'Valentino Beauty', 'Burberry Beauty', 'Chloé'
+)
+
+# Product-side counts shared by the synthetic-data and refillable checks
+PRODUCT_STATS_SQL = f"""
+    SELECT
+        -- Cheap prefix test first; only Brand_* names reach the regex
+        COUNT(CASE WHEN starts_with(brand, 'Brand_') AND brand ~ '^Brand_[0-9]+$' THEN 1 END) AS synthetic_brands,
+        COUNT(CASE WHEN brand IN (SELECT brand FROM luxury_brands) THEN 1 END) AS luxury_count,
+        COUNT(CASE WHEN refillable_flag = TRUE
+                   AND {EMPTY_EVIDENCE_SQL}
+                   THEN 1 END) AS invalid_refill,
+        COUNT(*) AS product_count
+    FROM products
+"""
+
+# Rows missing the core provenance fields, per table
+MISSING_PROVENANCE_SQL = """
+    SELECT COUNT(*) AS missing_core
+    FROM {table}
+    WHERE source_url IS NULL OR scrape_ts IS NULL
+"""
+
+MISSING_ROBOTS_SQL = """
+    SELECT site, COUNT(*) AS n
+    FROM manifest_runs
+    WHERE robots_etag IS NULL OR robots_path IS NULL
+    GROUP BY site
+"""
+
+# Review-side counts: duplication and rating bounds from one grouped scan of
+# reviews, each group being one distinct (rating, text) pair
+REVIEW_STATS_SQL = """
+    WITH g AS (
+        SELECT COUNT(*) AS c, rating BETWEEN 1 AND 5 AS in_bounds
+        FROM reviews
+        GROUP BY rating, text
+    )
+    SELECT
+        COALESCE(SUM(c) FILTER (WHERE c > 1), 0) AS total_duplicates,
+        COUNT(*) FILTER (WHERE c > 1) AS duplicate_pairs,
+        COALESCE(SUM(c), 0) AS total_reviews,
+        ROUND(SUM(CASE WHEN in_bounds THEN c ELSE 0 END) / SUM(c), 3) AS rating_in_bounds
+    FROM g
+"""
+
+PRICE_GAPS_SQL = """
+    WITH p AS (
+        SELECT DISTINCT price_value 
+        FROM products
+        WHERE price_value IS NOT NULL
+        ORDER BY price_value
+    ),
+    g AS (
+        SELECT LEAD(price_value) OVER (ORDER BY price_value) - price_value AS gap 
+        FROM p
+    )
+    SELECT COUNT(DISTINCT ROUND(gap,2)) AS distinct_gaps
+    FROM g WHERE gap IS NOT NULL
+"""
+
+MANIFEST_REQUESTS_SQL = """
+    SELECT site, total_requests, blocked_requests
+    FROM manifest_runs
+"""
+
+# Only brands matching a suspicious price pattern come back to Python
+FLAGGED_PRICES_SQL = """
+    SELECT brand, n, pmin, price_levels,
+           price_levels <= 2 AND n >= 20 AS few_levels,
+           pmin = pmax AS flat
+    FROM (
+        SELECT brand,
+               COUNT(*) n,
+               MIN(price_value) pmin, MAX(price_value) pmax,
+               COUNT(DISTINCT price_value) AS price_levels
+        FROM products
+        GROUP BY 1 HAVING n>=10
+    )
+    WHERE (price_levels <= 2 AND n >= 20) OR pmin = pmax
+    ORDER BY price_levels ASC, n DESC
+"""
+
+FIXTURE_COLUMNS_SQL = """
+    SELECT table_name
+    FROM information_schema.columns
+    WHERE column_name = 'is_fixture' AND table_name IN ('products', 'reviews')
+"""
+
+# 20 random products with source URLs; the reservoir sample is taken during
+# the scan (after the filter) instead of sorting every row
+AUDIT_SAMPLE_SQL = """
+    SELECT product_id, brand, name, price_value, source_url, scrape_ts
+    FROM (
+        SELECT product_id, brand, name, price_value, source_url, scrape_ts
+        FROM products
+        WHERE source_url IS NOT NULL
+    )
+    USING SAMPLE reservoir(20 ROWS) REPEATABLE (42)
+"""
+
+class IntegrityChecker(SilverChecker):
     """Enforce provenance gates and detect synthetic data."""
     
-    def __init__(self):
-        """Initialize integrity checker."""
-        self.con = duckdb.connect()
+    def __init__(self, warm: bool = False, silver_dir: Path = Path("data/silver")):
+        """Initialize integrity checker.
+        
+        With ``warm``, the silver tables are kept in a persistent DuckDB file
+        and only reloaded from Parquet when the Parquet file has changed.
+        """
+        database = str(silver_dir / WARM_CACHE_FILE) if warm else ":memory:"
+        super().__init__(database, silver_dir)
         self.fixtures_dir = Path("data/fixtures")
-        self.silver_dir = Path("data/silver")
-        self.violations = []
+        self._violations = []
+        # Query results shared between checks; the lock makes the first caller compute them
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        if warm:
+            self._load_tables()
+        else:
+            self._register_views()
+        # A regular (not TEMP) table, so worker cursors see it too
+        self._con.execute(
+            "CREATE OR REPLACE TABLE luxury_brands AS SELECT UNNEST(?::VARCHAR[]) AS brand", [list(LUXURY_BRANDS)]
+        )
+    
+    @property
+    def violations(self) -> list:
+        """Violations recorded by the running check, or all of them outside checks."""
+        return getattr(self._local, "violations", self._violations)
+    
+    def _run_isolated(self, check) -> list:
+        """Run one check on its own cursor, returning the violations it recorded."""
+        self._local.violations = []
+        try:
+            super()._run_isolated(check)
+        except Exception as e:
+            # An unexpected error fails this check only, not the whole run
+            self._fail(f"{check.__name__} failed", e)
+        finally:
+            violations = self._local.violations
+            del self._local.violations
+        return violations
+    
+    def _load_tables(self):
+        """Copy each silver Parquet file into the warm cache, skipping unchanged files.
+        
+        The Parquet modification time each table was loaded from is kept in
+        ``parquet_sources``. Tables whose file has gone are dropped, so checks
+        against them fail as they do without the cache.
+        """
+        self.con.execute(
+            "CREATE TABLE IF NOT EXISTS parquet_sources (table_name VARCHAR PRIMARY KEY, mtime_ns BIGINT)"
+        )
+        loaded = dict(self.con.execute("SELECT table_name, mtime_ns FROM parquet_sources").fetchall())
+        for table in SILVER_TABLES:
+            path = self.silver_dir / f"{table}.parquet"
+            if not path.exists():
+                self.con.execute(f"DROP TABLE IF EXISTS {table}")
+                self.con.execute("DELETE FROM parquet_sources WHERE table_name = ?", [table])
+                continue
+            mtime_ns = path.stat().st_mtime_ns
+            if loaded.get(table) != mtime_ns:
+                logger.info("Loading Parquet into warm cache", table=table)
+                self.con.execute(f"CREATE OR REPLACE TABLE {table} AS SELECT * FROM read_parquet('{path}')")
+                self.con.execute("INSERT OR REPLACE INTO parquet_sources VALUES (?, ?)", [table, mtime_ns])
         
     def check_file_existence(self):
         """Check if required files exist and are Parquet."""
         logger.info("Checking file existence...")
         
         required_files = [
-            "data/silver/products.parquet",
-            "data/silver/reviews.parquet"
+            str(self.silver_dir / "products.parquet"),
+            str(self.silver_dir / "reviews.parquet")
         ]
         
         for file_path in required_files:
@@ -43,222 +210,158 @@ class IntegrityChecker:
         """Enforce provenance gates - non-negotiable fields."""
         logger.info("Checking provenance gates...")
         
-        # Check products table
-        try:
-            missing_core = self.con.execute("""
-                SELECT COUNT(*) AS missing_core
-                FROM read_parquet('data/silver/products.parquet')
-                WHERE source_url IS NULL OR scrape_ts IS NULL
-            """).df()
-            
-            if missing_core.iloc[0]['missing_core'] > 0:
-                self.violations.append(f"Products missing core provenance: {missing_core.iloc[0]['missing_core']} rows")
-                logger.error(f"Products missing core provenance: {missing_core.iloc[0]['missing_core']} rows")
-            else:
-                logger.info("✅ All products have core provenance fields")
-                
-        except Exception as e:
-            self.violations.append(f"Error checking products provenance: {e}")
-            logger.error(f"Error checking products provenance: {e}")
-        
-        # Check reviews table
-        try:
-            missing_core = self.con.execute("""
-                SELECT COUNT(*) AS missing_core
-                FROM read_parquet('data/silver/reviews.parquet')
-                WHERE source_url IS NULL OR scrape_ts IS NULL
-            """).df()
-            
-            if missing_core.iloc[0]['missing_core'] > 0:
-                self.violations.append(f"Reviews missing core provenance: {missing_core.iloc[0]['missing_core']} rows")
-                logger.error(f"Reviews missing core provenance: {missing_core.iloc[0]['missing_core']} rows")
+        for table in ("products", "reviews"):
+            missing_core = self._scalar(
+                MISSING_PROVENANCE_SQL.format(table=table), f"Error checking {table} provenance"
+            )
+            if missing_core is None:
+                continue
+            if missing_core > 0:
+                self.violations.append(f"{table.capitalize()} missing core provenance: {missing_core} rows")
+                logger.error(f"{table.capitalize()} missing core provenance: {missing_core} rows")
             else:
-                logger.info("✅ All reviews have core provenance fields")
-                
-        except Exception as e:
-            self.violations.append(f"Error checking reviews provenance: {e}")
-            logger.error(f"Error checking reviews provenance: {e}")
+                logger.info(f"✅ All {table} have core provenance fields")
     
     def check_refillable_evidence(self):
         """Check refillable evidence requirements."""
         logger.info("Checking refillable evidence...")
         
-        try:
-            invalid_refillable = self.con.execute("""
-                SELECT COUNT(*) AS invalid_count
-                FROM read_parquet('data/silver/products.parquet')
-                WHERE refillable_flag = true 
-                AND (refill_evidence IS NULL OR array_length(refill_evidence) = 0)
-            """).df()
-            
-            if invalid_refillable.iloc[0]['invalid_count'] > 0:
-                self.violations.append(f"Refillable products without evidence: {invalid_refillable.iloc[0]['invalid_count']} rows")
-                logger.error(f"Refillable products without evidence: {invalid_refillable.iloc[0]['invalid_count']} rows")
+        stats, error = self._product_stats()
+        if error:
+            self._fail("Error checking refillable evidence", error)
+        else:
+            invalid_refillable = stats[2]
+            if invalid_refillable > 0:
+                self.violations.append(f"Refillable products without evidence: {invalid_refillable} rows")
+                logger.error(f"Refillable products without evidence: {invalid_refillable} rows")
             else:
                 logger.info("✅ All refillable products have evidence")
-                
-        except Exception as e:
-            self.violations.append(f"Error checking refillable evidence: {e}")
-            logger.error(f"Error checking refillable evidence: {e}")
     
     def check_robots_provenance(self):
         """Check robots.txt provenance."""
         logger.info("Checking robots provenance...")
         
-        manifest_path = Path("data/silver/manifest_runs.parquet")
+        manifest_path = self.silver_dir / "manifest_runs.parquet"
         if not manifest_path.exists():
             self.violations.append("Missing manifest_runs.parquet")
             logger.error("Missing manifest_runs.parquet")
             return
         
+        missing_robots = self._fetchall(MISSING_ROBOTS_SQL, "Error checking robots provenance")
+        if missing_robots:
+            for site, n in missing_robots:
+                self.violations.append(f"Site {site} missing robots provenance: {n} records")
+                logger.error(f"Site {site} missing robots provenance: {n} records")
+        elif missing_robots is not None:
+            logger.info("✅ All sites have robots provenance")
+    
+    def _fail(self, failure: str, error: Exception):
+        """Record a check that could not run as the violation ``failure: error``."""
+        self.violations.append(f"{failure}: {error}")
+        logger.error(failure, error=str(error))
+    
+    def _fetchone(self, query: str):
+        """Run a query, returning ``(row, None)`` or ``(None, error)``."""
         try:
-            missing_robots = self.con.execute("""
-                SELECT site, COUNT(*) AS n
-                FROM read_parquet('data/silver/manifest_runs.parquet')
-                WHERE robots_etag IS NULL OR robots_path IS NULL
-                GROUP BY site
-            """).df()
-            
-            if not missing_robots.empty:
-                for _, row in missing_robots.iterrows():
-                    self.violations.append(f"Site {row['site']} missing robots provenance: {row['n']} records")
-                    logger.error(f"Site {row['site']} missing robots provenance: {row['n']} records")
-            else:
-                logger.info("✅ All sites have robots provenance")
-                
+            return self.con.execute(query).fetchone(), None
         except Exception as e:
-            self.violations.append(f"Error checking robots provenance: {e}")
-            logger.error(f"Error checking robots provenance: {e}")
+            return None, e
+    
+    def _scalar(self, query: str, failure: str):
+        """Run a single-value query, recording ``failure`` and returning None if it fails."""
+        row, error = self._fetchone(query)
+        if error:
+            self._fail(failure, error)
+            return None
+        return row[0]
+    
+    def _fetchall(self, query: str, failure: str):
+        """Run a query for all rows, recording ``failure`` and returning None if it fails."""
+        try:
+            return self.con.execute(query).fetchall()
+        except Exception as e:
+            self._fail(failure, e)
+            return None
+    
+    def _product_stats(self):
+        """Run the shared products scan once, returning ``(row, None)`` or ``(None, error)``.
+        
+        The row holds ``(synthetic_brands, luxury_count, invalid_refill,
+        product_count)`` and is reused by every check that needs it.
+        """
+        with self._cache_lock:
+            if "product_stats" not in self._cache:
+                self._cache["product_stats"] = self._fetchone(PRODUCT_STATS_SQL)
+            return self._cache["product_stats"]
     
     def check_synthetic_indicators(self):
         """Check for patterns that indicate synthetic data."""
         logger.info("Checking for synthetic data indicators...")
         
+        # Product-side indicators share one (cached) scan of products
+        product_stats, product_error = self._product_stats()
+        
+        # Review-side indicators share one scan of reviews
+        review_stats, review_error = self._fetchone(REVIEW_STATS_SQL)
+        
         # 1) Brand generator pattern check
-        try:
-            brand_query = """
-            SELECT COUNT(*) as synthetic_brands
-            FROM read_parquet('data/silver/products.parquet')
-            WHERE brand ~ '^Brand_[0-9]+$'
-            """
-            synthetic_brands = self.con.execute(brand_query).fetchone()[0]
+        if product_error:
+            self._fail("Brand pattern check failed", product_error)
+        else:
+            synthetic_brands = product_stats[0]
             if synthetic_brands > 0:
                 self.violations.append(f"Found {synthetic_brands} synthetic brand names (Brand_0 pattern)")
                 logger.error("Synthetic brand pattern detected", count=synthetic_brands)
-        except Exception as e:
-            logger.error("Error checking brand patterns", error=str(e))
-            self.violations.append(f"Brand pattern check failed: {str(e)}")
         
         # 2) Luxury brand overlap check
-        try:
-            luxury_brands = [
-                'Chanel', 'Parfums Christian Dior', 'Guerlain', 'Hermès', 'Givenchy',
-                'Maison Francis Kurkdjian', 'Acqua di Parma', 'Tom Ford Beauty',
-                'La Mer', 'Jo Malone London', 'Le Labo', 'By Kilian', 'Yves Saint Laurent',
-                'Lancôme', 'Armani Beauty', 'Valentino Beauty', 'Burberry Beauty', 'Chloé'
-            ]
-            luxury_query = f"""
-            SELECT COUNT(*) as luxury_count
-            FROM read_parquet('data/silver/products.parquet')
-            WHERE brand IN ({','.join([f"'{b}'" for b in luxury_brands])})
-            """
-            luxury_count = self.con.execute(luxury_query).fetchone()[0]
+        if product_error:
+            self._fail("Luxury brand check failed", product_error)
+        else:
+            luxury_count = product_stats[1]
             if luxury_count == 0:
                 self.violations.append("No luxury brands found - data appears synthetic")
-                logger.error("No luxury brands detected", expected_brands=len(luxury_brands))
+                logger.error("No luxury brands detected", expected_brands=len(LUXURY_BRANDS))
             else:
                 logger.info("Luxury brands found", count=luxury_count)
-        except Exception as e:
-            logger.error("Error checking luxury brands", error=str(e))
-            self.violations.append(f"Luxury brand check failed: {str(e)}")
         
         # 3) Price gap uniformity check
-        try:
-            price_query = """
-            WITH p AS (
-                SELECT DISTINCT price_value 
-                FROM read_parquet('data/silver/products.parquet')
-                WHERE price_value IS NOT NULL
-                ORDER BY price_value
-            ),
-            g AS (
-                SELECT LEAD(price_value) OVER (ORDER BY price_value) - price_value AS gap 
-                FROM p
-            )
-            SELECT COUNT(DISTINCT ROUND(gap,2)) AS distinct_gaps
-            FROM g WHERE gap IS NOT NULL
-            """
-            distinct_gaps = self.con.execute(price_query).fetchone()[0]
-            if distinct_gaps <= 1:
-                self.violations.append(f"Price gaps too uniform: only {distinct_gaps} distinct gaps")
-                logger.error("Suspicious price uniformity", distinct_gaps=distinct_gaps)
-            else:
-                logger.info("Price distribution looks natural", distinct_gaps=distinct_gaps)
-        except Exception as e:
-            logger.error("Error checking price gaps", error=str(e))
-            self.violations.append(f"Price gap check failed: {str(e)}")
+        distinct_gaps = self._scalar(PRICE_GAPS_SQL, "Price gap check failed")
+        if distinct_gaps is None:
+            pass
+        elif distinct_gaps <= 1:
+            self.violations.append(f"Price gaps too uniform: only {distinct_gaps} distinct gaps")
+            logger.error("Suspicious price uniformity", distinct_gaps=distinct_gaps)
+        else:
+            logger.info("Price distribution looks natural", distinct_gaps=distinct_gaps)
         
         # 4) Review duplication check
-        try:
-            review_query = """
-            WITH dup_check AS (
-                SELECT rating, text, COUNT(*) as dup_count
-                FROM read_parquet('data/silver/reviews.parquet')
-                GROUP BY rating, text
-                HAVING COUNT(*) > 1
-            )
-            SELECT 
-                SUM(dup_count) as total_duplicates,
-                COUNT(*) as duplicate_pairs,
-                (SELECT COUNT(*) FROM read_parquet('data/silver/reviews.parquet')) as total_reviews
-            FROM dup_check
-            """
-            dup_result = self.con.execute(review_query).fetchone()
-            if dup_result:
-                total_duplicates, duplicate_pairs, total_reviews = dup_result
-                dup_percentage = (total_duplicates / total_reviews) * 100 if total_reviews > 0 else 0
-                if dup_percentage > 10:
-                    self.violations.append(f"High review duplication: {dup_percentage:.1f}% ({duplicate_pairs} duplicate pairs)")
-                    logger.error("Suspicious review duplication", percentage=dup_percentage, pairs=duplicate_pairs)
-                else:
-                    logger.info("Review duplication within normal range", percentage=dup_percentage)
-        except Exception as e:
-            logger.error("Error checking review duplication", error=str(e))
-            self.violations.append(f"Review duplication check failed: {str(e)}")
+        if review_error:
+            self._fail("Review duplication check failed", review_error)
+        else:
+            total_duplicates, duplicate_pairs, total_reviews, _ = review_stats
+            dup_percentage = (total_duplicates / total_reviews) * 100 if total_reviews > 0 else 0
+            if dup_percentage > 10:
+                self.violations.append(f"High review duplication: {dup_percentage:.1f}% ({duplicate_pairs} duplicate pairs)")
+                logger.error("Suspicious review duplication", percentage=dup_percentage, pairs=duplicate_pairs)
+            else:
+                logger.info("Review duplication within normal range", percentage=dup_percentage)
         
         # 5) Refillable evidence integrity check
-        try:
-            refill_query = """
-            SELECT COUNT(*) as invalid_refill
-            FROM read_parquet('data/silver/products.parquet')
-            WHERE refillable_flag = TRUE 
-            AND (refill_evidence IS NULL OR refill_evidence = '[]' OR refill_evidence = '')
-            """
-            invalid_refill = self.con.execute(refill_query).fetchone()[0]
+        if product_error:
+            self._fail("Refillable evidence check failed", product_error)
+        else:
+            invalid_refill = product_stats[2]
             if invalid_refill > 0:
                 self.violations.append(f"Found {invalid_refill} refillable products without evidence")
                 logger.error("Invalid refillable evidence", count=invalid_refill)
-        except Exception as e:
-            logger.error("Error checking refillable evidence", error=str(e))
-            self.violations.append(f"Refillable evidence check failed: {str(e)}")
         
         # 6) Manifest plausibility check
-        try:
-            manifest_query = """
-            SELECT site, total_requests, blocked_requests
-            FROM read_parquet('data/silver/manifest_runs.parquet')
-            """
-            manifest_results = self.con.execute(manifest_query).fetchall()
-            
-            # Get product and review counts
-            count_query = """
-            SELECT 
-                (SELECT COUNT(*) FROM read_parquet('data/silver/products.parquet')) as product_count,
-                (SELECT COUNT(*) FROM read_parquet('data/silver/reviews.parquet')) as review_count
-            """
-            counts = self.con.execute(count_query).fetchone()
-            product_count, review_count = counts if counts else (0, 0)
-            
+        manifest_results = self._fetchall(MANIFEST_REQUESTS_SQL, "Manifest check failed")
+        if manifest_results is not None and product_error:
+            # Product count comes from the product scan above
+            self._fail("Manifest check failed", product_error)
+        elif manifest_results is not None:
+            product_count = product_stats[3]
             for site, total_requests, blocked_requests in manifest_results:
                 # Rule: total_requests should be much larger than product_count for real crawling
                 if total_requests < product_count * 2:  # At least 2 requests per product (discovery + details)
@@ -266,116 +369,79 @@ class IntegrityChecker:
                     logger.error("Suspicious manifest", site=site, requests=total_requests, products=product_count)
                 else:
                     logger.info("Manifest looks plausible", site=site, requests=total_requests, products=product_count)
-        except Exception as e:
-            logger.error("Error checking manifest plausibility", error=str(e))
-            self.violations.append(f"Manifest check failed: {str(e)}")
         
         # 7) Check rating bounds (keep existing logic)
-        try:
-            rating_bounds = self.con.execute("""
-                SELECT ROUND(AVG(CASE WHEN rating BETWEEN 1 AND 5 THEN 1.0 ELSE 0.0 END),3) AS rating_in_bounds,
-                       COUNT(*) AS total_reviews
-                FROM read_parquet('data/silver/reviews.parquet')
-            """).df()
-            
-            row = rating_bounds.iloc[0]
-            if row['rating_in_bounds'] == 1.0:
+        if review_error:
+            self._fail("Error checking rating bounds", review_error)
+        else:
+            rating_in_bounds = review_stats[3]
+            if rating_in_bounds == 1.0:
                 logger.info("✅ All ratings within valid bounds")
             else:
-                self.violations.append(f"Invalid ratings found: {row['rating_in_bounds']} in bounds")
-                logger.warning(f"Invalid ratings found: {row['rating_in_bounds']} in bounds")
-                
-        except Exception as e:
-            self.violations.append(f"Error checking rating bounds: {e}")
-            logger.error(f"Error checking rating bounds: {e}")
+                self.violations.append(f"Invalid ratings found: {rating_in_bounds} in bounds")
+                logger.warning(f"Invalid ratings found: {rating_in_bounds} in bounds")
     
     def check_price_sanity(self):
         """Check price distributions for sanity."""
         logger.info("Checking price sanity...")
         
-        try:
-            price_stats = self.con.execute("""
-                SELECT brand,
-                       COUNT(*) n, 
-                       MIN(price_value) pmin, MAX(price_value) pmax,
-                       COUNT(DISTINCT price_value) AS price_levels,
-                       ROUND(AVG(price_value), 2) AS avg_price
-                FROM read_parquet('data/silver/products.parquet')
-                GROUP BY 1 HAVING n>=10
-                ORDER BY price_levels ASC, n DESC
-            """).df()
-            
-            # Check for suspicious patterns
-            for _, row in price_stats.iterrows():
-                if row['price_levels'] <= 2 and row['n'] >= 20:
-                    self.violations.append(f"Brand {row['brand']} has suspiciously few price levels: {row['price_levels']} for {row['n']} products")
-                    logger.warning(f"Brand {row['brand']} has suspiciously few price levels: {row['price_levels']} for {row['n']} products")
-                
-                if row['pmin'] == row['pmax'] and row['n'] >= 10:
-                    self.violations.append(f"Brand {row['brand']} has identical min/max prices: {row['pmin']}")
-                    logger.warning(f"Brand {row['brand']} has identical min/max prices: {row['pmin']}")
-            
-            logger.info(f"Price sanity check completed for {len(price_stats)} brands")
+        flagged_brands = self._fetchall(FLAGGED_PRICES_SQL, "Error checking price sanity")
+        if flagged_brands is None:
+            return
+        
+        for brand, n, pmin, price_levels, few_levels, flat in flagged_brands:
+            if few_levels:
+                self.violations.append(f"Brand {brand} has suspiciously few price levels: {price_levels} for {n} products")
+                logger.warning(f"Brand {brand} has suspiciously few price levels: {price_levels} for {n} products")
             
-        except Exception as e:
-            self.violations.append(f"Error checking price sanity: {e}")
-            logger.error(f"Error checking price sanity: {e}")
+            if flat:
+                self.violations.append(f"Brand {brand} has identical min/max prices: {pmin}")
+                logger.warning(f"Brand {brand} has identical min/max prices: {pmin}")
+        
+        logger.info(f"Price sanity check completed: {len(flagged_brands)} brands flagged")
     
     def check_fixture_contamination(self):
         """Check for fixture contamination in silver data."""
         logger.info("Checking for fixture contamination...")
         
-        # Check if any files in silver have is_fixture=true
-        try:
-            fixture_contamination = self.con.execute("""
-                SELECT COUNT(*) AS fixture_count
-                FROM read_parquet('data/silver/products.parquet')
-                WHERE is_fixture = true
-            """).df()
-            
-            if fixture_contamination.iloc[0]['fixture_count'] > 0:
-                self.violations.append(f"Fixture contamination in products: {fixture_contamination.iloc[0]['fixture_count']} rows")
-                logger.error(f"Fixture contamination in products: {fixture_contamination.iloc[0]['fixture_count']} rows")
-            else:
-                logger.info("✅ No fixture contamination in products")
-                
-        except Exception as e:
-            # Column might not exist, which is fine
-            logger.info("No is_fixture column found in products (expected)")
+        # Only tables whose schema has an is_fixture column are scanned
+        fixture_columns = self._fetchall(FIXTURE_COLUMNS_SQL, "Error checking fixture contamination")
+        if fixture_columns is None:
+            return
+        fixture_tables = {table for (table,) in fixture_columns}
+        tables = [table for table in ("products", "reviews") if table in fixture_tables]
         
-        try:
-            fixture_contamination = self.con.execute("""
-                SELECT COUNT(*) AS fixture_count
-                FROM read_parquet('data/silver/reviews.parquet')
-                WHERE is_fixture = true
-            """).df()
-            
-            if fixture_contamination.iloc[0]['fixture_count'] > 0:
-                self.violations.append(f"Fixture contamination in reviews: {fixture_contamination.iloc[0]['fixture_count']} rows")
-                logger.error(f"Fixture contamination in reviews: {fixture_contamination.iloc[0]['fixture_count']} rows")
+        fixture_counts = {}
+        if tables:
+            counts = self._fetchall(" UNION ALL ".join(
+                f"SELECT '{table}', COUNT(*) FILTER (WHERE is_fixture = true) FROM {table}"
+                for table in tables
+            ), "Error checking fixture contamination")
+            if counts is None:
+                return
+            fixture_counts = dict(counts)
+        
+        for table in ("products", "reviews"):
+            if table not in fixture_counts:
+                # Column might not exist, which is fine
+                logger.info(f"No is_fixture column found in {table} (expected)")
+            elif fixture_counts[table] > 0:
+                self.violations.append(f"Fixture contamination in {table}: {fixture_counts[table]} rows")
+                logger.error(f"Fixture contamination in {table}: {fixture_counts[table]} rows")
             else:
-                logger.info("✅ No fixture contamination in reviews")
-                
-        except Exception as e:
-            # Column might not exist, which is fine
-            logger.info("No is_fixture column found in reviews (expected)")
+                logger.info(f"✅ No fixture contamination in {table}")
     
     def generate_audit_sample(self):
         """Generate audit sample for verification."""
         logger.info("Generating audit sample...")
         
         try:
-            # Get 20 random products with source URLs
-            audit_sample = self.con.execute("""
-                SELECT product_id, brand, name, price_value, source_url, scrape_ts
-                FROM read_parquet('data/silver/products.parquet')
-                WHERE source_url IS NOT NULL
-                ORDER BY RANDOM()
-                LIMIT 20
-            """).df()
+            cursor = self.con.execute(AUDIT_SAMPLE_SQL)
+            columns = [column[0] for column in cursor.description]
+            audit_sample = [dict(zip(columns, row)) for row in cursor.fetchall()]
             
-            audit_file = Path("data/silver/audit_sample.json")
-            audit_sample.to_json(audit_file, orient='records', indent=2)
+            audit_file = self.silver_dir / "audit_sample.json"
+            audit_file.write_bytes(orjson.dumps(audit_sample, option=orjson.OPT_INDENT_2))
             
             logger.info(f"✅ Audit sample saved to {audit_file}")
             logger.info(f"Sample size: {len(audit_sample)} products")
@@ -383,21 +449,27 @@ class IntegrityChecker:
             return audit_sample
             
         except Exception as e:
-            self.violations.append(f"Error generating audit sample: {e}")
-            logger.error(f"Error generating audit sample: {e}")
+            self._fail("Error generating audit sample", e)
             return None
     
     def run_integrity_check(self):
         """Run complete integrity check."""
         logger.info("🚀 Starting integrity check...")
         
-        self.check_file_existence()
-        self.check_provenance_gates()
-        self.check_refillable_evidence()
-        self.check_robots_provenance()
-        self.check_synthetic_indicators()
-        self.check_price_sanity()
-        self.check_fixture_contamination()
+        checks = [
+            self.check_file_existence,
+            self.check_provenance_gates,
+            self.check_refillable_evidence,
+            self.check_robots_provenance,
+            self.check_synthetic_indicators,
+            self.check_price_sanity,
+            self.check_fixture_contamination,
+        ]
+        
+        # Checks are independent queries; run them concurrently and record
+        # their violations in check order so the report stays deterministic
+        for violations in self._run_concurrently(checks):
+            self._violations.extend(violations)
         
         audit_sample = self.generate_audit_sample()
         
@@ -411,9 +483,8 @@ class IntegrityChecker:
         }
         
         # Save report
-        report_file = Path("data/silver/integrity_report.json")
-        with open(report_file, 'w') as f:
-            json.dump(report, f, indent=2)
+        report_file = self.silver_dir / "integrity_report.json"
+        report_file.write_bytes(orjson.dumps(report, option=orjson.OPT_INDENT_2))
         
         logger.info(f"📋 Integrity check completed: {len(self.violations)} violations")
         logger.info(f"📄 Report saved to {report_file}")
@@ -429,7 +500,12 @@ class IntegrityChecker:
 
 def main():
     """Main function."""
-    checker = IntegrityChecker()
+    parser = argparse.ArgumentParser(description="Integrity check for silver data")
+    parser.add_argument("--warm", action="store_true",
+                       help=f"Keep the silver tables in data/silver/{WARM_CACHE_FILE} between runs")
+    args = parser.parse_args()
+    
+    checker = IntegrityChecker(warm=args.warm)
     report = checker.run_integrity_check()
     
     print("\n" + "="*60)
@@ -447,7 +523,7 @@ def main():
     else:
         print("\n✅ All integrity checks passed!")
     
-    print(f"\n📄 Full report: data/silver/integrity_report.json")
+    print(f"\n📄 Full report: {checker.silver_dir / 'integrity_report.json'}")
 
 if __name__ == "__main__":
     main()
@@ -1,21 +1,26 @@
 #!/usr/bin/env python3
 """Real-time quality gates for data collection monitoring."""
 
-import duckdb
-import pandas as pd
-from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List
 import structlog
+from src.validation._duckdb import EMPTY_EVIDENCE_SQL, SilverChecker
 
 logger = structlog.get_logger()
 
-class QualityGates:
+class QualityGates(SilverChecker):
     """Real-time quality monitoring for data collection."""
     
     def __init__(self):
         """Initialize quality gates."""
-        self.con = duckdb.connect()
+        super().__init__()
+        self._register_views()
         
+    def _fetch_records(self, query: str) -> List[Dict[str, Any]]:
+        """Run a query and return its rows as column-name dicts."""
+        cursor = self.con.execute(query)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
     def check_provenance_integrity(self) -> Dict[str, Any]:
         """Check that all rows have required provenance fields."""
         logger.info("Checking provenance integrity...")
@@ -24,16 +29,16 @@ class QualityGates:
             # Check products
             products_missing = self.con.execute("""
                 SELECT COUNT(*) AS missing_count
-                FROM read_parquet('data/silver/products.parquet')
+                FROM products
                 WHERE source_url IS NULL OR scrape_ts IS NULL OR robots_snapshot_id IS NULL
-            """).df().iloc[0, 0]
+            """).fetchone()[0]
             
             # Check reviews
             reviews_missing = self.con.execute("""
                 SELECT COUNT(*) AS missing_count
-                FROM read_parquet('data/silver/reviews.parquet')
+                FROM reviews
                 WHERE source_url IS NULL OR scrape_ts IS NULL OR robots_snapshot_id IS NULL
-            """).df().iloc[0, 0]
+            """).fetchone()[0]
             
             result = {
                 "products_missing_provenance": products_missing,
@@ -57,25 +62,25 @@ class QualityGates:
         logger.info("Checking luxury coverage...")
         
         try:
-            luxury_stats = self.con.execute("""
+            luxury_stats = self._fetch_records("""
                 SELECT 
                     site, 
                     COUNT(*) AS total_products,
                     COUNT(CASE WHEN is_luxury = true THEN 1 END) AS luxury_products,
                     ROUND(AVG(CASE WHEN is_luxury = true THEN 1.0 ELSE 0.0 END), 3) AS luxury_rate,
                     ROUND(AVG(price_value), 2) AS avg_price
-                FROM read_parquet('data/silver/products.parquet')
+                FROM products
                 GROUP BY site
                 ORDER BY total_products DESC
-            """).df()
+            """)
             
             result = {
-                "luxury_stats": luxury_stats.to_dict('records'),
+                "luxury_stats": luxury_stats,
                 "status": "PASS" if len(luxury_stats) > 0 else "FAIL"
             }
             
             logger.info(f"Luxury coverage: {len(luxury_stats)} sites")
-            for _, row in luxury_stats.iterrows():
+            for row in luxury_stats:
                 logger.info(f"  {row['site']}: {row['luxury_products']}/{row['total_products']} luxury ({row['luxury_rate']:.1%})")
             
             return result
@@ -89,18 +94,14 @@ class QualityGates:
         logger.info("Checking refillable evidence...")
         
         try:
-            refillable_issues = self.con.execute("""
-                SELECT COUNT(*) AS invalid_count
-                FROM read_parquet('data/silver/products.parquet')
-                WHERE refillable_flag = TRUE 
-                AND (refill_evidence IS NULL OR array_length(refill_evidence) = 0)
-            """).df().iloc[0, 0]
-            
-            total_refillable = self.con.execute("""
-                SELECT COUNT(*) AS total_count
-                FROM read_parquet('data/silver/products.parquet')
+            # Both counts come from one scan of the refillable products
+            refillable_issues, total_refillable = self.con.execute(f"""
+                SELECT
+                    COUNT(*) FILTER (WHERE {EMPTY_EVIDENCE_SQL}) AS invalid_count,
+                    COUNT(*) AS total_count
+                FROM products
                 WHERE refillable_flag = TRUE
-            """).df().iloc[0, 0]
+            """).fetchone()
             
             result = {
                 "invalid_refillable": refillable_issues,
@@ -124,7 +125,7 @@ class QualityGates:
         logger.info("Checking review quality...")
         
         try:
-            review_stats = self.con.execute("""
+            review_stats = self._fetch_records("""
                 SELECT 
                     site,
                     COUNT(*) AS total_reviews,
@@ -132,18 +133,18 @@ class QualityGates:
                     MIN(review_date) AS min_date,
                     MAX(review_date) AS max_date,
                     ROUND(AVG(rating), 2) AS avg_rating
-                FROM read_parquet('data/silver/reviews.parquet')
+                FROM reviews
                 GROUP BY site
                 ORDER BY total_reviews DESC
-            """).df()
+            """)
             
             result = {
-                "review_stats": review_stats.to_dict('records'),
+                "review_stats": review_stats,
                 "status": "PASS" if len(review_stats) > 0 else "FAIL"
             }
             
             logger.info(f"Review quality: {len(review_stats)} sites")
-            for _, row in review_stats.iterrows():
+            for row in review_stats:
                 logger.info(f"  {row['site']}: {row['total_reviews']} reviews, {row['fr_ratio']:.1%} French, avg {row['avg_rating']}/5")
             
             return result
@@ -156,13 +157,16 @@ class QualityGates:
         """Run all quality gate checks."""
         logger.info("🚀 Running all quality gate checks...")
         
-        results = {
-            "provenance": self.check_provenance_integrity(),
-            "luxury_coverage": self.check_luxury_coverage(),
-            "refillable_evidence": self.check_refillable_evidence(),
-            "review_quality": self.check_review_quality()
+        checks = {
+            "provenance": self.check_provenance_integrity,
+            "luxury_coverage": self.check_luxury_coverage,
+            "refillable_evidence": self.check_refillable_evidence,
+            "review_quality": self.check_review_quality
         }
         
+        # Checks are independent queries; run them concurrently
+        results = dict(zip(checks, self._run_concurrently(list(checks.values()))))
+        
         # Overall status
         all_passed = all(result.get("status") == "PASS" for result in results.values())
         results["overall_status"] = "PASS" if all_passed else "FAIL"
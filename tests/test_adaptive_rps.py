@@ -0,0 +1,29 @@
+"""Tests for the adaptive rate limiter."""
+
+from unittest.mock import patch
+from src.utils.adaptive_rps import AdaptiveRPS
+
+
+class TestAdaptiveRPS:
+    """Test request pacing."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.limiter = AdaptiveRPS(rps=2.0)
+
+    def test_delay_only_when_due(self):
+        """Test an idle limiter does not wait and a busy one waits with bounded jitter."""
+        assert self.limiter._delay(100.0) == 0.0
+
+        self.limiter.last_request = 100.0
+        delay = self.limiter._delay(100.2)
+        assert 0.29 <= delay <= 0.36
+
+    def test_wait_skips_sleep_when_idle(self):
+        """Test wait does not sleep when the next slot is already due."""
+        with patch("src.utils.adaptive_rps.time.sleep") as sleep:
+            self.limiter.wait()
+            sleep.assert_not_called()
+
+            self.limiter.wait()
+            sleep.assert_called_once()
@@ -0,0 +1,22 @@
+"""Tests for Sephora product discovery helpers."""
+
+from src.sephora.discovery import SephoraDiscovery
+
+
+class TestSephoraDiscovery:
+    """Test discovery URL filtering."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.discovery = SephoraDiscovery()
+
+    def test_filter_by_brands(self):
+        """Test brands match anywhere in the product slug."""
+        urls = [
+            "https://www.sephora.fr/product/tom-ford-noir-eau-de-parfum/P1.html",
+            "https://www.sephora.fr/product/christian-dior-sauvage-eau-de-toilette/P2.html",
+            "https://www.sephora.fr/product/generic-body-lotion/P3.html",
+        ]
+
+        assert self.discovery._filter_by_brands(urls, ["Tom Ford", "Dior"]) == urls[:2]
+        assert self.discovery._filter_by_brands(urls, []) == []
@@ -0,0 +1,99 @@
+"""Tests for the silver-data integrity checker."""
+
+import json
+from datetime import datetime
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from src.validation.integrity_check import IntegrityChecker
+from src.validation.quality_gates import QualityGates
+
+
+class TestIntegrityChecker:
+    """Test integrity checks against small silver tables."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Set up test fixtures in a per-test directory."""
+        self.silver_dir = tmp_path / "silver"
+        self.silver_dir.mkdir()
+
+    def _write_products(self, rows):
+        """Write ``rows`` as the silver products table."""
+        pq.write_table(pa.Table.from_pylist(rows), self.silver_dir / "products.parquet")
+
+    def test_price_sanity_flat_prices(self):
+        """Test identical prices are flagged but all-missing prices are not."""
+        self._write_products(
+            [{"brand": "Chanel", "price_value": 120.0} for _ in range(10)]
+            + [{"brand": "Guerlain", "price_value": None} for _ in range(10)]
+        )
+        checker = IntegrityChecker(silver_dir=self.silver_dir)
+
+        violations = checker._run_isolated(checker.check_price_sanity)
+
+        assert violations == ["Brand Chanel has identical min/max prices: 120.0"]
+
+    def test_fixture_contamination_without_column(self):
+        """Test tables without an is_fixture column pass the fixture check."""
+        self._write_products([{"brand": "Chanel", "price_value": 120.0}])
+        pq.write_table(pa.Table.from_pylist([{"rating": 5}]), self.silver_dir / "reviews.parquet")
+        checker = IntegrityChecker(silver_dir=self.silver_dir)
+
+        assert checker._run_isolated(checker.check_fixture_contamination) == []
+
+    def test_fixture_contamination_unreadable_table(self):
+        """Test a table that can no longer be read is reported as a violation."""
+        self._write_products([{"brand": "Chanel", "is_fixture": True}])
+        checker = IntegrityChecker(silver_dir=self.silver_dir)
+        (self.silver_dir / "products.parquet").unlink()
+
+        violations = checker._run_isolated(checker.check_fixture_contamination)
+
+        assert len(violations) == 1
+        assert violations[0].startswith("Error checking fixture contamination: ")
+
+    def test_run_integrity_check_custom_silver_dir(self, tmp_path, monkeypatch):
+        """Test a full run reads and writes only under the given silver directory."""
+        monkeypatch.chdir(tmp_path)
+        scrape_ts = datetime(2024, 1, 1, 12, 0, 0)
+        self._write_products([
+            {"product_id": f"p{i}", "brand": brand, "name": "N°5", "price_value": price,
+             "source_url": f"https://www.sephora.fr/p{i}", "scrape_ts": scrape_ts,
+             "refillable_flag": False, "refill_evidence": []}
+            for i, (brand, price) in enumerate([("Chanel", 120.0), ("Guerlain", 95.5), ("Dior", 310.0)])
+        ])
+        pq.write_table(pa.Table.from_pylist([
+            {"rating": 5, "text": "Parfait", "source_url": "https://www.sephora.fr/p0", "scrape_ts": scrape_ts}
+        ]), self.silver_dir / "reviews.parquet")
+        pq.write_table(pa.Table.from_pylist([
+            {"site": "sephora", "robots_etag": '"v1"', "robots_path": "robots/sephora.txt",
+             "total_requests": 100, "blocked_requests": 0}
+        ]), self.silver_dir / "manifest_runs.parquet")
+
+        report = IntegrityChecker(silver_dir=self.silver_dir).run_integrity_check()
+
+        assert not any(v.startswith("Missing") for v in report["violations"]), report["violations"]
+        assert report["audit_sample_size"] == 3
+        assert (self.silver_dir / "audit_sample.json").exists()
+        saved = json.loads((self.silver_dir / "integrity_report.json").read_text(encoding="utf-8"))
+        assert saved["violations"] == report["violations"]
+        assert not (tmp_path / "data").exists()
+
+    def test_refillable_evidence_agrees_with_quality_gates(self, tmp_path, monkeypatch):
+        """Test both checkers count text-typed empty evidence the same way."""
+        monkeypatch.chdir(tmp_path)
+        self.silver_dir = tmp_path / "data" / "silver"
+        self.silver_dir.mkdir(parents=True)
+        self._write_products([
+            {"brand": "Chanel", "refillable_flag": True, "refill_evidence": evidence}
+            for evidence in ("[]", "", None, '["badge"]')
+        ])
+        checker = IntegrityChecker(silver_dir=self.silver_dir)
+
+        violations = checker._run_isolated(checker.check_refillable_evidence)
+        gates = QualityGates().check_refillable_evidence()
+
+        assert violations == ["Refillable products without evidence: 3 rows"]
+        assert gates["status"] == "FAIL"
+        assert gates["invalid_refillable"] == 3
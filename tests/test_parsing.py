@@ -0,0 +1,87 @@
+"""Tests for HTML parsing utilities."""
+
+import pytest
+from src.common.parsing import SafeExtractor, RefillableDetector, LanguageDetector
+
+
+class TestSafeExtractor:
+    """Test safe HTML extraction."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.html = """
+        <html><body>
+            <div class="brand">Chanel</div>
+            <div class="price">1.234,56 €</div>
+            <div class="size">100 ml</div>
+            <ul><li class="crumb">Parfums</li><li class="crumb">Femme</li></ul>
+            <a class="canonical" href="/product/chanel-n5">N°5</a>
+        </body></html>
+        """
+        self.extractor = SafeExtractor(self.html, "https://www.sephora.fr")
+
+    def test_extract_many(self):
+        """Test fields extracted together match the single-field extractors."""
+        fields = self.extractor.extract_many({
+            "brand": ([".missing"], [".brand"], "text"),
+            "price_value": ([".price"], [], "price"),
+            "size_ml_or_g": ([".size"], [], "size"),
+            "breadcrumbs": ([".crumb"], [], "list"),
+            "canonical_url": ([".canonical"], [], "url"),
+        })
+
+        assert fields == {
+            "brand": "Chanel",
+            "price_value": 1234.56,
+            "size_ml_or_g": 100.0,
+            "breadcrumbs": ["Parfums", "Femme"],
+            "canonical_url": "https://www.sephora.fr/product/chanel-n5",
+        }
+        assert fields["brand"] == self.extractor.extract_text([".missing"], [".brand"])
+
+    def test_extract_many_unknown_kind(self):
+        """Test an unknown extraction kind is rejected."""
+        with pytest.raises(KeyError):
+            self.extractor.extract_many({"brand": ([".brand"], [], "html")})
+
+    def test_from_node(self):
+        """Test a subtree extractor only sees its own node."""
+        crumbs = self.extractor.extract_nodes([".missing"], [".crumb"])
+        assert len(crumbs) == 2
+
+        scoped = SafeExtractor.from_node(crumbs[1], "https://www.sephora.fr")
+        assert scoped.extract_text([".crumb"]) == "Femme"
+        assert scoped.extract_text([".brand"]) is None
+
+
+class TestRefillableDetector:
+    """Test refillable keyword detection."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.detector = RefillableDetector({"french": ["recharge"], "english": ["refill"]})
+
+    def test_detect_refillable_fragments(self):
+        """Test text fragments are scanned without being joined."""
+        assert self.detector.detect_refillable(["N°5", None, "RECHARGE 100ml"]) == (True, ["attribute_text"])
+        assert self.detector.detect_refillable("Eau de parfum - Refill") == (True, ["attribute_text"])
+        assert self.detector.detect_refillable(["N°5", None]) == (False, [])
+
+    def test_detect_refillable_badge_first(self):
+        """Test badges take priority over text content."""
+        assert self.detector.detect_refillable(["refill"], badges=["Recharge"]) == (True, ["badge"])
+
+
+class TestLanguageDetector:
+    """Test heuristic language detection."""
+
+    def test_detect_language(self):
+        """Test indicator counts decide the language."""
+        assert LanguageDetector.detect_language("Très bon parfum, excellente tenue") == "fr"
+        assert LanguageDetector.detect_language("Very good and great") == "en"
+        assert LanguageDetector.detect_language("") == "other"
+
+    def test_detect_language_prefix_only(self):
+        """Test only the leading characters are inspected."""
+        text = "Très bon parfum " + "x" * LanguageDetector.MAX_CHARS + " the very good amazing"
+        assert LanguageDetector.detect_language(text) == "fr"
@@ -0,0 +1,39 @@
+"""Tests for the Sephora product scraper."""
+
+from datetime import datetime
+from src.sephora.product_scraper import SephoraProductScraper
+
+
+PRODUCT_URL = "https://www.sephora.fr/product/chanel-n5/P1.html"
+PRODUCT_HTML = """
+<html><body>
+    <div class="product-brand">Chanel</div>
+    <h1 class="product-name">N°5 Eau de Parfum</h1>
+    <span class="product-price">120,50 €</span>
+    <span class="price-currency">EUR</span>
+    <ul class="breadcrumb"><li>Parfums</li><li>Femme</li></ul>
+</body></html>
+"""
+
+
+class TestSephoraProductScraper:
+    """Test product scraping and the scrape cache."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.scraper = SephoraProductScraper({"french": ["recharge"], "english": ["refill"]})
+
+    def test_cache_returns_independent_copies(self):
+        """Test cache hits refresh timestamps and never share state with earlier results."""
+        first = self.scraper.scrape_product(PRODUCT_HTML, PRODUCT_URL, now=datetime(2024, 1, 1))
+        assert first is not None
+        first.category_path.append("mutated")
+        first.breadcrumbs.clear()
+
+        second = self.scraper.scrape_product(PRODUCT_HTML, PRODUCT_URL, now=datetime(2024, 1, 2))
+
+        assert second is not first
+        assert "mutated" not in second.category_path
+        assert second.breadcrumbs == ["Parfums", "Femme"]
+        assert second.scrape_ts == second.last_seen_ts == datetime(2024, 1, 2)
+        assert second.first_seen_ts == datetime(2024, 1, 1)
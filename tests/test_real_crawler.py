@@ -0,0 +1,36 @@
+"""Tests for the real web crawler's page extraction."""
+
+import pytest
+from src.crawlers.real_crawler import RealWebCrawler
+
+
+class TestRealWebCrawler:
+    """Test product extraction and batch price parsing."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Set up test fixtures in a per-test directory."""
+        self.crawler = RealWebCrawler({"robots_dir": str(tmp_path / "robots")})
+
+    def test_finalize_products(self):
+        """Test raw prices are parsed in one batch, including decimal commas."""
+        pages = {
+            "https://shop.fr/product/a": '<span class="price">129,90 €</span>',
+            "https://shop.fr/product/b": '<div itemprop="price" content="85.5"></div>',
+            "https://shop.fr/product/c": "<p>Prix: 42 €</p>",
+            "https://shop.fr/product/d": "<p>Épuisé</p>",
+        }
+        products = [self.crawler.extract_product_data(html, url) for url, html in pages.items()]
+        assert products[0]["price_raw"] == "129,90"
+
+        finalized = self.crawler.finalize_products(products)
+
+        assert [p.get("price_value") for p in finalized] == [129.9, 85.5, 42.0, None]
+        assert all("price_raw" not in p for p in finalized)
+        assert finalized[0]["price_currency"] == "EUR"
+        assert "price_currency" not in finalized[3]
+
+    def test_finalize_products_without_prices(self):
+        """Test a batch with no prices is returned unchanged."""
+        products = [{"url": "https://shop.fr/product/d"}]
+        assert self.crawler.finalize_products(products) == [{"url": "https://shop.fr/product/d"}]
@@ -0,0 +1,76 @@
+"""Tests for the Sephora reviews scraper."""
+
+from datetime import date, datetime
+from src.sephora.reviews_scraper import SephoraReviewsScraper
+
+
+PRODUCT_URL = "https://www.sephora.fr/product/chanel-n5/P1.html"
+
+
+def review_html(rating, body, review_id="", date_text="", verified=""):
+    """Build a single review container."""
+    return (
+        '<div class="review-item">'
+        f'<span class="review-id">{review_id}</span>'
+        f'<span class="review-rating">{rating}/5</span>'
+        f'<p class="review-text">{body}</p>'
+        f'<span class="review-date">{date_text}</span>'
+        f'<span class="verified-purchase">{verified}</span>'
+        '</div>'
+    )
+
+
+class TestSephoraReviewsScraper:
+    """Test review extraction and deduplication."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.scraper = SephoraReviewsScraper()
+
+    def test_scrape_reviews(self):
+        """Test fields are extracted from each review container."""
+        html = review_html(4, "Très bon parfum, excellente tenue", "r1", "15/01/2024", "Achat vérifié")
+        html += review_html(5, "Very good and great scent", "r2", "2024-02-03", "Non vérifié")
+
+        reviews = self.scraper.scrape_reviews(html, PRODUCT_URL, "chanel-n5")
+
+        assert [r.review_id for r in reviews] == ["r1", "r2"]
+        assert [r.rating for r in reviews] == [4, 5]
+        assert [r.review_date for r in reviews] == [date(2024, 1, 15), date(2024, 2, 3)]
+        assert [r.verified_purchase for r in reviews] == [True, False]
+
+    def test_seen_reviews_skipped(self):
+        """Test reviews already scraped are not returned again."""
+        html = review_html(4, "Très bon parfum, excellente tenue", "r1")
+
+        assert len(self.scraper.scrape_reviews(html, PRODUCT_URL, "chanel-n5")) == 1
+        assert self.scraper.scrape_reviews(html, PRODUCT_URL, "chanel-n5") == []
+        assert self.scraper.get_seen_review_count() == 1
+
+    def test_generated_review_ids_are_stable(self):
+        """Test reviews without an ID get distinct, content-derived IDs."""
+        html = review_html(4, "Très bon parfum, excellente tenue") + review_html(5, "Very good and great scent")
+
+        first = [r.review_id for r in self.scraper.scrape_reviews(html, PRODUCT_URL, "chanel-n5")]
+        second = [r.review_id for r in SephoraReviewsScraper().scrape_reviews(html, PRODUCT_URL, "chanel-n5")]
+
+        assert len(set(first)) == 2
+        assert first == second
+
+    def test_reviews_share_page_timestamp(self):
+        """Test every review on a page is stamped with the given time."""
+        now = datetime(2024, 3, 1, 12, 0, 0)
+        html = review_html(4, "Très bon parfum, excellente tenue", "r1") + review_html(5, "Very good and great scent", "r2")
+
+        reviews = self.scraper.scrape_reviews(html, PRODUCT_URL, "chanel-n5", now=now)
+
+        assert [r.scrape_ts for r in reviews] == [now, now]
+
+    def test_iter_reviews_streams(self):
+        """Test reviews are yielded lazily and marked seen as they go."""
+        html = review_html(4, "Très bon parfum, excellente tenue", "r1") + review_html(5, "Very good and great scent", "r2")
+
+        reviews = self.scraper.iter_reviews(html, PRODUCT_URL, "chanel-n5")
+        assert next(reviews).review_id == "r1"
+        assert self.scraper.get_seen_review_count() == 1
+        assert [r.review_id for r in reviews] == ["r2"]
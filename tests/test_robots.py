@@ -1,8 +1,8 @@
 """Tests for robots.txt compliance module."""
 
+import httpx
 import pytest
-from pathlib import Path
-from unittest.mock import Mock, patch
+from unittest.mock import patch
 from src.common.robots import RobotsParser, RobotsCompliance
 from src.common.schema import ComplianceManifest
 
@@ -10,18 +10,12 @@ from src.common.schema import ComplianceManifest
 class TestRobotsParser:
     """Test robots.txt parser functionality."""
     
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.robots_dir = Path("/tmp/test_robots")
-        self.robots_dir.mkdir(exist_ok=True)
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Set up test fixtures in a per-test directory."""
+        self.robots_dir = tmp_path / "robots"
         self.parser = RobotsParser(self.robots_dir)
     
-    def teardown_method(self):
-        """Clean up test fixtures."""
-        import shutil
-        if self.robots_dir.exists():
-            shutil.rmtree(self.robots_dir)
-    
     def test_parse_robots_content(self):
         """Test parsing robots.txt content."""
         content = """
@@ -40,6 +34,23 @@ Crawl-delay: 2
         assert rules["crawl_delay"] == 2.0
         assert rules["user_agent"] == "*"
     
+    def test_parse_robots_content_groups_and_comments(self):
+        """Test grouped user agents share rules and inline comments are dropped."""
+        content = """
+User-agent: Googlebot
+Disallow: /google-only/
+
+User-agent: Bingbot
+User-agent: *
+Disallow: /private/  # keep out
+Sitemap: https://test.com/sitemap.xml
+"""
+        
+        rules = self.parser._parse_robots_content(content, "test.com")
+        
+        assert rules["allow"] == []
+        assert rules["disallow"] == ["/private/"]
+    
     def test_path_matches_exact(self):
         """Test exact path matching."""
         assert self.parser._path_matches("/product/123", "/product/")
@@ -52,6 +63,60 @@ Crawl-delay: 2
         assert self.parser._path_matches("/reviews/456", "/*")
         assert not self.parser._path_matches("/admin/", "/product/*")
     
+    def test_path_matches_anchor(self):
+        """Test a trailing $ anchors the rule and other characters are literal."""
+        assert self.parser._path_matches("/file.pdf", "/*.pdf$")
+        assert not self.parser._path_matches("/file.pdf/page", "/*.pdf$")
+        assert not self.parser._path_matches("/fileXpdf", "/*.pdf$")
+    
+    def test_path_matches_single_wildcard(self):
+        """Test leading and trailing wildcards and exact anchors."""
+        assert self.parser._path_matches("/brand/private/page", "*/private/")
+        assert self.parser._path_matches("/file.pdf", "*.pdf$")
+        assert not self.parser._path_matches("/file.pdf?x", "*.pdf$")
+        assert self.parser._path_matches("/search?q=1", "/search*")
+        assert self.parser._path_matches("/cart", "/cart$")
+        assert not self.parser._path_matches("/cart/1", "/cart$")
+    
+    def test_is_allowed_many_rules(self):
+        """Test the compiled rule lists agree with per-rule matching."""
+        rules = {
+            "allow": [],
+            "disallow": [f"/section-{i}/" for i in range(200)] + ["", "/*/private"],
+        }
+        
+        assert not self.parser.is_allowed("https://test.com/section-150/page", rules)
+        assert not self.parser.is_allowed("https://test.com/product/private", rules)
+        assert self.parser.is_allowed("https://test.com/section-200/page", rules)
+    
+    def test_is_allowed_index_matches_rule_scan(self):
+        """Test the segment index agrees with checking each rule in turn."""
+        scan_parser = RobotsParser(self.robots_dir, use_index=False)
+        rules = {
+            "allow": ["/product/", "/*/reviews$", "/p"],
+            "disallow": ["/product/*/edit", "/search", "/*.json$", ""],
+        }
+        paths = ["/product/1", "/product/1/edit", "/brand/reviews", "/brand/reviews/2",
+                 "/search?q", "/searches/", "/p/data.json", "/pages", "/other"]
+        
+        for path in paths:
+            url = f"https://test.com{path}"
+            assert self.parser.is_allowed(url, rules) == scan_parser.is_allowed(url, rules), path
+    
+    def test_is_allowed_sees_rule_changes(self):
+        """Test rules changed in place or replaced are picked up by the index."""
+        rules = {"allow": [], "disallow": [f"/section-{i}/" for i in range(300)]}
+        
+        assert self.parser.is_allowed_path("/product/1", rules)
+        assert not self.parser.is_allowed_path("/section-7/page", rules)
+        
+        rules["disallow"].append("/product/")
+        assert not self.parser.is_allowed_path("/product/1", rules)
+        
+        rules["disallow"] = ["/product/"]
+        assert not self.parser.is_allowed_path("/product/1", rules)
+        assert self.parser.is_allowed_path("/section-7/page", rules)
+    
     def test_is_allowed(self):
         """Test URL allowance checking."""
         rules = {
@@ -64,6 +129,16 @@ Crawl-delay: 2
         assert not self.parser.is_allowed("https://test.com/admin/", rules)
         assert self.parser.is_allowed("https://test.com/other/", rules)  # Default allow
     
+    def test_is_allowed_path(self):
+        """Test paths are checked directly without reparsing a URL."""
+        rules = {"allow": [], "disallow": ["/admin/"]}
+        
+        assert not self.parser.is_allowed_path("/admin/users", rules)
+        assert self.parser.is_allowed_path("/product/123", rules)
+        assert not self.parser.is_allowed("/admin/users", rules)
+        assert self.parser.is_allowed("//cdn.test.com/static/admin/", rules)
+        assert not self.parser.is_allowed("//cdn.test.com/admin/", rules)
+    
     def test_get_crawl_delay(self):
         """Test crawl delay extraction."""
         rules = {"crawl_delay": 2.5}
@@ -76,36 +151,34 @@ Crawl-delay: 2
 class TestRobotsCompliance:
     """Test robots compliance manager."""
     
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.robots_dir = Path("/tmp/test_robots_compliance")
-        self.robots_dir.mkdir(exist_ok=True)
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Set up test fixtures in a per-test directory."""
+        self.robots_dir = tmp_path / "robots_compliance"
         self.compliance = RobotsCompliance(self.robots_dir)
     
-    def teardown_method(self):
-        """Clean up test fixtures."""
-        import shutil
-        if self.robots_dir.exists():
-            shutil.rmtree(self.robots_dir)
+    def _compliance(self, handler):
+        """Build a compliance manager whose clients are served by ``handler``."""
+        transport = httpx.MockTransport(handler)
+        return RobotsCompliance(
+            self.robots_dir,
+            client_factory=lambda **kwargs: httpx.Client(transport=transport, **kwargs),
+            async_client_factory=lambda **kwargs: httpx.AsyncClient(transport=transport, **kwargs),
+        )
     
-    @patch('src.common.robots.httpx.Client')
-    def test_check_domain_success(self, mock_client):
+    def test_check_domain_success(self):
         """Test successful domain compliance check."""
-        # Mock response
-        mock_response = Mock()
-        mock_response.text = """
+        robots_txt = """
 User-agent: *
 Allow: /product/
 Allow: /reviews/
 Crawl-delay: 1
 """
-        mock_response.raise_for_status.return_value = None
-        
-        mock_client_instance = Mock()
-        mock_client_instance.get.return_value = mock_response
-        mock_client.return_value.__enter__.return_value = mock_client_instance
+        compliance = self._compliance(
+            lambda request: httpx.Response(200, text=robots_txt, headers={"ETag": '"v1"'})
+        )
         
-        is_allowed, manifest = self.compliance.check_domain("test.com")
+        is_allowed, manifest = compliance.check_domain("test.com")
         
         assert is_allowed
         assert isinstance(manifest, ComplianceManifest)
@@ -113,22 +186,78 @@ Crawl-delay: 1
         assert manifest.crawl_delay == 1.0
         assert "/product/" in manifest.allow_paths
         assert "/reviews/" in manifest.allow_paths
+        assert manifest.robots_etag == '"v1"'
+    
+    def test_check_domain_keeps_rules_when_save_fails(self):
+        """Test a failed disk write does not turn fetched rules into a fetch failure."""
+        compliance = self._compliance(
+            lambda request: httpx.Response(200, text="User-agent: *\nDisallow: /admin/\n")
+        )
+        
+        with patch("pathlib.Path.write_text", side_effect=OSError("disk full")):
+            rules = compliance.parser.fetch_robots("test.com")
+        
+        assert rules["disallow"] == ["/admin/"]
+        assert "error" not in rules
+        assert compliance.parser._cache["test.com"][1] is rules
+    
+    def test_check_domain_revalidates_stale_rules(self):
+        """Test stale rules are revalidated and kept on 304 Not Modified."""
+        requests = []
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(304)
+        
+        compliance = self._compliance(handler)
+        rules = {"allow": ["/product/"], "disallow": [], "crawl_delay": None, "etag": '"v1"'}
+        compliance.parser._cache["test.com"] = (0, rules)
+        
+        assert compliance.parser.fetch_robots("test.com") is rules
+        assert requests[0].headers["If-None-Match"] == '"v1"'
+        assert compliance.parser._cache["test.com"][0] > 0
     
-    @patch('src.common.robots.httpx.Client')
-    def test_check_domain_failure(self, mock_client):
+    def test_persisted_rules_reloaded(self):
+        """Test a new parser reuses rules persisted by an earlier fetch."""
+        requests = []
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, text="User-agent: *\nAllow: /product/\n", headers={"ETag": '"v1"'})
+        
+        self._compliance(handler).check_domain("test.com")
+        rules = RobotsParser(self.robots_dir).fetch_robots("test.com")
+        
+        assert len(requests) == 1
+        assert rules["allow"] == ["/product/"]
+        assert rules["etag"] == '"v1"'
+    
+    def test_check_domain_failure(self):
         """Test domain compliance check with failure."""
-        # Mock failure
-        mock_client_instance = Mock()
-        mock_client_instance.get.side_effect = Exception("Connection failed")
-        mock_client.return_value.__enter__.return_value = mock_client_instance
+        def handler(request):
+            raise httpx.ConnectError("Connection failed", request=request)
         
-        is_allowed, manifest = self.compliance.check_domain("test.com")
+        is_allowed, manifest = self._compliance(handler).check_domain("test.com")
         
         # Should return permissive defaults on failure
         assert is_allowed
         assert isinstance(manifest, ComplianceManifest)
         assert manifest.domain == "test.com"
     
+    def test_prefetch(self):
+        """Test several domains are fetched on one async client and recorded."""
+        def handler(request):
+            if request.url.host == "a.com":
+                return httpx.Response(200, text="User-agent: *\nDisallow: /admin/\n")
+            return httpx.Response(503)
+        
+        compliance = self._compliance(handler)
+        results = compliance.prefetch_sync(["a.com", "b.com", "a.com"])
+        
+        assert results == {"a.com": True, "b.com": True}
+        assert compliance.manifests["a.com"].disallow_paths == ["/admin/"]
+        assert compliance.manifests["b.com"].allow_paths == ["/"]
+        assert "a.com" in compliance.parser._cache
+        assert "b.com" not in compliance.parser._cache
+    
     def test_check_url(self):
         """Test URL compliance checking."""
         # Set up mock robots rules
@@ -141,6 +270,22 @@ Crawl-delay: 1
         assert self.compliance.check_url("https://test.com/product/123", "test.com")
         assert not self.compliance.check_url("https://test.com/admin/", "test.com")
     
+    def test_check_url_reuses_verdicts(self):
+        """Test repeated paths skip rule matching until the rules change."""
+        parser = self.compliance.parser
+        rules = {"allow": ["/product/"], "disallow": ["/admin/"], "crawl_delay": 1.0}
+        parser._cache["test.com"] = (0, rules)
+        self.compliance.manifests["test.com"] = parser.create_compliance_manifest("test.com", rules)
+        
+        with patch.object(parser, "is_allowed_path", wraps=parser.is_allowed_path) as is_allowed:
+            assert self.compliance.check_url("https://test.com/product/1?page=2", "test.com")
+            assert self.compliance.check_url("https://test.com/product/1", "test.com")
+            assert is_allowed.call_count == 1
+            
+            parser._cache["test.com"] = (0, {"allow": [], "disallow": ["/product/"]})
+            assert not self.compliance.check_url("https://test.com/product/1", "test.com")
+            assert is_allowed.call_count == 2
+    
     def test_get_crawl_delay(self):
         """Test crawl delay retrieval."""
         # Set up mock manifest
@@ -169,6 +314,19 @@ Crawl-delay: 1
         
         assert self.compliance.manifests["test.com"].total_requests == 100
     
+    def test_update_manifest_fields_only(self):
+        """Test counters are updated and non-field keys are ignored."""
+        parser = self.compliance.parser
+        self.compliance.manifests["test.com"] = parser.create_compliance_manifest("test.com", None)
+        
+        self.compliance.update_manifest("test.com", total_requests=5, copy=None, unknown=1)
+        self.compliance.update_manifest("other.com", total_requests=5)
+        
+        manifest = self.compliance.manifests["test.com"]
+        assert manifest.total_requests == 5
+        assert callable(manifest.copy)
+        assert "other.com" not in self.compliance.manifests
+    
     def test_get_all_manifests(self):
         """Test getting all manifests."""
         manifest1 = ComplianceManifest(
@@ -1,13 +1,18 @@
 """Tests for Pydantic schema models."""
 
+import numpy as np
 import pytest
 from datetime import datetime, date
 from pydantic import ValidationError
 from src.common.schema import (
     Product, Review, Brand, PageManifest, ComplianceManifest, 
-    RunManifest, PriceStats, Site, Language, RefillEvidence
+    RunManifest, PriceStats, Site, Language, RefillEvidence,
+    ProductBundle, ReviewBatch, Enrichment, with_enrichment
 )
 
+# Fixed timestamp for fixtures that only need a valid datetime
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+
 
 class TestProduct:
     """Test Product model validation."""
@@ -36,11 +41,11 @@ class TestProduct:
             "ean_gtin": "1234567890123",
             "image_url": "https://www.sephora.fr/images/product.jpg",
             "breadcrumbs": ["Parfums", "Chanel", "N°5"],
-            "first_seen_ts": datetime.now(),
-            "last_seen_ts": datetime.now(),
+            "first_seen_ts": NOW,
+            "last_seen_ts": NOW,
             "source_site": "sephora.fr",
             "source_url": "https://www.sephora.fr/product/test-123",
-            "scrape_ts": datetime.now(),
+            "scrape_ts": NOW,
             "is_luxury": True,
             "brand_tier": "1",
             "enrichment": {"open_beauty_facts": {"ingredients": ["alcohol", "parfum"]}}
@@ -55,6 +60,8 @@ class TestProduct:
         assert RefillEvidence.BADGE in product.refill_evidence
         assert product.is_luxury is True
         assert product.brand_tier == "1"
+        assert isinstance(product.enrichment, Enrichment)
+        assert product.enrichment.open_beauty_facts.ingredients == ["alcohol", "parfum"]
     
     def test_invalid_product_missing_required(self):
         """Test product creation with missing required fields."""
@@ -79,11 +86,11 @@ class TestProduct:
             "category_path": ["fragrance"],
             "price_value": -10.0,  # Invalid negative price
             "price_currency": "EUR",
-            "first_seen_ts": datetime.now(),
-            "last_seen_ts": datetime.now(),
+            "first_seen_ts": NOW,
+            "last_seen_ts": NOW,
             "source_site": "sephora.fr",
             "source_url": "https://www.sephora.fr/product/test-123",
-            "scrape_ts": datetime.now()
+            "scrape_ts": NOW
         }
         
         with pytest.raises(ValidationError):
@@ -101,11 +108,11 @@ class TestProduct:
             "price_value": 120.50,
             "price_currency": "EUR",
             "rating_avg": 6.0,  # Invalid rating > 5
-            "first_seen_ts": datetime.now(),
-            "last_seen_ts": datetime.now(),
+            "first_seen_ts": NOW,
+            "last_seen_ts": NOW,
             "source_site": "sephora.fr",
             "source_url": "https://www.sephora.fr/product/test-123",
-            "scrape_ts": datetime.now()
+            "scrape_ts": NOW
         }
         
         with pytest.raises(ValidationError):
@@ -130,7 +137,7 @@ class TestReview:
             "verified_purchase": True,
             "helpful_count": 15,
             "author_label": "Client vérifié",
-            "scrape_ts": datetime.now()
+            "scrape_ts": NOW
         }
         
         review = Review(**review_data)
@@ -153,7 +160,7 @@ class TestReview:
             "body": "Test review",
             "language": Language.FRENCH,
             "review_date": date.today(),
-            "scrape_ts": datetime.now()
+            "scrape_ts": NOW
         }
         
         with pytest.raises(ValidationError):
@@ -170,7 +177,7 @@ class TestReview:
             "body": "Test review",
             "language": "invalid",  # Invalid language
             "review_date": date.today(),
-            "scrape_ts": datetime.now()
+            "scrape_ts": NOW
         }
         
         with pytest.raises(ValidationError):
@@ -205,7 +212,7 @@ class TestPageManifest:
         manifest_data = {
             "url": "https://www.sephora.fr/product/test-123",
             "site": "sephora.fr",
-            "scrape_ts": datetime.now(),
+            "scrape_ts": NOW,
             "status_code": 200,
             "content_length": 15000,
             "html_hash": "abc123",
@@ -235,8 +242,8 @@ class TestComplianceManifest:
             "allow_paths": ["/product/", "/reviews/"],
             "disallow_paths": ["/admin/", "/private/"],
             "crawl_delay": 2.0,
-            "start_ts": datetime.now(),
-            "end_ts": datetime.now(),
+            "start_ts": NOW,
+            "end_ts": NOW,
             "total_requests": 1000,
             "blocked_requests": 5,
             "rate_limit_violations": 2
@@ -249,6 +256,13 @@ class TestComplianceManifest:
         assert manifest.total_requests == 1000
         assert manifest.blocked_requests == 5
         assert manifest.rate_limit_violations == 2
+    
+    def test_domain_interned(self):
+        """Test equal domains share one string object."""
+        first = ComplianceManifest(domain="".join(["sephora", ".fr"]), start_ts=NOW)
+        second = ComplianceManifest(domain="".join(["sephora.", "fr"]), start_ts=NOW)
+        
+        assert first.domain is second.domain
 
 
 class TestRunManifest:
@@ -260,8 +274,8 @@ class TestRunManifest:
             "run_id": "run_20240101_120000_abc123",
             "git_hash": "abc123def456",
             "config_version": "1.0.0",
-            "start_ts": datetime.now(),
-            "end_ts": datetime.now(),
+            "start_ts": NOW,
+            "end_ts": NOW,
             "domains": ["sephora.fr", "marionnaud.fr"],
             "products_count": 1500,
             "reviews_count": 25000,
@@ -292,7 +306,7 @@ class TestPriceStats:
             "p90": 250.0,
             "count": 500,
             "currency": "EUR",
-            "computed_ts": datetime.now()
+            "computed_ts": NOW
         }
         
         stats = PriceStats(**stats_data)
@@ -302,6 +316,112 @@ class TestPriceStats:
         assert stats.p75 == 180.0
         assert stats.count == 500
         assert stats.currency == "EUR"
+    
+    def test_from_prices(self):
+        """Test percentiles match the numpy reference."""
+        prices = [50.0, 80.0, 95.0, 120.0, 180.0, 250.0, 310.0]
+        
+        stats = PriceStats.from_prices(prices, site="sephora", category="fragrance_edp_edt")
+        
+        expected = np.percentile(prices, [25, 50, 75, 90])
+        assert [stats.p25, stats.p50, stats.p75, stats.p90] == expected.tolist()
+        assert stats.count == 7
+        assert stats.currency == "EUR"
+    
+    def test_from_prices_empty(self):
+        """Test an empty price group is rejected."""
+        with pytest.raises(ValueError, match="No prices"):
+            PriceStats.from_prices([], site="sephora", category="fragrance_edp_edt")
+
+
+class TestProductBundle:
+    """Test validated product bundles passed between stages."""
+    
+    def _make_product(self):
+        return Product(
+            product_id="test-123",
+            site=Site.SEPHORA,
+            url="https://www.sephora.fr/product/test-123",
+            brand="Chanel",
+            name="N°5 Eau de Parfum",
+            category_path=["fragrance"],
+            price_value=120.50,
+            price_currency="EUR",
+            first_seen_ts=NOW,
+            last_seen_ts=NOW,
+            source_site="sephora.fr",
+            source_url="https://www.sephora.fr/product/test-123",
+            scrape_ts=NOW
+        )
+    
+    def test_with_enrichment(self):
+        """Test enrichment is attached without mutating the original."""
+        product = self._make_product()
+        enriched = with_enrichment(product, {"sentiment_score": 0.8})
+        
+        assert isinstance(enriched.enrichment, Enrichment)
+        assert enriched.enrichment.sentiment_score == 0.8
+        assert product.enrichment is None
+        assert enriched.product_id == product.product_id
+    
+    def test_bundle_is_frozen(self):
+        """Test bundles are immutable and derive new instances."""
+        bundle = ProductBundle(product=self._make_product())
+        enriched = bundle.with_enrichment(Enrichment(sentiment_score=0.8))
+        
+        assert enriched is not bundle
+        assert enriched.product.enrichment.sentiment_score == 0.8
+        assert bundle.product.enrichment is None
+        with pytest.raises(AttributeError):
+            bundle.reviews = ()
+    
+    def test_enrichment_keeps_unknown_keys(self):
+        """Test untyped enrichment keys survive validation."""
+        enrichment = Enrichment.model_validate({"sentiment_score": 0.5, "source": "obf"})
+        
+        assert enrichment.sentiment_score == 0.5
+        assert enrichment.model_dump()["source"] == "obf"
+
+
+class TestReviewBatch:
+    """Test column-oriented review batches."""
+    
+    def test_from_reviews(self):
+        """Test reviews are packed into typed columns."""
+        reviews = [
+            Review(
+                review_id=f"review-{i}",
+                product_id="test-123",
+                site="sephora",
+                url="https://www.sephora.fr/product/test-123#review-1",
+                rating=rating,
+                body="Excellent parfum, très longue tenue",
+                language=Language.FRENCH,
+                review_date=date(2024, 1, i + 1),
+                helpful_count=helpful_count,
+                scrape_ts=NOW
+            )
+            for i, (rating, helpful_count) in enumerate([(5, 3), (2, None)])
+        ]
+        batch = ReviewBatch.from_reviews(reviews)
+        
+        assert len(batch) == 2
+        assert batch.review_ids == ("review-0", "review-1")
+        assert batch.ratings.dtype == "uint8"
+        assert batch.ratings.tolist() == [5, 2]
+        assert batch.helpful_counts.tolist() == [3, -1]
+        assert batch.review_dates.tolist() == [date(2024, 1, 1), date(2024, 1, 2)]
+        assert batch.languages == ("fr", "fr")
+        assert all(type(language) is str for language in batch.languages)
+        with pytest.raises(AttributeError):
+            batch.ratings = None
+    
+    def test_empty(self):
+        """Test an empty batch has empty columns."""
+        batch = ReviewBatch.from_reviews([])
+        
+        assert len(batch) == 0
+        assert batch.review_dates.dtype == "datetime64[D]"
 
 
 class TestEnums:
@@ -325,3 +445,23 @@ class TestEnums:
         assert RefillEvidence.FACET == "facet"
         assert RefillEvidence.BADGE == "badge"
         assert RefillEvidence.ATTRIBUTE_TEXT == "attribute_text"
+    
+    def test_enum_string_format(self):
+        """Test enums format as their plain values and models store strings."""
+        assert str(Site.SEPHORA) == "sephora"
+        assert f"{Language.FRENCH}" == "fr"
+        assert type(Product.model_validate({
+            "product_id": "test-123",
+            "site": "sephora",
+            "url": "https://www.sephora.fr/product/test-123",
+            "brand": "Chanel",
+            "name": "N°5",
+            "category_path": [],
+            "price_value": 120.0,
+            "price_currency": "EUR",
+            "first_seen_ts": datetime(2024, 1, 1),
+            "last_seen_ts": datetime(2024, 1, 1),
+            "source_site": "sephora.fr",
+            "source_url": "https://www.sephora.fr/product/test-123",
+            "scrape_ts": datetime(2024, 1, 1),
+        }).site) is str
@@ -0,0 +1,128 @@
+"""Tests for common utility helpers."""
+
+import json
+import pytest
+import yaml
+from datetime import datetime
+from src.common.schema import RunManifest, ComplianceManifest
+from src.common.utils import ManifestWriter, DataValidator, ConfigManager, ComplianceLog
+
+
+class TestManifestWriter:
+    """Test manifest writing utilities."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Set up test fixtures in a per-test directory."""
+        self.output_dir = tmp_path / "manifests"
+        self.writer = ManifestWriter(self.output_dir)
+        self.compliance = ComplianceManifest(
+            domain="sephora.fr",
+            allow_paths=["/product/"],
+            disallow_paths=["/admin/"],
+            crawl_delay=2.0,
+            start_ts=datetime(2024, 1, 1, 12, 0, 0)
+        )
+        self.run_manifest = RunManifest(
+            run_id="run_20240101_120000_abc123",
+            config_version="1.0.0",
+            start_ts=datetime(2024, 1, 1, 12, 0, 0),
+            domains=["sephora.fr"],
+            products_count=10,
+            compliance_manifests=[self.compliance]
+        )
+
+    def test_write_run_manifest_json(self):
+        """Test JSON run manifest round-trips through the model."""
+        filepath = self.writer.write_run_manifest(self.run_manifest)
+
+        data = json.loads(filepath.read_text(encoding='utf-8'))
+        assert data["run_id"] == "run_20240101_120000_abc123"
+        assert data["start_ts"] == "2024-01-01T12:00:00"
+        assert RunManifest.model_validate(data) == self.run_manifest
+
+    def test_write_run_manifest_yaml(self):
+        """Test YAML run manifest contains JSON-safe primitives."""
+        filepath = self.writer.write_run_manifest(self.run_manifest, format="yaml")
+
+        data = yaml.safe_load(filepath.read_text(encoding='utf-8'))
+        assert data["domains"] == ["sephora.fr"]
+        assert data["compliance_manifests"][0]["domain"] == "sephora.fr"
+
+    def test_write_compliance_manifest_json(self):
+        """Test JSON compliance manifest output."""
+        filepath = self.writer.write_compliance_manifest(self.compliance)
+
+        data = json.loads(filepath.read_text(encoding='utf-8'))
+        assert data["domain"] == "sephora.fr"
+        assert data["crawl_delay"] == 2.0
+
+    def test_write_run_manifest_with_compliance_log(self):
+        """Test compliance manifests are referenced instead of embedded."""
+        log_path = self.output_dir / "compliance.parquet"
+        with ComplianceLog(log_path) as log:
+            log.append(self.compliance)
+            log.append(self.compliance.model_copy(update={"domain": "nocibe.fr"}))
+            filepath = self.writer.write_run_manifest(self.run_manifest, compliance_log=log)
+
+        data = json.loads(filepath.read_text(encoding='utf-8'))
+        assert "compliance_manifests" not in data
+        assert data["compliance_manifests_path"] == str(log_path)
+        assert data["compliance_manifests_count"] == 2
+
+        manifests = ComplianceLog.read(log_path)
+        assert [m.domain for m in manifests] == ["sephora.fr", "nocibe.fr"]
+        assert manifests[0] == self.compliance
+
+
+class TestDataValidator:
+    """Test compiled schema prefilters."""
+
+    def test_prefilter_product(self):
+        """Test product prefilter agrees with the rule-based validator."""
+        valid = {
+            "product_id": "test-123",
+            "brand": "Chanel",
+            "name": "N°5",
+            "price_value": 120.5,
+            "price_currency": "EUR",
+            "rating_avg": None
+        }
+        assert DataValidator.prefilter_product(valid) is None
+        assert DataValidator.validate_product_data(valid) == []
+
+        invalid = dict(valid, price_value=-10.0)
+        assert DataValidator.prefilter_product(invalid) is not None
+        assert DataValidator.validate_product_data(invalid) != []
+
+        missing = {"product_id": "test-123"}
+        assert DataValidator.prefilter_product(missing) is not None
+
+    def test_prefilter_review(self):
+        """Test review prefilter rejects out-of-range ratings and languages."""
+        valid = {"review_id": "r1", "product_id": "p1", "rating": 5, "body": "Parfait", "language": "fr"}
+        assert DataValidator.prefilter_review(valid) is None
+        assert DataValidator.prefilter_review(dict(valid, rating=0)) is not None
+        assert DataValidator.prefilter_review(dict(valid, language="de")) is not None
+
+
+class TestConfigManager:
+    """Test configuration loading helpers."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Set up test fixtures in a per-test directory."""
+        self.brands_file = tmp_path / "brands_tiers.json"
+        self.brands_file.write_text(json.dumps({
+            "tiers": {"1": ["Chanel", " Guerlain "], "1.5": ["Fresh", "chanel"]}
+        }), encoding='utf-8')
+
+    def test_load_brand_tier_codes(self):
+        """Test brand tiers compile into normalized integer codes."""
+        brand_to_code, code_to_tier = ConfigManager.load_brand_tier_codes(self.brands_file)
+
+        assert brand_to_code["chanel"] == 10
+        assert brand_to_code["guerlain"] == 10
+        assert brand_to_code["fresh"] == 15
+        assert code_to_tier == {10: "1", 15: "1.5"}
+        assert brand_to_code.get("unknown", -1) == -1